@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+描画・計測の hot path ベンチマーク（ヘッドレス）
+QT_QPA_PLATFORM=offscreen と合成データで動かす（win32 / 実機カウンタ不要）。
+DPR ごとに子プロセス（QT_SCALE_FACTOR）で測り、結果を JSON にまとめる。
+
+  python bench.py -o bench.json                       # 計測して保存
+  python bench.py --baseline bench.json               # 基準と比較（悪化があれば終了コード 1）
+  python bench.py --sizes 1920x1080 --dprs 1 --threshold p50=0.1
+
+項目：spark_paint（表示範囲別）, panel_paint, clock_paint, calendar_colors, dashboard_tick, collect
+Linux（psutil あり）では /proc 直読みの 1 サンプルの費用を psutil と並べ（sample[cpu/proc] など）、
+同じ区間の値を psutil と見比べる（目安。ずれたら警告だけ。--no-proc で省く。解析の正しさは tests/test_proc_metrics.py）
+各項目：p50 / p90 / p99 / max / mean（ms）、alloc_peak_kb / alloc_retained_kb（tracemalloc）、rss_peak_mb（プロセス）
+"""
+
+import os, sys, json, time, random, argparse, platform, subprocess, tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SIZES = ("1280x720", "1920x1080", "2560x1440")
+DPRS = (1.0, 1.5, 2.0)
+# 既定の悪化判定（基準比の増加率）。min_delta_ms 未満の差はノイズとして無視
+THRESHOLDS = {"p50": 0.25, "p99": 0.5, "alloc_peak_kb": 0.25, "rss_peak_mb": 0.2}
+TIME_METRICS = ("p50", "p90", "p99", "max", "mean")   # ms
+METRICS = TIME_METRICS + ("alloc_peak_kb", "alloc_retained_kb", "rss_peak_mb")
+MIN_DELTA_MS = 0.05
+
+
+# ───────────── 合成データ ─────────────
+class Walk:
+    """0 以上のランダムウォーク＋ときどきスパイク（実機の推移に近い形。一様乱数だと全区間が縦線になる）"""
+    def __init__(self, rng, start, step, hi, spike=0.0):
+        self.rng, self.v, self.step, self.hi, self.spike = rng, start, step, hi, spike
+
+    def __call__(self):
+        r = self.rng
+        self.v = min(self.hi, max(0.0, self.v + r.gauss(0, self.step)))
+        return self.v*5 if r.random() < self.spike else self.v
+
+
+def synthetic_provider(seed=1):
+    """全項目を埋める Provider"""
+    from metrics import Provider, DEFAULTS
+    rng = random.Random(seed)
+
+    class Synthetic(Provider):
+        name = "synthetic"
+        fields = tuple(DEFAULTS)
+
+        def __init__(self):
+            self.cpu = Walk(rng, 30, 4, 100); self.gpu = Walk(rng, 20, 6, 100)
+            self.down = Walk(rng, 300e3, 60e3, 5e6, spike=0.02); self.up = Walk(rng, 30e3, 6e3, 1e6)
+
+        def sample(self):
+            return {"cpu": self.cpu(), "ram_percent": 55 + rng.random(),
+                    "ram_total": 16 << 30, "ram_available": 7 << 30,
+                    "gpu_util": self.gpu(), "vram_used": 2.5*(1 << 30), "vram_total": 8.0*(1 << 30),
+                    "net_down": self.down(), "net_up": self.up()}
+    return Synthetic()
+
+
+# ───────────── 計測 ─────────────
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals)-1)*q
+    lo = int(k); hi = min(lo+1, len(sorted_vals)-1)
+    return sorted_vals[lo] + (sorted_vals[hi]-sorted_vals[lo])*(k-lo)
+
+
+def measure(fn, iterations, warmup, setup=None):
+    """fn() の所要時間（ms）と、別パスで tracemalloc のピーク／残留（KB）"""
+    for _ in range(warmup):
+        if setup: setup()
+        fn()
+    times = []
+    clk = time.perf_counter
+    for _ in range(iterations):
+        if setup: setup()
+        t = clk(); fn(); times.append((clk()-t)*1e3)
+    times.sort()
+    # 割り当ては遅くなるので回数を絞って別に測る
+    n = max(1, iterations//10)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]; tracemalloc.reset_peak()
+    for _ in range(n):
+        if setup: setup()
+        fn()
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"n": iterations,
+            "p50": percentile(times, 0.5), "p90": percentile(times, 0.9), "p99": percentile(times, 0.99),
+            "max": times[-1], "mean": sum(times)/len(times),
+            "alloc_peak_kb": (peak-base)/1024, "alloc_retained_kb": (cur-base)/1024/n}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return r/(1024*1024) if sys.platform == "darwin" else r/1024
+    except ImportError:
+        import psutil
+        mi = psutil.Process().memory_info()
+        return getattr(mi, "peak_wset", mi.rss)/(1024*1024)
+
+
+# ───────────── 子プロセス：1 DPR 分 ─────────────
+def run_child(sizes, iterations, warmup, use_np):
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QImage
+    app = QApplication(sys.argv[:1])
+    import transparent_clock as tc
+    from metrics import Collector
+    from holiday_index import default_index
+    if use_np:
+        tc.use_numpy()
+    default_index().build()   # 祝日表は起動時にバックグラウンドで作る前提なので先に済ませる
+
+    dpr = app.primaryScreen().devicePixelRatio()
+    results = {}
+
+    def render_into(widget):
+        img = QImage(max(1, round(widget.width()*dpr)), max(1, round(widget.height()*dpr)),
+                     QImage.Format.Format_ARGB32_Premultiplied)
+        img.setDevicePixelRatio(dpr)
+        return lambda: widget.render(img)
+
+    for size in sizes:
+        W, H = map(int, size.lower().split("x"))
+        collector = Collector([synthetic_provider()])
+        w = tc.Dashboard(collector, store=None)
+        w._painted = True   # 初回描画後の起動処理（サンプラ開始など）はしない。計測は下で直接回す
+        w.showNormal(); w.resize(W, H); app.processEvents()
+        tag = f"@{size}@{dpr:g}x"
+        rng = random.Random(2)
+
+        # SparkGraph：表示範囲ごと（1 時間分を埋めてから push＋描画）
+        g = w.net_graph; walk = Walk(rng, 300, 60, 5000, spike=0.02)
+        for _ in range(g.max_points):
+            g.push(walk())
+        for win in (60, 600, 3600):
+            g.set_window(win)
+            draw = render_into(g)
+            results[f"spark_paint[w={win}]{tag}"] = measure(draw, iterations, warmup, setup=lambda: g.push(walk()))
+
+        # Panel：値の文字を毎回変える
+        p = w.cpu_panel; draw = render_into(p); k = [0]
+        def panel_setup():
+            k[0] += 1
+            with p.batch():
+                p.set_value(f"{k[0] % 100}%"); p.set_extra(f"↑ {k[0] % 1000:.1f} KB/s")
+        results[f"panel_paint{tag}"] = measure(draw, iterations, warmup, setup=panel_setup)
+
+        results[f"clock_paint{tag}"] = measure(render_into(w.analog), iterations, warmup)
+
+        # カレンダー：ページを進めて再着色だけを測る
+        cal = w.calendar; page = [0]
+        def cal_setup():
+            page[0] += 1
+            y, m = divmod(page[0] % 120, 12)
+            cal.blockSignals(True); cal.setCurrentPage(2020+y, m+1); cal.blockSignals(False)
+        results[f"calendar_colors{tag}"] = measure(cal.update_calendar_colors, iterations, warmup, setup=cal_setup)
+
+        # 1 tick 全体：サンプル → update_all → 溜まった再描画を処理
+        def tick():
+            w.sampler.sample_once(); w.update_all(); app.processEvents()
+        results[f"dashboard_tick{tag}"] = measure(tick, iterations, warmup)
+
+        results[f"collect{tag}"] = measure(collector.collect, iterations, warmup)
+        w.close(); w.deleteLater(); app.processEvents()
+
+    rss = peak_rss_mb()
+    for r in results.values():
+        r["rss_peak_mb"] = rss
+    return results
+
+
+# ───────────── /proc 直読み と psutil ─────────────
+# 同じ区間で読んだときの許容差。cpu は %、ram は割合（読む瞬間のずれ）、net は bytes
+PARITY = {"cpu": 2.0, "ram_total": 0.0, "ram_available": 0.02, "net": 64*1024}
+
+
+def proc_pairs():
+    """(名前, metrics の /proc Provider, 同じ値を psutil で読む関数)"""
+    import psutil, metrics
+    return [("cpu", metrics.ProcCpu(), lambda: psutil.cpu_percent(None)),
+            ("ram", metrics.ProcRam(), psutil.virtual_memory),
+            ("net", metrics.ProcNet(), lambda: psutil.net_io_counters(pernic=True))]
+
+
+def proc_parity(interval=0.5):
+    """[(項目, /proc の値, psutil の値)] のうち許容差を超えたもの（読む瞬間がずれるので目安。警告にしか使わない）"""
+    import psutil, metrics
+    cpu, ram, net = metrics.ProcCpu(), metrics.ProcRam(), metrics.ProcNet()
+    psutil.cpu_percent(None)
+    time.sleep(interval)
+    bad = []
+    a, b = cpu.sample()["cpu"], psutil.cpu_percent(None)
+    if abs(a - b) > PARITY["cpu"]:
+        bad.append(("cpu", a, b))
+    r, vm = ram.sample(), psutil.virtual_memory()
+    if r["ram_total"] != vm.total:
+        bad.append(("ram_total", r["ram_total"], vm.total))
+    if abs(r["ram_available"] - vm.available) > PARITY["ram_available"]*vm.total:
+        bad.append(("ram_available", r["ram_available"], vm.available))
+    ours, theirs = net._counters(), psutil.net_io_counters(pernic=True)
+    for nic, (rx, tx) in ours.items():
+        c = theirs.get(nic)
+        if c is None:
+            bad.append((f"net[{nic}]", (rx, tx), None))
+        elif abs(rx - c.bytes_recv) > PARITY["net"] or abs(tx - c.bytes_sent) > PARITY["net"]:
+            bad.append((f"net[{nic}]", (rx, tx), (c.bytes_recv, c.bytes_sent)))
+    return bad
+
+
+def run_proc(iterations, warmup):
+    out = {}
+    for name, prov, ps in proc_pairs():
+        out[f"sample[{name}/proc]"] = measure(prov.sample, iterations, warmup)
+        out[f"sample[{name}/psutil]"] = measure(ps, iterations, warmup)
+    rss = peak_rss_mb()
+    for r in out.values():
+        r["rss_peak_mb"] = rss
+    return out
+
+
+# ───────────── 基準との比較 ─────────────
+def compare(current, baseline, thresholds, min_delta_ms=MIN_DELTA_MS):
+    """[(項目, 指標, 基準, 今回, 増加率)] のうち閾値を超えたもの"""
+    bad = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, limit in thresholds.items():
+            b, c = base.get(metric), cur.get(metric)
+            if b is None or c is None or b <= 0:
+                continue
+            if metric in TIME_METRICS and c - b < min_delta_ms:
+                continue
+            ratio = (c - b)/b
+            if ratio > limit:
+                bad.append((key, metric, b, c, ratio))
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TaskMini headless benchmark")
+    ap.add_argument("--sizes", nargs="+", default=list(SIZES), help="ウィンドウサイズ（例 1920x1080）")
+    ap.add_argument("--dprs", nargs="+", type=float, default=list(DPRS), help="デバイスピクセル比")
+    ap.add_argument("--iterations", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--no-numpy", action="store_true", help="numpy を使わない描画経路で測る")
+    ap.add_argument("-o", "--output", metavar="PATH", help="結果 JSON の保存先")
+    ap.add_argument("--baseline", metavar="PATH", help="比較する基準 JSON")
+    ap.add_argument("--threshold", action="append", default=[], metavar="METRIC=FRAC",
+                    help="悪化判定の増加率（例 p50=0.1）。既定 " + ", ".join(f"{k}={v}" for k, v in THRESHOLDS.items()))
+    ap.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS, help="これ未満の時間差は無視")
+    ap.add_argument("--no-proc", action="store_true", help="/proc 直読みと psutil の比較を省く")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    a = ap.parse_args()
+    th = dict(THRESHOLDS)
+    for t in a.threshold:
+        k, eq, v = t.partition("=")
+        if not eq or k not in METRICS:
+            ap.error(f"--threshold {t!r}: expected METRIC=FRAC with METRIC one of {', '.join(METRICS)}")
+        try:
+            th[k] = float(v)
+        except ValueError:
+            ap.error(f"--threshold {t!r}: {v!r} is not a number")
+        if not th[k] >= 0:   # NaN も弾く
+            ap.error(f"--threshold {t!r}: FRAC must be >= 0")
+
+    if a.child:
+        json.dump(run_child(a.sizes, a.iterations, a.warmup, not a.no_numpy), sys.stdout)
+        return 0
+
+    results = {}
+    for dpr in a.dprs:
+        env = dict(os.environ, QT_SCALE_FACTOR=f"{dpr:g}")
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", "--iterations", str(a.iterations),
+               "--warmup", str(a.warmup), "--sizes", *a.sizes] + (["--no-numpy"] if a.no_numpy else [])
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            sys.stderr.write(out.stderr)
+            return 2
+        results.update(json.loads(out.stdout))
+
+    parity = []
+    if not a.no_proc and sys.platform.startswith("linux") and os.path.exists("/proc/stat"):
+        try:
+            import psutil   # noqa: F401
+        except ImportError:
+            print("[bench] psutil not installed; skipping /proc comparison", file=sys.stderr)
+        else:
+            results.update(run_proc(a.iterations, a.warmup))
+            parity = proc_parity()
+
+    try:
+        from PyQt6.QtCore import QT_VERSION_STR
+    except ImportError:
+        QT_VERSION_STR = None
+    try:
+        import numpy
+        np_ver = None if a.no_numpy else numpy.__version__
+    except ImportError:
+        np_ver = None
+    doc = {"meta": {"python": platform.python_version(), "platform": platform.platform(), "qt": QT_VERSION_STR,
+                    "numpy": np_ver, "iterations": a.iterations, "sizes": a.sizes, "dprs": a.dprs,
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+           "results": results}
+
+    print(f"{'item':44} {'p50':>8} {'p90':>8} {'p99':>8} {'alloc KB':>9} {'RSS MB':>7}")
+    for key, r in results.items():
+        print(f"{key:44} {r['p50']:8.3f} {r['p90']:8.3f} {r['p99']:8.3f} {r['alloc_peak_kb']:9.1f} {r['rss_peak_mb']:7.1f}")
+    if a.output:
+        with open(a.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=1)
+
+    for key, ours, theirs in parity:
+        print(f"[parity] warning: {key}: /proc {ours} != psutil {theirs}", file=sys.stderr)
+
+    if a.baseline:
+        with open(a.baseline, encoding="utf-8") as f:
+            base = json.load(f)["results"]
+        bad = compare(results, base, th, a.min_delta_ms)
+        for key, metric, b, c, ratio in bad:
+            print(f"[regression] {key} {metric}: {b:.3f} -> {c:.3f} (+{ratio*100:.0f}%)", file=sys.stderr)
+        if bad:
+            return 1
+        print(f"[bench] no regressions against {a.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+壁紙画像モード（transparent_clock.py --render）のフレーム書き出し（Qt 非依存）
+固定サイズの 32 bit BGRX フレーム（QImage.Format_RGB32 のメモリ配置）を 1 ファイルに持ち、
+前回と違う帯（BAND 行ずつ）だけを上書きする。
+
+  .bmp … 32 bit BI_RGB のトップダウン BMP（高さを負に）。行が上から順に並ぶので、連続する帯は 1 回の書き込み
+  .raw … 16 B のヘッダ（"TMFR", 幅, 高さ, フレーム番号）＋画素。番号は帯を書き終えてから更新する
+         （読み手は番号が変わったら読み直す）
+
+  ff = FrameFile("dash.bmp", 1920, 1080)
+  bands = ff.write(pixels)   # [(先頭行, 行数)]。変化なしなら [] でファイルに触らない
+"""
+
+import os, struct
+
+BAND = 16                               # 比較・書き込みの単位（行）
+RAW_MAGIC = b"TMFR"
+RAW_HEADER = struct.Struct("<4sIII")    # magic, width, height, frame
+BMP_HEADER = struct.Struct("<2sIHHI" "IiiHHIIiiII")   # BITMAPFILEHEADER + BITMAPINFOHEADER（54 B）
+
+
+def changed_bands(prev, cur, stride, height, band=BAND):
+    """前回と違う帯を [(先頭行, 行数)] で（隣り合う帯はつなぐ）。prev が None（初回）なら全体"""
+    if prev is None or len(prev) != len(cur):
+        return [(0, height)]
+    out = []
+    for y in range(0, height, band):
+        n = min(band, height - y)
+        a, b = y*stride, (y + n)*stride
+        if prev[a:b] != cur[a:b]:
+            if out and out[-1][0] + out[-1][1] == y:
+                out[-1] = (out[-1][0], out[-1][1] + n)
+            else:
+                out.append((y, n))
+    return out
+
+
+class FrameFile:
+    """幅×高さ固定。初回は一時ファイルに全体を書いて置き換え、2 回目以降は変わった帯だけを r+b で上書き"""
+    def __init__(self, path, width, height):
+        self.path, self.w, self.h = path, width, height
+        self.kind = "raw" if path.lower().endswith(".raw") else "bmp"
+        self.stride = 4*width
+        self.offset = RAW_HEADER.size if self.kind == "raw" else BMP_HEADER.size
+        self.frame = 0
+        self.prev: bytes|None = None
+
+    def _header(self):
+        if self.kind == "raw":
+            return RAW_HEADER.pack(RAW_MAGIC, self.w, self.h, self.frame)
+        size = self.stride*self.h
+        return BMP_HEADER.pack(b"BM", BMP_HEADER.size + size, 0, 0, BMP_HEADER.size,
+                               40, self.w, -self.h, 1, 32, 0, size, 2835, 2835, 0, 0)
+
+    def write(self, pixels) -> list[tuple[int, int]]:
+        cur = bytes(pixels)
+        if len(cur) != self.stride*self.h:
+            raise ValueError(f"frame size {len(cur)} != {self.stride}x{self.h}")
+        bands = changed_bands(self.prev, cur, self.stride, self.h)
+        if not bands:
+            return bands
+        self.frame += 1
+        if self.prev is None or not os.path.exists(self.path):
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self._header()); f.write(cur)
+            os.replace(tmp, self.path)   # 読み手が書きかけを見ないように
+            bands = [(0, self.h)]
+        else:
+            with open(self.path, "r+b") as f:
+                for y, n in bands:
+                    f.seek(self.offset + y*self.stride)
+                    f.write(cur[y*self.stride:(y + n)*self.stride])
+                if self.kind == "raw":
+                    f.seek(0); f.write(self._header())
+        self.prev = cur
+        return bands
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+計測履歴の永続ストア（Qt 非依存）
+段ごとに固定長レコードの mmap リングファイルを 1 本ずつ持ち、古い方から上書きする（ファイルサイズ固定）。
+
+  1s … 1 時間（3600 件）   生サンプル
+  1m … 1 日  （1440 件）   1s 段を 1 分ごとに集約（min / max / avg）
+  1h … 31 日 （744 件）    1m 段を 1 時間ごとに集約
+
+Sampler.listeners に登録すると 1 tick 1 件追記する。
+
+  python history_store.py --since 24h --format csv -o cpu.csv
+"""
+
+import os, sys, json, math, mmap, time, struct, bisect, argparse, datetime, threading
+
+from metrics import Snapshot
+
+
+# 保存する系列（Snapshot の項目名）
+SERIES = ("cpu", "ram_percent", "gpu_util", "net_down", "net_up")
+STATS = ("min", "max", "avg")
+
+# 段：(名前, 間隔 秒, 件数)
+TIERS = (("1s", 1, 3600), ("1m", 60, 1440), ("1h", 3600, 744))
+
+
+def default_dir():
+    """%LOCALAPPDATA%\\TaskMini\\history（Windows）／ ~/.local/share/TaskMini/history"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "TaskMini", "history")
+
+
+# ───────────── リングファイル（1 段分） ─────────────
+class RingFile:
+    """
+    ヘッダ(64B) + REC × capacity を mmap。head = 次に書く位置、count = 有効件数。
+    レコード = ts(double) + 系列ごとの (min, max, avg) float32。値なしは NaN。
+    ts は単調非減少（bisect の前提）。時計が戻った（NTP・手動変更）ら直前の ts に揃えて書く。
+    """
+    MAGIC = b"TMRING\x00\x01"
+    HDR = struct.Struct("<8sIIdQQ")   # magic, rec_size, capacity, interval, head, count
+    HDR_SIZE = 64
+    REC = struct.Struct("<d%df" % (len(SERIES)*len(STATS)))
+
+    def __init__(self, path, interval, capacity):
+        self.path, self.interval, self.capacity = path, interval, capacity
+        size = self.HDR_SIZE + self.REC.size*capacity
+        fresh = True
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, "rb") as f:
+                magic, rs, cap, iv, _h, _c = self.HDR.unpack(f.read(self.HDR.size))
+            fresh = not (magic == self.MAGIC and rs == self.REC.size and cap == capacity and iv == interval)
+        if fresh:  # 新規・形式違いは作り直し
+            with open(path, "wb") as f:
+                f.truncate(size)
+        self._f = open(path, "r+b")
+        self.mm = mmap.mmap(self._f.fileno(), size)
+        if fresh:
+            self._store_header(0, 0)
+        _m, _rs, _cap, _iv, self.head, self.count = self.HDR.unpack_from(self.mm, 0)
+
+    def _store_header(self, head, count):
+        self.head, self.count = head, count
+        self.HDR.pack_into(self.mm, 0, self.MAGIC, self.REC.size, self.capacity, self.interval, head, count)
+
+    def append(self, ts, values):
+        """書いた ts を返す（直前より古ければ直前の ts）"""
+        last = self.last_ts()
+        if last is not None and ts < last:
+            ts = last
+        self.REC.pack_into(self.mm, self.HDR_SIZE + self.head*self.REC.size, ts, *values)
+        self._store_header((self.head + 1) % self.capacity, min(self.count + 1, self.capacity))
+        return ts
+
+    # 論理位置 i（0 = 最古）
+    def _pos(self, i):
+        return self.HDR_SIZE + ((self.head - self.count + i) % self.capacity)*self.REC.size
+
+    def ts(self, i):
+        return struct.unpack_from("<d", self.mm, self._pos(i))[0]
+
+    def record(self, i):
+        r = self.REC.unpack_from(self.mm, self._pos(i))
+        return r[0], r[1:]
+
+    def last_ts(self):
+        return self.ts(self.count - 1) if self.count else None
+
+    def bisect(self, t):
+        """ts >= t となる最初の論理位置"""
+        return bisect.bisect_left(range(self.count), t, key=self.ts)
+
+    def close(self):
+        if not self.mm.closed:
+            self.mm.flush(); self.mm.close(); self._f.close()
+
+
+# ───────────── 集約（1 バケット分の min / max / 合計） ─────────────
+class _Bucket:
+    __slots__ = ("start", "mins", "maxs", "sums", "ns")
+
+    def __init__(self, start):
+        k = len(SERIES)
+        self.start = start
+        self.mins = [math.inf]*k; self.maxs = [-math.inf]*k
+        self.sums = [0.0]*k; self.ns = [0]*k
+
+    def add(self, values):
+        for i in range(len(SERIES)):
+            mn, mx, avg = values[3*i:3*i+3]
+            if math.isnan(avg):
+                continue
+            if mn < self.mins[i]: self.mins[i] = mn
+            if mx > self.maxs[i]: self.maxs[i] = mx
+            self.sums[i] += avg; self.ns[i] += 1
+
+    def result(self):
+        out = []
+        for mn, mx, s, n in zip(self.mins, self.maxs, self.sums, self.ns):
+            out += (mn, mx, s/n) if n else (math.nan,)*3
+        return out
+
+
+# ───────────── ストア本体 ─────────────
+class HistoryStore:
+    """
+    append(snapshot) … 1s 段に 1 件。バケットが閉じたら上の段へ集約を繰り上げる
+    query(start, end, tier) … [(ts, (min, max, avg) × 系列)] を古い順で
+    series(name, start, end, stat) … グラフ用の (ts のリスト, 値のリスト)
+    export(fp, start, end, fmt) … CSV / NDJSON
+    """
+    def __init__(self, directory=None, tiers=TIERS):
+        self.directory = directory or default_dir()
+        os.makedirs(self.directory, exist_ok=True)
+        self.tiers = [(name, iv, RingFile(os.path.join(self.directory, f"tier_{name}.ring"), iv, cap))
+                      for name, iv, cap in tiers]
+        self._lock = threading.Lock()
+        self._buckets = [None]*len(self.tiers)
+        self._reseed()
+
+    def _reseed(self):
+        """再起動時：閉じていない上段のバケットを下段の記録から組み直す"""
+        for k in range(1, len(self.tiers)):
+            _n, iv, ring = self.tiers[k]
+            lower = self.tiers[k-1][2]
+            last = lower.last_ts()
+            if last is None:
+                continue
+            start = math.floor(last/iv)*iv
+            if ring.last_ts() == start:
+                continue
+            b = _Bucket(start)
+            for i in range(lower.bisect(start), lower.count):
+                b.add(lower.record(i)[1])
+            self._buckets[k] = b
+
+    def __call__(self, s: Snapshot):
+        self.append(s)
+
+    def append(self, s: Snapshot):
+        values = []
+        for name in SERIES:
+            v = getattr(s, name)
+            v = math.nan if v is None else float(v)
+            values += (v, v, v)
+        with self._lock:
+            if self.tiers[0][2].mm.closed:
+                return
+            self._put(0, s.ts, values)
+
+    def _put(self, k, ts, values):
+        ts = self.tiers[k][2].append(ts, values)   # 時計が戻ったら揃えた ts（上の段のバケットも単調に）
+        if k + 1 >= len(self.tiers):
+            return
+        iv = self.tiers[k+1][1]
+        start = math.floor(ts/iv)*iv
+        b = self._buckets[k+1]
+        if b is not None and b.start != start:
+            self._buckets[k+1] = None
+            self._put(k+1, b.start, b.result())
+            b = None
+        if b is None:
+            b = self._buckets[k+1] = _Bucket(start)
+        b.add(values)
+
+    def pick_tier(self, start, now=None):
+        """start まで遡れる一番細かい段"""
+        now = time.time() if now is None else now
+        for name, iv, ring in self.tiers:
+            if now - start <= iv*ring.capacity:
+                return name
+        return self.tiers[-1][0]
+
+    def _ring(self, tier):
+        for name, _iv, ring in self.tiers:
+            if name == tier:
+                return ring
+        raise KeyError(f"unknown tier: {tier!r}")
+
+    def query(self, start, end=None, tier=None):
+        end = time.time() if end is None else end
+        with self._lock:
+            ring = self._ring(tier or self.pick_tier(start))
+            lo, hi = ring.bisect(start), ring.bisect(end + 1e-6)
+            return [ring.record(i) for i in range(lo, hi)]
+
+    def series(self, name, start, end=None, stat="avg", tier=None):
+        col = 3*SERIES.index(name) + STATS.index(stat)
+        rows = self.query(start, end, tier)
+        return [t for t, _v in rows], [v[col] for _t, v in rows]
+
+    def export(self, fp, start, end=None, fmt="csv", tier=None):
+        rows = self.query(start, end, tier)
+        num = lambda v: "" if math.isnan(v) else f"{v:.6g}"
+        if fmt == "csv":
+            fp.write(",".join(["ts", "time"] + [f"{n}_{st}" for n in SERIES for st in STATS]) + "\n")
+            for ts, v in rows:
+                fp.write(",".join([f"{ts:.3f}", _iso(ts)] + [num(x) for x in v]) + "\n")
+        elif fmt == "ndjson":
+            for ts, v in rows:
+                d = {"ts": round(ts, 3), "time": _iso(ts)}
+                for i, n in enumerate(SERIES):
+                    d[n] = None if math.isnan(v[3*i+2]) else dict(zip(STATS, (round(x, 3) for x in v[3*i:3*i+3])))
+                fp.write(json.dumps(d, separators=(",", ":")) + "\n")
+        else:
+            raise ValueError(f"unknown format: {fmt!r}")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            for _n, _iv, ring in self.tiers:
+                ring.close()
+
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+
+def parse_time(text, now=None):
+    """'24h' / '7d' / '90m' / '30s'（いまから遡る）または ISO 形式の日時 → time.time() 値"""
+    now = time.time() if now is None else now
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if text[-1:] in units and text[:-1].replace(".", "", 1).isdigit():
+        return now - float(text[:-1])*units[text[-1]]
+    return datetime.datetime.fromisoformat(text).timestamp()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="計測履歴を CSV / NDJSON に書き出す")
+    ap.add_argument("--dir", default=None, help="履歴フォルダ（既定: default_dir()）")
+    ap.add_argument("--since", default="1h", help="開始（'24h', '7d' または ISO 日時）")
+    ap.add_argument("--until", default=None, help="終了（既定: 現在）")
+    ap.add_argument("--tier", choices=[t[0] for t in TIERS], default=None, help="段（既定: 範囲から自動）")
+    ap.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    ap.add_argument("-o", "--output", metavar="PATH", help="出力先（既定: 標準出力）")
+    a = ap.parse_args()
+
+    store = HistoryStore(a.dir)
+    start = parse_time(a.since)
+    end = parse_time(a.until) if a.until else None
+    if a.output:
+        with open(a.output, "w", encoding="utf-8", newline="") as f:
+            n = store.export(f, start, end, a.format, a.tier)
+    else:
+        n = store.export(sys.stdout, start, end, a.format, a.tier)
+    store.close()
+    print(f"[history] {n} rows", file=sys.stderr)
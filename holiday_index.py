@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+祝日インデックス（Qt 非依存）
+jpholiday の判定を年単位でまとめて引き、日付 → 祝日名 と 月ごとのビットマスクで持つ。
+Lively 版向けに JSON / JS として書き出せる。
+
+  python holiday_index.py --years 5 --js TaskMini_Lively_QuadPlusClock_CalendarHolidays_SunPy/holidays.js
+"""
+
+import sys, json, datetime, argparse, threading
+# jpholiday は初回の構築時に読み込む（build_async ならバックグラウンド）
+
+
+class HolidayIndex:
+    def __init__(self):
+        self.names: dict[datetime.date, str] = {}     # 日付 → 祝日名
+        self.months: dict[tuple[int, int], int] = {}  # (年, 月) → bit(日-1) のマスク
+        self.years: set[int] = set()
+        self.ready = False                           # build_async が終わった
+        self._lock = threading.Lock()
+        self._thread = None; self._waiting = []      # build_async の構築スレッドと、終わったら呼ぶ on_done
+
+    def ensure_year(self, year: int):
+        """その年を未構築なら構築（jpholiday 1 年分 ≈ 数十 ms、2 回目以降は即時）"""
+        if year in self.years:
+            return
+        import jpholiday
+        hol = jpholiday.year_holidays(year)
+        with self._lock:
+            if year in self.years:
+                return
+            for d, name in hol:
+                self.names[d] = name
+                self.months[(d.year, d.month)] = self.months.get((d.year, d.month), 0) | (1 << (d.day-1))
+            self.years.add(year)
+
+    def build(self, center_year: int | None = None, span: int = 5):
+        """center_year ± span 年をまとめて構築"""
+        c = center_year or datetime.date.today().year
+        for y in range(c - span, c + span + 1):
+            self.ensure_year(y)
+        return self
+
+    def build_async(self, center_year: int | None = None, span: int = 5, on_done=None):
+        """
+        バックグラウンドで構築（GUI 起動を待たせない）。スレッドは 1 本だけ（構築中・構築済みなら立て直さず、範囲も最初の呼び出しのまま）。
+        on_done() は構築スレッドから、構築済みなら呼んだスレッドですぐ呼ばれる
+        """
+        def work():
+            self.build(center_year, span)
+            with self._lock:
+                self.ready = True; waiting, self._waiting = self._waiting, []
+            for fn in waiting:
+                fn()
+        with self._lock:
+            done = self.ready
+            if not done:
+                if on_done is not None:
+                    self._waiting.append(on_done)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=work, name="holiday-index", daemon=True)
+                    self._thread.start()
+        if done and on_done is not None:
+            on_done()
+        return self._thread
+
+    def has_year(self, year: int) -> bool:
+        """構築済みか（未構築でも jpholiday を引きにいかない）"""
+        return year in self.years
+
+    def is_holiday(self, d: datetime.date) -> bool:
+        self.ensure_year(d.year)
+        return d in self.names
+
+    def name(self, d: datetime.date) -> str | None:
+        self.ensure_year(d.year)
+        return self.names.get(d)
+
+    def month_mask(self, year: int, month: int) -> int:
+        self.ensure_year(year)
+        return self.months.get((year, month), 0)
+
+    def month_days(self, year: int, month: int) -> list[int]:
+        m = self.month_mask(year, month)
+        return [i+1 for i in range(31) if m >> i & 1]
+
+    def to_dict(self) -> dict:
+        ys = sorted(self.years)
+        return {
+            "range": [ys[0], ys[-1]] if ys else None,
+            "holidays": {d.isoformat(): n for d, n in sorted(self.names.items())},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+_default: HolidayIndex | None = None
+
+def default_index() -> HolidayIndex:
+    """プロセス共通のインデックス（初回呼び出し時に生成）"""
+    global _default
+    if _default is None:
+        _default = HolidayIndex()
+    return _default
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="祝日インデックスを JSON / JS に書き出す")
+    ap.add_argument("--center", type=int, default=None, help="中心の年（既定: 今年）")
+    ap.add_argument("--years", type=int, default=5, help="前後何年分")
+    ap.add_argument("--json", metavar="PATH", help="JSON の出力先")
+    ap.add_argument("--js", metavar="PATH", help="window.JP_HOLIDAYS = {...} 形式の出力先（Lively の file:// 用）")
+    a = ap.parse_args()
+
+    text = HolidayIndex().build(a.center, a.years).to_json()
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f:
+            f.write(text)
+    if a.js:
+        with open(a.js, "w", encoding="utf-8") as f:
+            f.write("window.JP_HOLIDAYS = " + text + ";\n")
+    if not (a.json or a.js):
+        sys.stdout.write(text + "\n")
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+ダッシュボードのレイアウト設定（Qt 非依存）
+パネルの並び（画面ごと）と、パネルごとの更新周期・グラフの表示範囲を JSON / INI から読む。
+表示するパネルから、作って読む Provider（metrics.SOURCES の名前）も決める。
+
+JSON:
+  {"layout": "cpu,calendar,ram/gpu,clock,net",      # 行は "/"、列は ","（行ごとのリストでも可）
+   "screens": {"1": "cpu,net/clock"},               # 画面番号 or QScreen 名 → その画面のレイアウト
+   "panels": {"cpu": {"interval": 1, "window": 600, "alert": 90, "alert_for": 30},
+              "ram": {"interval": 5},
+              "top": {"n": 5, "interval": 2}}}
+
+INI（[layout] の default が全画面、他のキーは画面番号・画面名。パネルは 1 節ずつ）:
+  [layout]
+  default = cpu,calendar,ram/gpu,clock,net
+  1 = cpu,net/clock
+  [cpu]
+  interval = 1
+  window = 600
+  stats = 60
+
+パネル節のキー：interval（秒）, window（グラフの表示範囲 秒）, n（top の行数）,
+  stats / ewma（移動統計の窓・EWMA の時定数 秒）, alert / alert_off / alert_for（しきい値アラート。rolling_stats）
+"""
+
+import os, json, configparser
+from dataclasses import dataclass, field
+
+
+# レイアウト：行を "/"、列を "," で区切る。行の最後のセルは残りの列を占める
+LAYOUT = "cpu,calendar,ram/gpu,clock,net"
+PANELS = ("cpu", "ram", "gpu", "net", "calendar", "clock", "top")
+# パネル → 読む Provider。上位プロセスの GPU 列は GPUMonitor の pid 別の値を使う
+PANEL_SOURCES = {"cpu": ("cpu",), "ram": ("ram",), "gpu": ("gpu",), "net": ("net",), "top": ("procs", "gpu"),
+                 "calendar": (), "clock": ()}
+# Provider ごとの既定の周期（秒）。パネルの interval は先頭の Provider に効く
+INTERVALS = {"cpu": 1.0, "gpu": 1.0, "net": 1.0, "ram": 5.0, "procs": 2.0}
+# パネル節で使えるキー
+PANEL_KEYS = {"interval": float, "window": int, "n": int,
+              "stats": int, "ewma": float, "alert": float, "alert_off": float, "alert_for": float}
+ZERO_OK = {"alert"}   # alert = 0 でアラートなし
+TOP_N = 5   # レイアウトに top があって n の指定がないとき
+
+
+def parse_layout(spec) -> list[list[str]]:
+    """文字列（"a,b/c"）か行ごとのリスト（[["a", "b"], ["c"]]）"""
+    if isinstance(spec, str):
+        rows = [[c.strip() for c in row.split(",") if c.strip()] for row in spec.split("/")]
+    else:
+        rows = [[str(c).strip() for c in row] for row in spec]
+    rows = [r for r in rows if r]
+    bad = [c for r in rows for c in r if c not in PANELS]
+    if bad or not rows:
+        raise ValueError(f"bad layout {spec!r} (panels: {', '.join(PANELS)})")
+    return rows
+
+
+def layout_spec(rows) -> str:
+    return "/".join(",".join(r) for r in rows)
+
+
+def sources_for(panels) -> set[str]:
+    return {src for p in panels for src in PANEL_SOURCES.get(p, ())}
+
+
+@dataclass
+class LayoutConfig:
+    layouts: dict[str, str] = field(default_factory=dict)   # {"*" / 画面番号 / 画面名: レイアウト文字列}
+    panels: dict[str, dict] = field(default_factory=dict)   # {パネル: {"interval": 秒, "window": 秒, "n": 行数}}
+    path: str | None = None
+    mtime: float = 0.0
+
+    def intervals(self) -> dict[str, float]:
+        out = dict(INTERVALS)
+        for panel, opts in self.panels.items():
+            if "interval" in opts and PANEL_SOURCES.get(panel):
+                out[PANEL_SOURCES[panel][0]] = opts["interval"]
+        return out
+
+    def window(self, panel, default=None):
+        return self.panels.get(panel, {}).get("window", default)
+
+    def top(self) -> int:
+        """上位プロセスの行数（どのレイアウトにも top が無ければ 0）"""
+        if not any("top" in row for spec in self.layouts.values() for row in parse_layout(spec)):
+            return 0
+        return self.panels.get("top", {}).get("n", TOP_N)
+
+    def changed(self) -> bool:
+        """ファイルの更新時刻が読んだときから変わったか（消えたときは変わっていない扱い）"""
+        try:
+            return self.path is not None and os.stat(self.path).st_mtime != self.mtime
+        except OSError:
+            return False
+
+
+def _panel_options(name, opts) -> dict:
+    if name not in PANELS:
+        raise ValueError(f"unknown panel {name!r} (panels: {', '.join(PANELS)})")
+    out = {}
+    for k, v in opts.items():
+        if k not in PANEL_KEYS:
+            raise ValueError(f"{name}: unknown key {k!r} ({', '.join(PANEL_KEYS)})")
+        try:
+            out[k] = PANEL_KEYS[k](v)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}.{k}: bad value {v!r}") from None
+        if out[k] < 0 or (out[k] == 0 and k not in ZERO_OK):
+            raise ValueError(f"{name}.{k}: must be > 0")
+    if out.get("alert") and out.get("alert_off", 0) >= out["alert"]:
+        raise ValueError(f"{name}.alert_off: must be < alert")
+    return out
+
+
+def load(path) -> LayoutConfig:
+    """拡張子 .ini / .cfg / .conf なら INI、それ以外は JSON。内容の誤りは ValueError"""
+    mtime = os.stat(path).st_mtime
+    layouts, panels = {}, {}
+    try:
+        if path.lower().endswith((".ini", ".cfg", ".conf")):
+            cp = configparser.ConfigParser()
+            cp.optionxform = str   # 画面名（\\.\DISPLAY1 など）の大文字小文字を保つ
+            with open(path, encoding="utf-8") as f:
+                cp.read_file(f)
+            for key, spec in (cp["layout"].items() if cp.has_section("layout") else ()):
+                layouts["*" if key == "default" else key] = spec
+            for sec in cp.sections():
+                if sec != "layout":
+                    panels[sec] = _panel_options(sec, dict(cp[sec]))
+        else:
+            with open(path, encoding="utf-8") as f:
+                doc = json.load(f)
+            if not isinstance(doc, dict):
+                raise ValueError("top level must be an object")
+            if "layout" in doc:
+                layouts["*"] = doc["layout"]
+            for key, spec in (doc.get("screens") or {}).items():
+                layouts[str(key)] = spec
+            for name, opts in (doc.get("panels") or {}).items():
+                panels[name] = _panel_options(name, opts or {})
+        layouts = {k: layout_spec(parse_layout(v)) for k, v in layouts.items()}
+    except (configparser.Error, ValueError) as e:   # json.JSONDecodeError も ValueError
+        raise ValueError(f"{path}: {e}") from None
+    return LayoutConfig(layouts, panels, path, mtime)
@@ -0,0 +1,829 @@
+# -*- coding: utf-8 -*-
+"""
+計測まわり（Qt 非依存）
+transparent_clock.py と metrics_bridge.py の両方から使う。
+
+  Provider   … パネル 1 枚分のデータ源（psutil / /proc / PDH / 記録ファイル）
+  Collector  … Provider 群を 1 回ずつ読んで Snapshot を作る
+  Sampler    … Collector を周期実行するワーカースレッド
+  Recorder   … Snapshot を固定長バイナリで記録（ReplayProvider で再生）
+"""
+
+import os, re, sys, math, time, heapq, struct, platform, threading, contextlib, collections
+from dataclasses import dataclass
+from typing import NamedTuple
+# psutil / win32pdh は Provider を作るとき（サンプラスレッド）に読み込む。GUI の起動を待たせない
+
+
+def _win32pdh():
+    """GPU用：Windows パフォーマンスカウンタ（無い環境では None → NullGpu）"""
+    try:
+        import win32pdh
+    except ImportError:
+        return None
+    return win32pdh
+
+
+# ───────────── スナップショット（不変） ─────────────
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    seq: int
+    ts: float                  # time.time()
+    mono: float                # time.monotonic()
+    cpu: float                 # %
+    ram_percent: float
+    ram_total: int             # bytes
+    ram_available: int         # bytes
+    gpu_util: float | None     # % / None = GPU 非対応
+    vram_used: float           # bytes
+    vram_total: float          # bytes
+    net_down: float            # bytes/s（実経過時間で割った値）
+    net_up: float              # bytes/s
+    latency_ms: float          # 1 サンプルの収集時間
+    timings: tuple = ()        # (("cpu", ms), ("ram", ms), ...)
+    net_iface: str = ""        # net_down / net_up を測った IF 名
+    top_cpu: tuple = ()        # 上位プロセス（ProcStat）。ProcessTop があるときだけ
+    top_rss: tuple = ()
+    top_gpu: tuple = ()
+    # この回に Provider が読み直した項目（周期外で前回値を引き継いだ項目は含まない）。None = 不明（全部新しい扱い）
+    fresh: frozenset | None = None
+
+
+class ProcStat(NamedTuple):
+    pid: int
+    name: str
+    cmdline: str
+    cpu: float                 # %（全コア = 100%。タスクマネージャと同じ）
+    rss: int                   # bytes
+    gpu: float                 # %（GPU Engine の pid_ 別。GPUMonitor が無ければ 0）
+
+
+# Provider が返さなかった項目の既定値
+DEFAULTS = {"cpu": 0.0, "ram_percent": 0.0, "ram_total": 0, "ram_available": 0,
+            "gpu_util": None, "vram_used": 0.0, "vram_total": 0.0, "net_down": 0.0, "net_up": 0.0, "net_iface": "",
+            "top_cpu": (), "top_rss": (), "top_gpu": ()}
+
+
+# ───────────── Provider（データ源の共通インタフェース） ─────────────
+class Provider:
+    """
+    name   … タイミング内訳に使う名前（"cpu" / "ram" / "gpu" / "net" …）
+    fields … sample() が埋める Snapshot の項目
+    sample() は {項目名: 値} を返す。サンプラスレッドからのみ呼ばれる。
+    """
+    name = ""
+    fields: tuple = ()
+
+    def sample(self) -> dict:
+        raise NotImplementedError
+
+
+# 仮想・ループバックとみなす IF 名（Hyper-V / WSL / Docker / VM / トンネル）。実 NIC の通信を二重に数えるので除外
+# 短い接頭辞は番号付きの名前だけ（"Local Area Connection" や "lowpan0" を巻き込まない）。Windows のループバックは loopback で
+_VIRTUAL_NIC_RE = re.compile(
+    r"^(lo\d*$|veth|docker\d|br-|virbr\d|vmnet\d|vboxnet\d|tun\d|tap\d|tap-|wg\d|zt[0-9a-z]{6,}$|utun\d|awdl\d|llw\d"
+    r"|isatap|teredo)"
+    r"|loopback|pseudo-interface|vethernet|hyper-v|wsl|virtualbox|vmware|npcap|wireguard|zerotier", re.I)
+
+
+def is_virtual_nic(name: str) -> bool:
+    return bool(_VIRTUAL_NIC_RE.search(name))
+
+
+def counter_delta(cur: int, prev: int) -> int:
+    """累積カウンタの増分。32 bit の折り返しは補正、それ以外の減少（IF の再接続などでリセット）は 0"""
+    if cur >= prev:
+        return cur - prev
+    if prev < 1 << 32 and (1 << 32) - prev + cur < 1 << 31:
+        return (1 << 32) - prev + cur
+    return 0
+
+
+class _NetRate(Provider):
+    """
+    IF ごとの累積バイト数 → bytes/s（実経過時間 time.monotonic() で割る。折り返し・リセットを補正）。
+    表示する IF は iface 指定があればそれ、無ければ「up・非仮想・アドレスあり」の IF のうち
+    直近で一番流れているもの（平滑化したレートが今の IF の 1.5 倍を超えたら切替。ばたつき防止）。
+    """
+    name = "net"
+    fields = ("net_down", "net_up", "net_iface")
+    SCAN_EVERY = 10.0   # IF の状態（up / アドレス）を読み直す間隔（秒）
+
+    def __init__(self, iface: str | None = None):
+        self.iface = iface
+        self.active = iface or ""
+        self.avg: dict[str, float] = {}     # IF ごとの平滑化した上下合計（選択用）
+        self.usable: set[str] = set(); self._scan_t = -math.inf
+        self.last = self._counters(); self.last_t = time.monotonic()
+
+    def _counters(self) -> dict[str, tuple[int, int]]:   # {IF: (recv, sent)}
+        raise NotImplementedError
+
+    def _usable(self) -> set[str]:   # up かつ 非仮想・非ループバックの IF
+        raise NotImplementedError
+
+    def sample(self):
+        cur = self._counters(); t = time.monotonic()
+        dt = max(t - self.last_t, 1e-3)
+        if t - self._scan_t >= self.SCAN_EVERY:
+            self.usable = self._usable(); self._scan_t = t
+        rates = {}
+        for nic, (rx, tx) in cur.items():
+            prev = self.last.get(nic)
+            if prev is not None:
+                rates[nic] = (counter_delta(rx, prev[0])/dt, counter_delta(tx, prev[1])/dt)
+        self.last, self.last_t = cur, t
+        nic = self._select(rates)
+        down, up = rates.get(nic, (0.0, 0.0))
+        return {"net_down": down, "net_up": up, "net_iface": nic}
+
+    def _select(self, rates):
+        if self.iface:
+            return self.iface
+        cand = [n for n in rates if n in self.usable]
+        if not cand:
+            return self.active
+        for n in cand:
+            self.avg[n] = 0.8*self.avg.get(n, 0.0) + 0.2*sum(rates[n])
+        best = max(cand, key=self.avg.__getitem__)
+        if self.active not in cand or self.avg[best] > 1.5*self.avg[self.active] + 1024:
+            self.active = best
+        return self.active
+
+
+# ── psutil（Windows / macOS / Linux 共通） ──
+class PsutilCpu(Provider):
+    name = "cpu"; fields = ("cpu",)
+    def __init__(self):
+        import psutil
+        self.ps = psutil; psutil.cpu_percent()  # 初回は 0 を返すので空打ち
+    def sample(self): return {"cpu": self.ps.cpu_percent()}
+
+
+class PsutilRam(Provider):
+    name = "ram"; fields = ("ram_percent", "ram_total", "ram_available")
+    def __init__(self):
+        import psutil
+        self.ps = psutil
+    def sample(self):
+        vm = self.ps.virtual_memory()
+        return {"ram_percent": vm.percent, "ram_total": vm.total, "ram_available": vm.available}
+
+
+class PsutilNet(_NetRate):
+    def __init__(self, iface=None):
+        import psutil
+        self.ps = psutil
+        super().__init__(iface)
+    def _counters(self):
+        return {k: (n.bytes_recv, n.bytes_sent) for k, n in self.ps.net_io_counters(pernic=True).items()}
+    def _usable(self):
+        import socket
+        stats = self.ps.net_if_stats(); addrs = self.ps.net_if_addrs()
+        return {k for k, st in stats.items()
+                if st.isup and not is_virtual_nic(k)
+                and any(a.family in (socket.AF_INET, socket.AF_INET6) for a in addrs.get(k, ()))}
+
+
+# ── Linux /proc 直読み ──
+class _ProcFile:
+    """
+    /proc のファイルを開いたまま持ち、pread（preadv）でオフセット 0 から読み直す（毎回の open / close・確保なし）。
+    /proc の中身は読むたびに作り直されるので seek も不要。read(limit) は先頭 limit バイトだけ。
+    """
+    __slots__ = ("path", "fd", "buf", "view")
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self.buf = bytearray(size); self.view = memoryview(self.buf)
+
+    def read(self, limit=None) -> int:
+        """self.buf に読んだバイト数。全体を読むときにバッファが足りなければ倍にして読み直す"""
+        while True:
+            n = os.preadv(self.fd, [self.view if limit is None else self.view[:limit]], 0)
+            if limit is not None or n < len(self.buf):
+                return n
+            self.buf = bytearray(2*len(self.buf)); self.view = memoryview(self.buf)
+
+    def __del__(self):
+        with contextlib.suppress(OSError, AttributeError, TypeError):
+            os.close(self.fd)
+
+
+class ProcCpu(Provider):
+    """/proc/stat の先頭行。psutil.cpu_percent() と同じ式（guest は user に含まれるので除外）"""
+    name = "cpu"; fields = ("cpu",)
+    HEAD = 256   # 先頭行（全体の合計）だけ。残りは CPU ごとの行と割り込み数で長い
+
+    def __init__(self, path="/proc/stat"):
+        self.f = _ProcFile(path, self.HEAD)
+        self.last = self._times()
+
+    def _times(self):
+        f = self.f; n = f.read(self.HEAD)
+        end = f.buf.find(b"\n", 0, n)
+        v = [int(x) for x in f.buf[:n if end < 0 else end].split()[1:]]
+        v += [0]*(10-len(v))
+        user, nice, system, idle, iowait, irq, softirq, steal, guest, guest_nice = v[:10]
+        total = sum(v[:10]) - guest - guest_nice
+        busy = total - idle - iowait
+        return (busy, total)
+
+    def sample(self):
+        busy, total = cur = self._times()
+        d_busy = busy - self.last[0]; d_total = total - self.last[1]
+        self.last = cur
+        if d_total <= 0:
+            return {"cpu": 0.0}
+        return {"cpu": round(min(100.0, max(0.0, 100.0*d_busy/d_total)), 1)}
+
+
+class ProcRam(Provider):
+    """/proc/meminfo の MemTotal / MemAvailable（どちらも先頭 3 行以内。無ければ全体を読む）"""
+    name = "ram"; fields = ("ram_percent", "ram_total", "ram_available")
+    HEAD = 256
+
+    def __init__(self, path="/proc/meminfo"):
+        self.f = _ProcFile(path, self.HEAD)
+
+    def _fields(self, n):
+        total = avail = None
+        for line in self.f.buf[:n].split(b"\n"):
+            if line.startswith(b"MemTotal:"):
+                total = int(line.split()[1])*1024
+            elif line.startswith(b"MemAvailable:"):
+                avail = int(line.split()[1])*1024
+                break
+        return total, avail
+
+    def sample(self):
+        total, avail = self._fields(self.f.read(self.HEAD))
+        if total is None or avail is None:
+            total, avail = self._fields(self.f.read())
+        total = total or 0; avail = avail or 0
+        pct = round((total-avail)/total*100, 1) if total else 0.0
+        return {"ram_percent": pct, "ram_total": total, "ram_available": avail}
+
+
+class ProcNet(_NetRate):
+    """/proc/net/dev の IF 別カウンタ。up は /sys/class/net/*/operstate、仮想は /sys/devices/virtual/net/ にあるもの"""
+    def __init__(self, iface=None, path="/proc/net/dev", sys_net="/sys/class/net"):
+        self.f = _ProcFile(path)
+        self.sys_net = sys_net
+        super().__init__(iface)
+
+    def _counters(self):
+        out = {}
+        n = self.f.read()
+        for line in self.f.buf[:n].split(b"\n")[2:]:
+            name, sep, data = line.partition(b":")
+            if sep:
+                v = data.split()
+                out[name.strip().decode()] = (int(v[0]), int(v[8]))   # 受信 bytes, 送信 bytes
+        return out
+
+    def _usable(self):
+        out = set()
+        for nic in self.last:
+            try:
+                with open(os.path.join(self.sys_net, nic, "operstate")) as f:
+                    state = f.read().strip()
+            except OSError:
+                continue
+            virtual = os.path.realpath(os.path.join(self.sys_net, nic)).startswith("/sys/devices/virtual/")
+            # operstate が unknown の IF（一部のドライバ・PPP）も up 扱い
+            if state in ("up", "unknown") and not virtual and not is_virtual_nic(nic):
+                out.add(nic)
+        return out
+
+
+# ───────────── GPU モニタ（Windows PDH） ─────────────
+_ENGINE_RE = re.compile(r"pid_(\d+)_luid_(0x[0-9A-Fa-f]+_0x[0-9A-Fa-f]+)_phys_(\d+)_eng_(\d+)_engtype_(.*)")
+_ADAPTER_RE = re.compile(r"luid_(0x[0-9A-Fa-f]+_0x[0-9A-Fa-f]+)")
+
+
+def aggregate_engines(values: dict) -> dict:
+    r"""
+    GPU Engine(*) の {インスタンス名: %} をタスクマネージャと同じ考え方で集約する。
+      エンジン（アダプタ×phys×eng）ごとに全プロセスを合算
+      → 種類（3D / Copy / VideoDecode …）ごとにエンジンの最大
+      → アダプタの使用率 = 種類の最大、全体 = アダプタの最大
+    戻り値: {"util", "engines": {種類: %}, "adapters": {luid: %}, "pids": {pid: %}}
+    """
+    per_engine: dict[tuple, float] = {}
+    pids: dict[int, float] = {}
+    for inst, v in values.items():
+        m = _ENGINE_RE.match(inst)
+        if not m or v <= 0:
+            continue
+        pid, luid, phys, eng, etype = m.groups()
+        key = (luid, phys, eng, etype.strip() or "Other")
+        per_engine[key] = per_engine.get(key, 0.0) + v
+        pids[int(pid)] = max(pids.get(int(pid), 0.0), v)
+    engines: dict[str, float] = {}
+    adapters: dict[str, float] = {}
+    for (luid, _phys, _eng, etype), v in per_engine.items():
+        v = min(v, 100.0)
+        engines[etype] = max(engines.get(etype, 0.0), v)
+        adapters[luid] = max(adapters.get(luid, 0.0), v)
+    return {"util": max(adapters.values(), default=0.0), "engines": engines,
+            "adapters": adapters, "pids": pids}
+
+
+def aggregate_adapters(values: dict) -> dict:
+    """GPU Adapter Memory(*) の {インスタンス名: bytes} → {luid: bytes}"""
+    out: dict[str, float] = {}
+    for inst, v in values.items():
+        m = _ADAPTER_RE.search(inst)
+        key = m.group(1) if m else inst
+        out[key] = out.get(key, 0.0) + max(0.0, v)
+    return out
+
+
+class GPUMonitor(Provider):
+    r"""
+    ワイルドカードのカウンタを各 1 本だけ登録し、GetFormattedCounterArray で 1 tick 1 回読む。
+      \GPU Engine(*)\Utilization Percentage  … 種類別・アダプタ別に集約（aggregate_engines）
+      \GPU Adapter Memory(*)\Dedicated Usage … VRAM使用量(バイト)をアダプタ合算
+      \GPU Adapter Memory(*)\Dedicated Limit … VRAM容量（無い環境もある）
+    プロセスの増減でインスタンスが入れ替わっても、ワイルドカードなので登録し直し不要。
+    pdh に偽の win32pdh 互換モジュールを渡せば Windows 以外でも動かせる。
+    """
+    name = "gpu"
+    fields = ("gpu_util", "vram_used", "vram_total")
+
+    ENGINE_PATH = r"\GPU Engine(*)\Utilization Percentage"
+    USAGE_PATH  = r"\GPU Adapter Memory(*)\Dedicated Usage"
+    LIMIT_PATH  = r"\GPU Adapter Memory(*)\Dedicated Limit"
+
+    def __init__(self, pdh=None):
+        self.pdh = pdh = pdh or _win32pdh()
+        if pdh is None:
+            raise RuntimeError("win32pdh is not available")
+        self.query = pdh.OpenQuery()
+        self.engine_counter = self._add(self.ENGINE_PATH)
+        self.usage_counter  = self._add(self.USAGE_PATH)
+        self.limit_counter  = self._add(self.LIMIT_PATH)   # Limit が無い環境もある
+        if self.engine_counter is None and self.usage_counter is None:
+            pdh.CloseQuery(self.query)
+            raise RuntimeError("GPU performance counters are not available")   # → NullGpu
+        self.last = None   # 直近の集約結果（プロセス別 GPU などで再利用）
+        try:
+            # 初回サンプル収集（使用率は 2 回目の収集から値が出る）
+            pdh.CollectQueryData(self.query)
+        except pdh.error:
+            pass
+
+    def _add(self, path):
+        # 英語名で登録できれば OS の表示言語に依存しない。無い・失敗したら表示言語の名前で
+        for add in (getattr(self.pdh, "AddEnglishCounter", None), self.pdh.AddCounter):
+            if add is None:
+                continue
+            try:
+                return add(self.query, path)
+            except self.pdh.error:
+                pass
+        return None
+
+    def _array(self, counter):
+        if counter is None:
+            return {}
+        try:
+            arr = self.pdh.GetFormattedCounterArray(counter, self.pdh.PDH_FMT_DOUBLE)
+        except self.pdh.error:
+            return {}
+        return {k: float(v) for k, v in (arr or {}).items()}
+
+    def read(self):
+        pdh = self.pdh
+        try:
+            pdh.CollectQueryData(self.query)
+        except pdh.error:
+            return None
+
+        eng = aggregate_engines(self._array(self.engine_counter))
+        used = aggregate_adapters(self._array(self.usage_counter))
+        limit = aggregate_adapters(self._array(self.limit_counter))
+        self.last = {"util": eng["util"], "vram_used": sum(used.values()), "vram_total": sum(limit.values()),
+                     "engines": eng["engines"], "adapters": eng["adapters"], "pids": eng["pids"],
+                     "vram_by_adapter": used}
+        return self.last
+
+    def sample(self):
+        g = self.read()
+        if not g:
+            return {"gpu_util": None}
+        return {"gpu_util": g["util"], "vram_used": g["vram_used"], "vram_total": g["vram_total"]}
+
+
+class NullGpu(Provider):
+    """win32pdh が無い（Linux 等）／PDH 初期化失敗時の代替。常に「非対応」"""
+    name = "gpu"
+    fields = ("gpu_util",)
+
+    def sample(self):
+        return {"gpu_util": None}
+
+
+# ───────────── 上位プロセス ─────────────
+class ProcessTop(Provider):
+    """
+    CPU / RSS / GPU それぞれの上位 n プロセス。1 回の sample() で process_iter(attrs=...) を 1 周だけ。
+      psutil.Process は process_iter が pid ごとに使い回すので、cpu_percent() の差分は tick 間で有効
+      名前・コマンドラインは上位に入ったものだけ (pid, create_time) ごとに 1 回引いてキャッシュ
+      選抜は heapq.nlargest（全件ソートしない）
+      GPU は GPUMonitor.last["pids"]（GPU Engine インスタンス名の pid_ 接頭辞で集約済み）を使う
+    """
+    name = "procs"
+    fields = ("top_cpu", "top_rss", "top_gpu")
+    ATTRS = ("cpu_percent", "memory_info", "create_time")
+
+    def __init__(self, n=5, gpu: Provider|None=None):
+        import psutil
+        self.ps = psutil; self.n = n; self.gpu = gpu
+        self.ncpu = psutil.cpu_count() or 1
+        self.names: dict[tuple[int, float], tuple[str, str]] = {}
+        self.sample()   # cpu_percent() は初回 0 を返すので空打ち
+
+    def _name(self, p, ct):
+        key = (p.pid, ct)
+        v = self.names.get(key)
+        if v is None:
+            try:
+                with p.oneshot():
+                    v = (p.name(), " ".join(p.cmdline()))
+            except (self.ps.Error, OSError):
+                v = (f"pid {p.pid}", "")
+            self.names[key] = v
+        return v
+
+    def sample(self):
+        gpu = (getattr(self.gpu, "last", None) or {}).get("pids", {})
+        rows = []
+        for p in self.ps.process_iter(self.ATTRS, ad_value=None):
+            if p.pid == 0:   # System Idle Process
+                continue
+            i = p.info; mem = i["memory_info"]
+            rows.append((p, i["create_time"] or 0.0, (i["cpu_percent"] or 0.0)/self.ncpu,
+                         mem.rss if mem else 0, gpu.get(p.pid, 0.0)))
+        if len(self.names) > 8*self.n:   # 終了したプロセスの名前を捨てる
+            alive = {(r[0].pid, r[1]) for r in rows}
+            self.names = {k: v for k, v in self.names.items() if k in alive}
+
+        def top(col):
+            best = heapq.nlargest(self.n, rows, key=lambda r: r[col])
+            return tuple(ProcStat(r[0].pid, *self._name(r[0], r[1]), r[2], r[3], r[4]) for r in best if r[col] > 0)
+        return {"top_cpu": top(2), "top_rss": top(3), "top_gpu": top(4)}
+
+
+# Provider の名前（読む順。procs は GPU の後に読む＝pid 別 GPU を同じ tick の値で）
+SOURCES = ("cpu", "ram", "gpu", "net", "procs")
+
+
+def make_provider(name, iface=None, procs=0, gpu: Provider|None=None) -> Provider:
+    """名前（SOURCES）から実行環境に合った Provider を 1 つ"""
+    linux = sys.platform.startswith("linux") and os.path.exists("/proc/stat")
+    if name == "cpu":
+        return ProcCpu() if linux else PsutilCpu()
+    if name == "ram":
+        return ProcRam() if linux else PsutilRam()
+    if name == "net":
+        return ProcNet(iface) if linux else PsutilNet(iface)
+    if name == "gpu":
+        if _win32pdh() is not None:
+            try:
+                return GPUMonitor()   # インスタンス列挙を含むので重い（サンプラスレッドで作る）
+            except Exception:
+                pass
+        return NullGpu()
+    if name == "procs":
+        return ProcessTop(procs, gpu=gpu)
+    raise ValueError(f"unknown source {name!r}")
+
+
+def default_providers(procs=0, iface=None, sources=None):
+    """
+    実行環境に合わせた Provider 一式（CPU, RAM, GPU, NET の順。procs=N なら上位 N プロセスを最後に）。
+    iface   … ネットワークの IF 名（None = 一番流れている実 IF を自動選択）
+    sources … 作る Provider の名前（None = 全部）。表示しないパネルの分は作らない（PDH クエリも開かない）
+    """
+    want = set(SOURCES if sources is None else sources)
+    if procs <= 0:
+        want.discard("procs")
+    out, gpu = [], None
+    for name in SOURCES:
+        if name in want:
+            p = make_provider(name, iface, procs, gpu)
+            if name == "gpu":
+                gpu = p
+            out.append(p)
+    return out
+
+
+# ───────────── 収集（1 回分） ─────────────
+class Collector:
+    """
+    Provider 群を読んで Snapshot を作る（サンプラスレッドからのみ呼ぶ）。
+    intervals={"ram": 5.0} のように名前ごとの周期（秒）を指定すると、期限の来た Provider だけ読み、
+    それ以外は前回値を引き継ぐ。scale を掛けると全周期が伸びる（バッテリー時など）。
+    providers=None なら default_providers(procs, iface, sources) を初回アクセス時（通常はサンプラスレッドの prepare()）に作る。
+    set_sources() で読む Provider を差し替えられる（表示するパネルが変わったとき。providers を渡したときは周期だけ）。
+    """
+    def __init__(self, providers=None, intervals: dict | None = None, procs=0, iface=None, sources=None):
+        self._managed = providers is None
+        self._providers = list(providers) if providers is not None else None
+        self.procs, self.iface = procs, iface
+        self.sources = None if sources is None else frozenset(sources)
+        self._plan = None   # set_sources() の予約（次の collect() でサンプラスレッドが反映）
+        self._plock = threading.Lock()
+        self.intervals = dict(intervals or {})
+        self.scale = 1.0
+        self.seq = 0
+        self.values = dict(DEFAULTS)   # 前回値（周期外の Provider はこれを引き継ぐ）
+        self._due: dict[int, float] = {}
+        self._failed = set()
+
+    @property
+    def providers(self):
+        if self._providers is None:
+            with self._plock:
+                if self._providers is None:
+                    self._apply_plan()
+                    self._providers = default_providers(self.procs, self.iface, self.sources)
+        return self._providers
+
+    def set_sources(self, sources, intervals: dict | None = None, procs: int | None = None):
+        """読む Provider の名前・周期・上位プロセス数を予約（どのスレッドからでも。反映はサンプラスレッド）"""
+        self._plan = (frozenset(sources), dict(intervals) if intervals is not None else None, procs)
+
+    def _apply_plan(self):
+        """予約を反映。作り直すのは増えた Provider だけ、外した分の値は既定値に戻す"""
+        plan, self._plan = self._plan, None
+        if plan is None:
+            return
+        sources, intervals, procs = plan
+        if intervals is not None:
+            self.intervals = intervals; self._due.clear()
+        if procs is not None:
+            self.procs = procs
+        old = self._providers
+        self.sources = sources
+        if old is None or not self._managed:
+            return
+        want = set(sources) - ({"procs"} if self.procs <= 0 else set())
+        have = {p.name: p for p in old}
+        new, gpu = [], None
+        for name in SOURCES:
+            if name not in want:
+                continue
+            p = have.get(name)
+            if p is None:
+                try:
+                    p = make_provider(name, self.iface, self.procs, gpu)
+                except Exception as e:
+                    print(f"[collector] {name} failed: {e!r}", file=sys.stderr); continue
+            if name == "gpu":
+                gpu = p
+            elif name == "procs":
+                p.n, p.gpu = self.procs, gpu
+            new.append(p)
+        for p in old:
+            if p.name not in want:
+                for f in p.fields:
+                    self.values[f] = DEFAULTS[f]
+        self._providers = new; self._due.clear()
+
+    def prepare(self):
+        """Provider 群を作っておく（PDH の列挙などをここで済ませる）"""
+        return self.providers
+
+    def provider(self, name):
+        return next((p for p in self.providers if p.name == name), None)
+
+    def collect(self) -> Snapshot:
+        if self._plan is not None:
+            with self._plock:
+                self._apply_plan()
+        clk = time.perf_counter
+        vals = self.values; timings = []; fresh = set()
+        now = time.monotonic()
+        t_start = clk()
+        for i, p in enumerate(self.providers):
+            if now < self._due.get(i, 0.0):
+                continue
+            iv = self.intervals.get(p.name)
+            if iv:
+                # 少し手前で期限切れ扱いにして tick の揺れで 1 周飛ばさないように
+                self._due[i] = now + iv*self.scale - 0.05
+            t0 = clk()
+            try:
+                d = p.sample()
+                vals.update(d); fresh.update(d)
+            except Exception as e:
+                if p not in self._failed:  # 同じエラーを毎秒出さない
+                    self._failed.add(p)
+                    print(f"[collector] {p.name} failed: {e!r}", file=sys.stderr)
+            timings.append((p.name, (clk()-t0)*1e3))
+        self.seq += 1
+        ts = vals.pop("ts", None) or time.time()
+        return Snapshot(seq=self.seq, ts=ts, mono=time.monotonic(),
+                        latency_ms=(clk()-t_start)*1e3, timings=tuple(timings), fresh=frozenset(fresh), **vals)
+
+
+# ───────────── バックグラウンドサンプラ ─────────────
+class Sampler(threading.Thread):
+    """
+    一定周期で Collector.collect() を回すワーカースレッド。
+    最新値は self.latest（参照の差し替えのみ＝ロック不要）で受け渡す。
+    align=True なら壁時計の秒境界の lead 秒前に揃える（GUI の秒更新時には最新値が揃っている）。
+    pause() 中は計測しない。set_scale() で周期を伸縮（Collector の Provider 別周期も同率）。
+    """
+    def __init__(self, collector: Collector, interval=1.0, history=120, align=False, lead=0.1):
+        super().__init__(name="metrics-sampler", daemon=True)
+        self.collector = collector
+        self.interval = interval
+        self.align = align; self.lead = lead
+        self.scale = 1.0
+        self.paused = False
+        self.ticks = 0
+        self.latest: Snapshot | None = None
+        self.latency = collections.deque(maxlen=history)   # 収集時間(ms)の履歴
+        self.listeners = []                                  # f(snapshot)：サンプラスレッドから呼ばれる
+        self._stopped = False
+        self._wake = threading.Event()
+
+    def sample_once(self):
+        self.ticks += 1
+        try:
+            snap = self.collector.collect()
+        except Exception as e:
+            print(f"[sampler] collect failed: {e!r}", file=sys.stderr)
+            return None
+        self.latest = snap
+        self.latency.append(snap.latency_ms)
+        for f in tuple(self.listeners):   # 呼び出し中の追加・削除に備えて写しで回す
+            f(snap)
+        return snap
+
+    def _next(self, prev):
+        iv = self.interval*self.scale
+        now = time.monotonic()
+        if iv <= 0:
+            return now
+        if self.align:
+            wall = time.time()
+            return now + (math.floor((wall + self.lead)/iv) + 1)*iv - self.lead - wall
+        # 処理時間に引きずられないよう絶対時刻で次 tick を決める
+        return max(prev + iv, now)
+
+    def run(self):
+        try:
+            self.collector.prepare()
+        except Exception as e:
+            print(f"[sampler] prepare failed: {e!r}", file=sys.stderr)
+        next_t = last = time.monotonic()
+        while not self._stopped:
+            if self.paused:
+                self._wake.wait(); self._wake.clear()
+                next_t = time.monotonic()   # 再開したらすぐ 1 回
+                continue
+            if time.monotonic() >= next_t:
+                last = next_t
+                self.sample_once()
+                next_t = self._next(next_t)
+            if self._wake.wait(max(0.0, next_t - time.monotonic())):
+                self._wake.clear()
+                next_t = self._next(last)   # 周期変更を反映（計測はしない）
+
+    def set_scale(self, scale):
+        if scale != self.scale:
+            self.scale = self.collector.scale = scale
+            self._wake.set()
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def latency_stats(self):
+        """(最新, 平均, 最大) ms"""
+        lat = list(self.latency)
+        if not lat:
+            return (0.0, 0.0, 0.0)
+        return (lat[-1], sum(lat)/len(lat), max(lat))
+
+
+# ───────────── 記録／再生 ─────────────
+class Recorder:
+    """
+    Snapshot を固定長レコードで追記する（Sampler.listeners に登録して使う）。
+    ファイル = MAGIC(8B) + REC × N。gpu_util=None は NaN で保存。
+    """
+    MAGIC = b"TMREC\x00\x01\x00"
+    # ts, mono, cpu, ram_percent, ram_total, ram_available, gpu_util, vram_used, vram_total, net_down, net_up, latency_ms
+    REC = struct.Struct("<ddffQQfddddf")   # 80 B（件数・サイズの計算は REC.size から）
+
+    def __init__(self, path, flush_every=1):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f = open(path, "ab")
+        if new:
+            self.f.write(self.MAGIC)
+        self.flush_every = flush_every; self._n = 0
+        self._lock = threading.Lock()  # 書き込み（サンプラスレッド）と close（GUI）が競合しないように
+
+    def __call__(self, s: Snapshot):
+        with self._lock:
+            if self.f.closed:
+                return
+            self._write(s)
+
+    def _write(self, s):
+        self.f.write(self.REC.pack(
+            s.ts, s.mono, s.cpu, s.ram_percent, s.ram_total, s.ram_available,
+            math.nan if s.gpu_util is None else s.gpu_util,
+            s.vram_used, s.vram_total, s.net_down, s.net_up, s.latency_ms))
+        self._n += 1
+        if self._n % self.flush_every == 0:
+            self.f.flush()
+
+    def close(self):
+        with self._lock:
+            self.f.close()
+
+    @classmethod
+    def load(cls, path):
+        """記録ファイル → Provider 形式の dict のリスト（mono は元の値を "_mono" に残す）"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(cls.MAGIC):
+            raise ValueError(f"not a TaskMini recording: {path}")
+        body = data[len(cls.MAGIC):]
+        body = body[:len(body) - len(body) % cls.REC.size]  # 書きかけの末尾は捨てる
+        out = []
+        for (ts, mono, cpu, rp, rt, ra, gu, vu, vt, nd, nu, _lat) in cls.REC.iter_unpack(body):
+            out.append({"ts": ts, "_mono": mono, "cpu": cpu, "ram_percent": rp, "ram_total": rt,
+                        "ram_available": ra, "gpu_util": None if math.isnan(gu) else gu,
+                        "vram_used": vu, "vram_total": vt, "net_down": nd, "net_up": nu})
+        return out
+
+
+class ReplayProvider(Provider):
+    """
+    Recorder の記録を再生する（全項目を 1 つで埋める）。
+    speed=1.0 … 記録時と同じ間隔（1x）／speed=0 … 待たずに次々返す（負荷試験用）
+    """
+    name = "replay"
+    fields = tuple(DEFAULTS)
+
+    def __init__(self, path, speed=1.0, loop=True):
+        self.records = Recorder.load(path)
+        if not self.records:
+            raise ValueError(f"empty recording: {path}")
+        self.speed = speed; self.loop = loop
+        self.i = 0; self.finished = False
+        self._due = None; self._prev = None
+
+    def sample(self):
+        if self.i >= len(self.records):
+            if not self.loop:
+                self.finished = True
+                return {k: v for k, v in self.records[-1].items() if k != "_mono"}
+            self.i = 0; self._prev = None
+        rec = self.records[self.i]; self.i += 1
+        if self.speed > 0:
+            # 記録間隔どおりに待つ（追記で別セッションと繋がった箇所は 1 秒扱い）
+            gap = 0.0 if self._prev is None else rec["_mono"] - self._prev
+            if not 0.0 <= gap <= 60.0:
+                gap = 1.0
+            now = time.monotonic()
+            self._due = now if self._due is None else max(self._due + gap/self.speed, now - 1.0)
+            if self._due > now:
+                time.sleep(self._due - now)
+        self._prev = rec["_mono"]
+        return {k: v for k, v in rec.items() if k != "_mono"}
+
+
+# ───────────── CPU 名 ─────────────
+def cpu_name():
+    """レジストリ / /proc/cpuinfo から CPU 名を取得（取れなければ汎用表記）"""
+    try:
+        if sys.platform == "win32":
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DESCRIPTION\System\CentralProcessor\0")
+            name, _t = winreg.QueryValueEx(key, "ProcessorNameString")
+            return " ".join(str(name).split())
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "AMD Ryzen / Intel Core"
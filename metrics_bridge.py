@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+r"""
+Lively 壁紙向け ローカル計測ブリッジ（asyncio）
+
+  GET /metrics … 最新スナップショット JSON（ETag / If-None-Match → 304。ETag は表示する値のハッシュ）
+  GET /stream  … Server-Sent Events。サンプルごとに push
+
+サンプリングはクライアント数に関係なく 1 tick 1 回。
+JSON は tick ごとに 1 度だけシリアライズし、全クライアントで使い回す。
+--shm なら自分では計測せず、transparent_clock.py --shm が共有メモリに公開した値を読む（shm_metrics.py）。
+"""
+
+import sys, json, asyncio, hashlib, argparse, concurrent.futures
+
+from metrics import Collector, Snapshot, cpu_name
+import shm_metrics
+
+
+HOST, PORT = "127.0.0.1", 18080
+
+# 毎 tick 変わる付帯情報。ETag には含めない（弱い ETag：表示する値が同じなら 304）
+VOLATILE = ("ts", "latencyMs")
+
+CORS = (b"Access-Control-Allow-Origin: *\r\n"
+        b"Access-Control-Allow-Headers: If-None-Match\r\n"
+        b"Access-Control-Expose-Headers: ETag\r\n")
+
+
+# ───────────── Snapshot → Lively の updateUI(d) 形式 ─────────────
+def to_lively(s: Snapshot, static: dict) -> dict:
+    d = {
+        "cpu": {**static["cpu"], "usage": round(s.cpu, 1)},
+        "ram": {**static["ram"], "totalMB": round(s.ram_total/(1024**2)), "freeMB": round(s.ram_available/(1024**2)), "usagePct": round(s.ram_percent, 1)},
+        "gpu": {**static["gpu"], "usage": 0.0},
+        "net": {**static["net"], "name": s.net_iface or "--", "downBps": round(s.net_down), "upBps": round(s.net_up)},
+        "ts": s.ts, "latencyMs": round(s.latency_ms, 2),
+    }
+    if s.gpu_util is not None:
+        d["gpu"]["usage"] = round(min(s.gpu_util, 100.0), 1)
+        if s.vram_used > 0:
+            d["gpu"]["vramUsedMB"] = round(s.vram_used/(1024**2))
+        if s.vram_total > 0:
+            d["gpu"]["vramTotalMB"] = round(s.vram_total/(1024**2))
+    return d
+
+
+# ───────────── 計測ハブ（1 tick 1 サンプル） ─────────────
+class MetricsHub:
+    def __init__(self, interval=1.0, iface=None, shm=None):
+        self.interval = interval
+        self.seq = 0
+        self.body = b"{}"; self.etag = b'W/"0"'   # seq は SSE の id: だけに使う
+        self.subscribers: set[asyncio.Queue] = set()
+        # PDH クエリは専用スレッド 1 本からだけ触る
+        self._pool = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="sampler")
+
+        # shm … 共有メモリの名前（読むだけ。psutil / PDH は読まない。コア数はヘッダ、RAM 容量はレコードから）
+        if shm:
+            p = shm_metrics.ShmProvider(shm)
+            self.collector = Collector([p])
+            cores, threads = p.reader.cores or None, p.reader.threads or None
+        else:
+            import psutil
+            self.collector = Collector(iface=iface)
+            cores, threads = psutil.cpu_count(logical=False), psutil.cpu_count()
+        self.static = {
+            "cpu": {"name": cpu_name(), "cores": cores, "threads": threads},
+            "ram": {},
+            "gpu": {"name": "GPU"},
+            "net": {},
+        }
+
+    # スレッド側：計測して updateUI(d) が読む形の dict を作る
+    def collect(self):
+        return to_lively(self.collector.collect(), self.static)
+
+    def publish(self, d):
+        self.seq += 1
+        self.body = json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        shown = json.dumps({k: v for k, v in d.items() if k not in VOLATILE}, separators=(",", ":")).encode("utf-8")
+        self.etag = b'W/"%s"' % hashlib.blake2b(shown, digest_size=8).hexdigest().encode()
+        frame = b"id: %d\ndata: %s\n\n" % (self.seq, self.body)
+        for q in self.subscribers:
+            if q.full():  # 遅いクライアントは古いフレームを捨てる
+                q.get_nowait()
+            q.put_nowait(frame)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_t = loop.time()
+        while True:
+            try:
+                self.publish(await loop.run_in_executor(self._pool, self.collect))
+            except Exception as e:
+                print(f"[bridge] sample failed: {e!r}", file=sys.stderr)
+            # 処理時間に引きずられないよう絶対時刻で次 tick を決める
+            next_t += self.interval
+            now = loop.time()
+            if next_t < now:
+                next_t = now
+            await asyncio.sleep(next_t - now)
+
+
+# ───────────── HTTP（最小実装） ─────────────
+class BridgeServer:
+    def __init__(self, hub: MetricsHub):
+        self.hub = hub
+
+    async def handle(self, reader, writer):
+        try:
+            while True:  # keep-alive
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 30)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ver = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for l in lines[1:]:
+                    if ":" in l:
+                        k, v = l.split(":", 1); headers[k.strip().lower()] = v.strip()
+                path = target.split("?", 1)[0]
+
+                if method == "OPTIONS":
+                    self._respond(writer, b"204 No Content", b"")
+                elif method not in ("GET", "HEAD"):
+                    self._respond(writer, b"405 Method Not Allowed", b"")
+                elif path == "/metrics":
+                    hub = self.hub
+                    if headers.get("if-none-match", "").encode() == hub.etag:
+                        self._respond(writer, b"304 Not Modified", b"", etag=hub.etag)
+                    else:
+                        self._respond(writer, b"200 OK", hub.body if method == "GET" else b"",
+                                      ctype=b"application/json; charset=utf-8", etag=hub.etag,
+                                      length=len(hub.body))
+                elif path == "/stream" and method == "GET":
+                    await self._stream(writer)
+                    break
+                else:
+                    self._respond(writer, b"404 Not Found", b"")
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, status, body, ctype=b"text/plain", etag=None, length=None):
+        h = b"HTTP/1.1 " + status + b"\r\n" + CORS + b"Cache-Control: no-cache\r\n"
+        if etag:
+            h += b"ETag: " + etag + b"\r\n"
+        if status != b"304 Not Modified" and status != b"204 No Content":
+            h += b"Content-Type: " + ctype + b"\r\n"
+            h += b"Content-Length: %d\r\n" % (len(body) if length is None else length)
+        writer.write(h + b"\r\n" + body)
+
+    async def _stream(self, writer):
+        hub = self.hub
+        q: asyncio.Queue = asyncio.Queue(maxsize=4)
+        writer.write(b"HTTP/1.1 200 OK\r\n" + CORS +
+                     b"Content-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\n\r\n"
+                     b"retry: 2000\n\n")
+        if hub.seq:
+            writer.write(b"id: %d\ndata: %s\n\n" % (hub.seq, hub.body))
+        hub.subscribers.add(q)
+        try:
+            while True:
+                writer.write(await q.get())
+                await writer.drain()
+        finally:
+            hub.subscribers.discard(q)
+
+
+async def serve(host=HOST, port=PORT, interval=1.0, iface=None, shm=None):
+    hub = MetricsHub(interval, iface, shm)
+    server = await asyncio.start_server(BridgeServer(hub).handle, host, port)
+    print(f"[bridge] http://{host}:{port}/metrics  /stream", file=sys.stderr)
+    async with server:
+        await asyncio.gather(server.serve_forever(), hub.run())
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="TaskMini metrics bridge for Lively")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--interval", type=float, default=1.0, help="サンプリング周期（秒）")
+    ap.add_argument("--net-iface", metavar="NAME", help="ネットワークの IF（既定: 自動選択）")
+    ap.add_argument("--shm", nargs="?", const=shm_metrics.NAME, metavar="NAME",
+                    help="自分では計測せず、transparent_clock.py --shm の共有メモリを読む")
+    a = ap.parse_args()
+    try:
+        asyncio.run(serve(a.host, a.port, a.interval, a.net_iface, a.shm))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        sys.exit(f"[bridge] {e}")
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+メトリクスごとの移動統計としきい値アラート（Qt 非依存）
+Sampler.listeners に登録すると、1 サンプルごとに O(1)（ならし）で更新する。バッファの走査し直しなし。
+
+  ewma … 指数移動平均（時定数 tau 秒。サンプル間隔が変わっても同じ効き方）
+  peak … 窓内の最大（単調減少 deque。窓から出た先頭を捨てるだけ）
+  p95  … 窓内の 95 パーセンタイル（固定ビンのヒストグラム。窓から出たサンプルのビンを減らす。精度はビン幅）
+  Alert … on 以上が hold 秒続いたら発報、off 未満が clear 秒続いたら解除（ヒステリシス＋保持）
+
+  tracker = StatsTracker(); tracker.configure(cfg.panels); sampler.listeners.append(tracker)
+  tracker.latest["cpu"]   # Stat(ewma, peak, p95, alert)
+"""
+
+import math, bisect, threading, collections
+from typing import NamedTuple
+
+from selfstats import bucket_quantile
+
+
+# パネル → (Snapshot の項目名, ビンの境界)
+PERCENT_BOUNDS = tuple(range(1, 101))                          # 1% 刻み
+RATE_BOUNDS = tuple(1024*2**(k/4) for k in range(0, 4*24))      # bytes/s：1 KB/s から 2^(1/4) 倍ずつ（誤差 ±9%）
+METRICS = {"cpu": ("cpu", PERCENT_BOUNDS), "ram": ("ram_percent", PERCENT_BOUNDS),
+           "gpu": ("gpu_util", PERCENT_BOUNDS), "net": ("net_down", RATE_BOUNDS)}
+# 既定（パネル節の stats / ewma / alert / alert_off / alert_for で変更。alert = 0 で無効）
+WINDOW = 60          # 秒
+TAU = 10.0           # 秒
+ALERTS = {"cpu": 90.0, "ram": 90.0, "gpu": 95.0}   # 値の単位（%）。net は既定なし
+ALERT_FOR = 30.0     # 秒
+CLEAR_FOR = 10.0     # 秒（off 未満がこれだけ続いたら解除）
+HYSTERESIS = 0.9     # alert_off の既定 = alert × これ
+
+
+class Ewma:
+    __slots__ = ("tau", "value", "t")
+
+    def __init__(self, tau=TAU):
+        self.tau = tau; self.value = None; self.t = 0.0
+
+    def push(self, t, v):
+        if self.value is None:
+            self.value = v
+        else:
+            self.value += (1 - math.exp(-max(t - self.t, 0.0)/self.tau))*(v - self.value)
+        self.t = t
+        return self.value
+
+
+class WindowMax:
+    """窓（秒）内の最大。deque は値の単調減少列（後から来た大きい値が前の小さい値を追い出す）"""
+    __slots__ = ("window", "q")
+
+    def __init__(self, window=WINDOW):
+        self.window = window; self.q = collections.deque()
+
+    def push(self, t, v):
+        q = self.q
+        while q and q[-1][1] <= v:
+            q.pop()
+        q.append((t, v))
+        while q[0][0] <= t - self.window:
+            q.popleft()
+        return q[0][1]
+
+
+class WindowHistogram:
+    """窓（秒）内の分布を固定ビンで。quantile はビン内を線形補間（selfstats.bucket_quantile）"""
+    __slots__ = ("window", "bounds", "counts", "q")
+
+    def __init__(self, window=WINDOW, bounds=PERCENT_BOUNDS):
+        self.window = window; self.bounds = tuple(bounds)
+        self.counts = [0]*(len(self.bounds) + 1)   # 最後は上限超え
+        self.q = collections.deque()               # (t, ビン番号)
+
+    def push(self, t, v):
+        i = bisect.bisect_left(self.bounds, v)
+        self.counts[i] += 1; self.q.append((t, i))
+        q = self.q
+        while q[0][0] <= t - self.window:
+            self.counts[q.popleft()[1]] -= 1
+
+    def quantile(self, p):
+        return bucket_quantile(self.bounds, self.counts, len(self.q), p)
+
+
+class Alert:
+    """
+    on 以上が hold 秒続いたら active、off（< on）未満が clear 秒続いたら解除。途中で条件が崩れたら計時し直し。
+    発報と解除のしきい値を離してあるので、しきい値付近のばたつきでは点滅しない
+    """
+    __slots__ = ("on", "off", "hold", "clear", "active", "since")
+
+    def __init__(self, on, off=None, hold=ALERT_FOR, clear=CLEAR_FOR):
+        self.on = on; self.off = on*HYSTERESIS if off is None else off
+        self.hold, self.clear = hold, clear
+        self.active = False; self.since = None   # 状態を変える条件が成り立ち始めた時刻
+
+    def push(self, t, v):
+        if not (v < self.off if self.active else v >= self.on):
+            self.since = None
+            return self.active
+        if self.since is None:
+            self.since = t
+        if t - self.since >= (self.clear if self.active else self.hold):
+            self.active = not self.active; self.since = None
+        return self.active
+
+
+class Stat(NamedTuple):
+    ewma: float
+    peak: float
+    p95: float
+    alert: bool
+    window: int    # 秒
+
+
+class MetricStats:
+    """1 系列分。push(t, v) → Stat"""
+    def __init__(self, window=WINDOW, tau=TAU, bounds=PERCENT_BOUNDS, alert: Alert|None=None):
+        self.window = window
+        self.ewma = Ewma(tau); self.peak = WindowMax(window); self.hist = WindowHistogram(window, bounds)
+        self.alert = alert
+
+    def push(self, t, v) -> Stat:
+        e = self.ewma.push(t, v); m = self.peak.push(t, v); self.hist.push(t, v)
+        a = self.alert.push(t, v) if self.alert is not None else False
+        return Stat(e, m, min(self.hist.quantile(0.95), m), a, self.window)   # ビン幅で最大を超えないように
+
+
+def spec_for(panel, opts) -> tuple:
+    """パネル節の設定 → (window, tau, alert, alert_off, alert_for)。同じなら作り直さない"""
+    on = opts.get("alert", ALERTS.get(panel, 0.0))
+    return (opts.get("stats", WINDOW), opts.get("ewma", TAU), on, opts.get("alert_off"), opts.get("alert_for", ALERT_FOR))
+
+
+class StatsTracker:
+    """
+    Sampler.listeners 用。パネルごとの MetricStats をサンプラスレッドで更新し、
+    結果は self.latest（{パネル: Stat}。参照の差し替えのみ＝ロック不要）で GUI へ渡す。
+    None の値（GPU 非対応）と、周期外で前回値を引き継いだだけの値（Snapshot.fresh に無い）は入れない
+    （RAM 5 秒周期の値を毎秒数えると p95 が偏り、アラートの計時もサンプル周期で変わるので）。
+    configure（GUI スレッド、設定の再読み込み）と __call__（サンプラスレッド）はロックで排他
+    （作り直した系列の古い Stat を __call__ が latest に書き戻さないように）。
+    """
+    def __init__(self, panels: dict|None=None):
+        self.metrics: dict[str, tuple] = {}    # {パネル: (項目名, spec, MetricStats)}
+        self.latest: dict[str, Stat] = {}
+        self._lock = threading.Lock()
+        self.configure(panels or {})
+
+    def configure(self, panels: dict):
+        """設定（LayoutConfig.panels）を反映。spec が変わった系列だけ作り直す（統計はリセット）"""
+        with self._lock:
+            out = {}; rebuilt = set()
+            for panel, (field, bounds) in METRICS.items():
+                spec = spec_for(panel, panels.get(panel, {}))
+                cur = self.metrics.get(panel)
+                if cur is not None and cur[1] == spec:
+                    out[panel] = cur; continue
+                window, tau, on, off, hold = spec
+                alert = Alert(on, off, hold) if on > 0 else None
+                out[panel] = (field, spec, MetricStats(window, tau, bounds, alert)); rebuilt.add(panel)
+            self.metrics = out
+            self.latest = {p: s for p, s in self.latest.items() if p not in rebuilt}
+
+    def __call__(self, snap):
+        with self._lock:
+            latest = {}; prev = self.latest; fresh = snap.fresh
+            for panel, (field, _spec, ms) in self.metrics.items():
+                v = getattr(snap, field)
+                if v is None:
+                    continue
+                if fresh is None or field in fresh:
+                    latest[panel] = ms.push(snap.mono, v)
+                elif panel in prev:
+                    latest[panel] = prev[panel]
+            self.latest = latest
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+ダッシュボード自身の計測値（Qt 非依存）
+描画時間・更新時間・Provider の収集時間をヒストグラムで、再描画回数をカウンタで持ち、
+プロセス自身の CPU / RSS と合わせて Prometheus テキスト / JSON で書き出す。
+
+  family（系列）と label（widget / source 名）の 2 段で管理する：
+    paint   … ウィジェットクラス別の paintEvent 時間（ms）
+    update  … update_all() の内訳（cpu / ram / gpu / net / clock）
+    collect … Provider 別の収集時間（gpu = GPUMonitor.read()）
+    paints  … 再描画回数（カウンタ）
+"""
+
+import os, sys, json, time, bisect, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ヒストグラムの上限（ms）
+BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Prometheus の名前・ラベル名・説明
+FAMILIES = {
+    "paint":   ("taskmini_paint_seconds", "widget", "paintEvent duration per widget class"),
+    "update":  ("taskmini_update_seconds", "source", "update_all() duration per metric source"),
+    "collect": ("taskmini_collect_seconds", "source", "provider sample duration (gpu = GPUMonitor.read)"),
+    "paints":  ("taskmini_paints_total", "widget", "repaints per widget class"),
+}
+
+
+def bucket_quantile(bounds, counts, n, q):
+    """
+    固定バケットの分布から q 分位をバケット内の線形補間で推定（Prometheus の histogram_quantile と同じ考え方）。
+    counts は len(bounds) + 1 個（最後は上限超え。上限超えに当たったら bounds[-1]）、n = counts の合計
+    """
+    if not n:
+        return 0.0
+    rank = q*n; acc = 0
+    for i, c in enumerate(counts):
+        if acc + c >= rank and c:
+            lo = bounds[i-1] if i > 0 else 0.0
+            hi = bounds[i] if i < len(bounds) else bounds[-1]
+            return lo + (hi - lo)*(rank - acc)/c
+        acc += c
+    return bounds[-1]
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "n")
+
+    def __init__(self, bounds=BOUNDS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0]*(len(self.bounds)+1)   # 最後は +Inf
+        self.sum = 0.0; self.n = 0
+
+    def observe(self, v):
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum += v; self.n += 1
+
+    def quantile(self, q):
+        return bucket_quantile(self.bounds, self.counts, self.n, q)
+
+    def to_dict(self):
+        return {"count": self.n, "sum_ms": round(self.sum, 3), "mean_ms": round(self.sum/self.n, 3) if self.n else 0.0,
+                "p50_ms": round(self.quantile(0.5), 3), "p99_ms": round(self.quantile(0.99), 3),
+                "buckets": dict(zip([str(b) for b in self.bounds] + ["+Inf"], self.counts))}
+
+
+class SelfStats:
+    """
+    observe(family, label, ms) … ヒストグラムへ
+    count(family, label, n)    … カウンタへ
+    process()                  … 自プロセスの CPU% / CPU 秒 / RSS（psutil は初回に読み込む）
+    書き込みはサンプラスレッド（collect）と GUI スレッド、読み出しは GUI と HTTP スレッドから来るので、
+    キーの追加と一覧の取り出し（hist_items / counter_items）はロックの中で
+    """
+    def __init__(self, bounds=BOUNDS_MS):
+        self.bounds = bounds
+        self.hists: dict[tuple[str, str], Histogram] = {}
+        self.counters: dict[tuple[str, str], int] = {}
+        self.started = time.time()
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def observe(self, family, label, ms):
+        with self._lock:
+            h = self.hists.get((family, label))
+            if h is None:
+                h = self.hists[(family, label)] = Histogram(self.bounds)
+            h.observe(ms)
+
+    def count(self, family, label, n=1):
+        with self._lock:
+            self.counters[(family, label)] = self.counters.get((family, label), 0) + n
+
+    def hist(self, family, label):
+        return self.hists.get((family, label))
+
+    def hist_items(self):
+        """[((family, label), Histogram)] の写し（キー順）"""
+        with self._lock:
+            return sorted(self.hists.items())
+
+    def counter_items(self):
+        with self._lock:
+            return sorted(self.counters.items())
+
+    def process(self):
+        if self._proc is None:
+            import psutil
+            self._proc = psutil.Process(); self._proc.cpu_percent()
+        p = self._proc
+        with p.oneshot():
+            t = p.cpu_times(); rss = p.memory_info().rss; cpu = p.cpu_percent()
+        return {"cpu_percent": cpu, "cpu_seconds": t.user + t.system, "rss_bytes": rss}
+
+    # ───── 書き出し ─────
+    def to_dict(self):
+        out = {"uptime_s": round(time.time() - self.started, 1), "process": self.process()}
+        for (fam, label), h in self.hist_items():
+            out.setdefault(fam, {})[label] = h.to_dict()
+        for (fam, label), n in self.counter_items():
+            out.setdefault(fam, {})[label] = n
+        return out
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    def to_prometheus(self):
+        lines = []
+        by_family: dict[str, list] = {}
+        for (fam, label), h in self.hist_items():
+            by_family.setdefault(fam, []).append((label, h))
+        for fam, items in by_family.items():
+            name, key, help_ = FAMILIES.get(fam, (f"taskmini_{fam}_seconds", "label", fam))
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+            for label, h in items:
+                acc = 0
+                for b, c in zip(list(h.bounds) + [None], h.counts):
+                    acc += c
+                    le = "+Inf" if b is None else f"{b/1e3:g}"
+                    lines.append(f'{name}_bucket{{{key}="{label}",le="{le}"}} {acc}')
+                lines.append(f'{name}_sum{{{key}="{label}"}} {h.sum/1e3:.6f}')
+                lines.append(f'{name}_count{{{key}="{label}"}} {h.n}')
+        by_family = {}
+        for (fam, label), n in self.counter_items():
+            by_family.setdefault(fam, []).append((label, n))
+        for fam, items in by_family.items():
+            name, key, help_ = FAMILIES.get(fam, (f"taskmini_{fam}_total", "label", fam))
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{{key}="{label}"}} {n}' for label, n in items]
+        p = self.process()
+        lines += ["# TYPE taskmini_process_cpu_seconds_total counter",
+                  f"taskmini_process_cpu_seconds_total {p['cpu_seconds']:.3f}",
+                  "# TYPE taskmini_process_cpu_percent gauge",
+                  f"taskmini_process_cpu_percent {p['cpu_percent']:.1f}",
+                  "# TYPE taskmini_process_resident_memory_bytes gauge",
+                  f"taskmini_process_resident_memory_bytes {p['rss_bytes']}"]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """拡張子 .json なら JSON、それ以外は Prometheus テキスト（node_exporter の textfile 形式）"""
+        text = self.to_json() if path.lower().endswith(".json") else self.to_prometheus()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)   # 読み手が書きかけを見ないように
+
+
+def serve(stats: SelfStats, host="127.0.0.1", port=18081):
+    """GET /metrics（Prometheus）と /metrics.json をデーモンスレッドで返す"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, ctype = stats.to_prometheus().encode(), "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body, ctype = stats.to_json().encode(), "application/json"
+            else:
+                self.send_error(404); return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    try:
+        httpd = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:   # ポート使用中など。ダッシュボードはそのまま動かす
+        print(f"[selfstats] cannot listen on {host}:{port}: {e}", file=sys.stderr)
+        return None
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="selfstats-http", daemon=True).start()
+    print(f"[selfstats] http://{host}:{port}/metrics", file=sys.stderr)
+    return httpd
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+計測値の共有メモリ公開（Qt 非依存）
+計測するプロセス（transparent_clock.py --shm）が 1 つだけ Snapshot を書き、
+ダッシュボード・metrics_bridge.py・CLI は読むだけ（psutil / PDH を読まない。シリアライズなし）。
+
+レイアウト（リトルエンディアン。全項目 8 B 境界）：
+  [0, 64)      ヘッダ  HEADER = magic "TMSHM\\0\\1\\0", version, rec_size, capacity, pid,
+                        seq（seqlock。奇数 = 書き込み中）, count（書いたレコード数）, heartbeat（最後に書いた time.time()）,
+                        cores, threads（物理コア・論理プロセッサ数。u16、0 = 不明。読み手が psutil を読まずに済むように）
+  [64, ...)    リング  REC × capacity。n 件目（1 始まり）は (n-1) % capacity 番目。最新 = count 件目
+  REC = seq, ts, mono, cpu, ram_percent, ram_total, ram_available, gpu_util（NaN = 非対応）,
+        vram_used, vram_total, net_down, net_up, latency_ms,
+        fresh（その回に読み直した項目。FIELDS の i 番目 = bit i）, net_iface（16 B、NUL 詰め。UTF-8 の文字境界で切る）
+  上位プロセス（top_*）は載せない
+
+seqlock：書き手は seq を奇数にしてからレコード・count・heartbeat を書き、偶数に戻す。
+読み手は seq が偶数で前後とも同じ値だったときだけ読んだ内容を使う（書き手を待たせない。読み手同士も独立）。
+
+  pub = ShmPublisher(); sampler.listeners.append(pub)        # 書き手（1 つだけ）
+  r = ShmReader(); r.latest()                                 # → metrics.Snapshot
+  r.history(600)                                              # 直近 600 件（numpy があれば構造化配列）
+  Collector([ShmProvider()])                                  # 書き手が止まったら既定値に戻す（読み手のダッシュボード）
+
+  python shm_metrics.py                     # 最新値
+  python shm_metrics.py --history 60 --format csv
+  python shm_metrics.py --watch 1
+"""
+
+import os, sys, json, math, time, struct, argparse, threading
+from multiprocessing import shared_memory
+
+from metrics import Provider, Snapshot, DEFAULTS
+
+NAME = "taskmini_metrics"
+HISTORY = 3600                 # リングの件数（1 秒 1 件で 1 時間）
+MAGIC = b"TMSHM\x00\x01\x00"
+VERSION = 2
+HEADER = struct.Struct("<8sIIIIQQdHH12x") # 64 B
+SEQ_OFFSET = 8 + 4*4                      # ヘッダ内の seq の位置（count, heartbeat が続く）
+STAMP = struct.Struct("<QQd")             # seq, count, heartbeat
+FIELDS = ("seq", "ts", "mono", "cpu", "ram_percent", "ram_total", "ram_available", "gpu_util",
+          "vram_used", "vram_total", "net_down", "net_up", "latency_ms", "fresh", "net_iface")
+REC = struct.Struct("<QddddQQddddddQ16s") # 128 B
+ALL_FRESH = (1 << len(FIELDS)) - 1
+STALE = 10.0                              # heartbeat がこれより古ければ書き手は止まっている扱い（秒）
+
+_PUBLISHED: set[str] = set()              # このプロセスで書いている名前
+
+
+def numpy_dtype():
+    """REC と同じ並びの numpy 構造化 dtype（np.frombuffer でリングをそのまま見る）"""
+    import numpy as np
+    kinds = {"Q": "<u8", "d": "<f8"}
+    return np.dtype([(f, kinds[c]) for f, c in zip(FIELDS, REC.format[1:-3])] + [("net_iface", "S16")])
+
+
+def size_for(capacity) -> int:
+    return HEADER.size + REC.size*capacity
+
+
+def _iface_bytes(name: str) -> bytes:
+    """net_iface を 16 B 以内に（UTF-8 の文字の途中では切らない）"""
+    b = name.encode("utf-8")
+    return b if len(b) <= 16 else b[:16].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _cpu_counts() -> tuple[int, int]:
+    """(物理コア, 論理プロセッサ)。書き手がヘッダに書く"""
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or 0, psutil.cpu_count() or 0
+    except ImportError:
+        return 0, os.cpu_count() or 0
+
+
+def _alive(pid) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        return True
+
+
+def _attach(name) -> shared_memory.SharedMemory:
+    """読み手として開く。POSIX では resource_tracker に登録させない（終了時に書き手の領域を消してしまうので）"""
+    try:
+        return shared_memory.SharedMemory(name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name)
+    if os.name == "posix" and name not in _PUBLISHED:   # 同じプロセスの書き手の登録は残す
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+# ───────────── 書き手 ─────────────
+class ShmPublisher:
+    """
+    Sampler.listeners 用（サンプラスレッドから呼ばれる）。同じ名前の領域が生きた書き手のものなら RuntimeError。
+    前の書き手が落ちて残った領域（POSIX）は消して作り直す。close() で削除。
+    """
+    def __init__(self, name=NAME, capacity=HISTORY):
+        self.name, self.capacity = name, capacity
+        if name in _PUBLISHED:
+            raise RuntimeError(f"shared memory {name!r} is already published by this process")
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size_for(capacity))
+        except FileExistsError:
+            old = _attach(name)
+            try:
+                magic, _v, _rs, cap, pid, *_ = HEADER.unpack_from(old.buf)
+                if magic == MAGIC and _alive(pid):
+                    raise RuntimeError(f"shared memory {name!r} is already published by pid {pid}")
+            finally:
+                old.close()
+            # 残骸を消して作り直す（サイズが違うことがある）
+            with_tracker = shared_memory.SharedMemory(name)
+            with_tracker.unlink(); with_tracker.close()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size_for(capacity))
+        _PUBLISHED.add(name)
+        self._lock = threading.Lock()   # 書き込み（サンプラスレッド）と close（GUI）が競合しないように
+        self.buf = self.shm.buf
+        self.seq = 0; self.count = 0
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, REC.size, capacity, os.getpid(), 0, 0, 0.0,
+                         *(min(c, 0xFFFF) for c in _cpu_counts()))
+
+    def __call__(self, s: Snapshot):
+        with self._lock:
+            if self.buf is not None:
+                self._write(self.buf, s)
+
+    def _write(self, buf, s):
+        self.count += 1
+        # seq を奇数に → 中身 → 偶数に。読み手はこの間に読んだものを捨てる
+        fresh = ALL_FRESH if s.fresh is None else sum(1 << i for i, f in enumerate(FIELDS) if f in s.fresh)
+        self.seq += 1; struct.pack_into("<Q", buf, SEQ_OFFSET, self.seq)
+        REC.pack_into(buf, HEADER.size + REC.size*((self.count - 1) % self.capacity),
+                      s.seq, s.ts, s.mono, s.cpu, s.ram_percent, s.ram_total, s.ram_available,
+                      math.nan if s.gpu_util is None else s.gpu_util, s.vram_used, s.vram_total,
+                      s.net_down, s.net_up, s.latency_ms, fresh, _iface_bytes(s.net_iface))
+        self.seq += 1; STAMP.pack_into(buf, SEQ_OFFSET, self.seq, self.count, time.time())
+
+    def close(self):
+        with self._lock:
+            if self.buf is None:
+                return
+            self.buf = None
+        _PUBLISHED.discard(self.name)
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ───────────── 読み手 ─────────────
+class ShmReader:
+    """
+    読むだけ（書き手を待たせない）。領域が無ければ FileNotFoundError、形式が違えば ValueError。
+    latest() / history() は seqlock で一貫した内容だけを返す。ring() はコピーなしの numpy ビュー（一貫性は呼び手が seq で確かめる）
+    """
+    RETRY = 0.1   # 書き込み中に当たり続けたら諦めるまでの秒数（書き手が書きかけで落ちた場合）
+
+    def __init__(self, name=NAME):
+        self.name = name
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, rec_size, self.capacity, self.pid, _seq, _count, _hb, self.cores, self.threads = \
+            HEADER.unpack_from(self.buf)
+        if magic != MAGIC or version != VERSION or rec_size != REC.size:
+            self.close()
+            raise ValueError(f"shared memory {name!r}: not a TaskMini metrics segment (version {version})")
+
+    def stamp(self):
+        """(seq, count, heartbeat)"""
+        return STAMP.unpack_from(self.buf, SEQ_OFFSET)
+
+    def stale(self, now=None) -> bool:
+        return (now or time.time()) - self.stamp()[2] > STALE
+
+    def _read(self, fn):
+        deadline = None
+        while True:
+            s1, count, _hb = STAMP.unpack_from(self.buf, SEQ_OFFSET)
+            if not s1 & 1:
+                out = fn(count)
+                if STAMP.unpack_from(self.buf, SEQ_OFFSET)[0] == s1:
+                    return out
+            now = time.monotonic()
+            deadline = deadline or now + self.RETRY
+            if now > deadline:
+                raise TimeoutError(f"shared memory {self.name!r}: writer stuck mid-update")
+            time.sleep(0)
+
+    def _offset(self, n):
+        return HEADER.size + REC.size*((n - 1) % self.capacity)
+
+    def record(self) -> dict | None:
+        """最新レコード（dict。まだ 1 件も無ければ None）"""
+        def read(count):
+            return REC.unpack_from(self.buf, self._offset(count)) if count else None
+        rec = self._read(read)
+        if rec is None:
+            return None
+        d = dict(zip(FIELDS, rec))
+        d["gpu_util"] = None if math.isnan(d["gpu_util"]) else d["gpu_util"]
+        d["net_iface"] = d["net_iface"].rstrip(b"\x00").decode("utf-8", "replace")
+        return d
+
+    def latest(self) -> Snapshot | None:
+        d = self.record()
+        if d is None:
+            return None
+        d["fresh"] = frozenset(f for i, f in enumerate(FIELDS) if d["fresh"] >> i & 1)
+        return Snapshot(**d)
+
+    def history(self, n=None):
+        """直近 n 件（古い順）。numpy があれば構造化配列（コピー）、無ければ dict のリスト"""
+        def read(count):
+            k = min(count, self.capacity, n or self.capacity)
+            if not k:
+                return b""
+            # リングの折り返しで最大 2 区間。bytes にコピーしてから解釈する
+            a, b = self._offset(count - k + 1), self._offset(count) + REC.size
+            if b > a:
+                return bytes(self.buf[a:b])
+            return bytes(self.buf[a:size_for(self.capacity)]) + bytes(self.buf[HEADER.size:b])
+        raw = self._read(read)
+        try:
+            import numpy as np
+        except ImportError:
+            return [dict(zip(FIELDS, r)) for r in REC.iter_unpack(raw)]
+        return np.frombuffer(raw, dtype=numpy_dtype())
+
+    def ring(self):
+        """リング全体の numpy ビュー（コピーなし。並びは書いた順ではない：n 件目は (n-1) % capacity）"""
+        import numpy as np
+        return np.frombuffer(self.buf, dtype=numpy_dtype(), count=self.capacity, offset=HEADER.size)
+
+    def close(self):
+        # numpy のビューが残っていると閉じられない（BufferError）。そのときは GC に任せる
+        self.buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+
+
+class ShmProvider(Provider):
+    """
+    共有メモリの最新値を返す Provider（全項目を 1 つで埋める。上位プロセスは無し）。
+    Collector([ShmProvider()]) で、ダッシュボードが自分では計測せずに書き手の値を表示する。
+      新しいレコードが無ければ {}（前回値を引き継ぐ）。返すのは書き手がその回に読み直した項目だけ（fresh）
+      heartbeat が STALE 秒より古い（書き手が止まった・落ちた）ときは既定値に戻し、同じ名前で開き直しを試す
+      （書き手が起動し直すと領域は作り直されるので、古い方を見続けないように）
+    """
+    name = "shm"
+    fields = tuple(f for f in DEFAULTS if not f.startswith("top_"))
+
+    def __init__(self, name=NAME):
+        self.shm_name = name
+        self.reader = ShmReader(name)
+        self.last = None        # 最後に返したレコードの seq
+        self.stopped = False
+
+    def _reattach(self) -> bool:
+        try:
+            r = ShmReader(self.shm_name)
+        except (OSError, ValueError):
+            return False
+        if r.stale():
+            r.close(); return False
+        self.reader.close(); self.reader = r; self.last = None
+        return True
+
+    def sample(self):
+        if self.reader.stale() and not self._reattach():
+            if self.stopped:
+                return {}
+            self.stopped = True
+            print(f"[shm] {self.shm_name!r}: writer (pid {self.reader.pid}) stopped; showing defaults", file=sys.stderr)
+            return {f: DEFAULTS[f] for f in self.fields}
+        if self.stopped:
+            self.stopped = False
+            print(f"[shm] {self.shm_name!r}: writer (pid {self.reader.pid}) is back", file=sys.stderr)
+        try:
+            d = self.reader.record()
+        except TimeoutError:    # 書きかけ（落ちたなら次から stale になる）
+            return {}
+        if d is None or d["seq"] == self.last:
+            return {}
+        first = self.last is None
+        self.last = d["seq"]
+        mask = ALL_FRESH if first else d["fresh"]   # 最初の 1 件は全項目（引き継ぐ前回値が無い）
+        out = {f: d[f] for i, f in enumerate(FIELDS) if mask >> i & 1 and f in self.fields}
+        out["ts"] = d["ts"]
+        return out
+
+
+# ───────────── CLI ─────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="TaskMini shared-memory metrics reader")
+    ap.add_argument("--name", default=NAME, help=f"共有メモリ名（既定 {NAME}）")
+    ap.add_argument("--history", type=int, metavar="N", help="直近 N 件を出す（既定: 最新 1 件）")
+    ap.add_argument("--watch", type=float, metavar="SEC", help="SEC 秒ごとに最新値を出し続ける")
+    ap.add_argument("--format", choices=("json", "csv"), default="json")
+    a = ap.parse_args(argv)
+    try:
+        r = ShmReader(a.name)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[shm] {e}", file=sys.stderr)
+        return 1
+    cols = FIELDS[1:]
+
+    def out(rows):
+        for d in rows:
+            if isinstance(d.get("net_iface"), bytes):
+                d["net_iface"] = d["net_iface"].rstrip(b"\x00").decode("utf-8", "replace")
+            # NaN / inf（GPU 非対応など）は空欄・null に（JSON に NaN は書けない）
+            row = {c: None if isinstance(d[c], float) and not math.isfinite(d[c]) else d[c] for c in cols}
+            if a.format == "csv":
+                print(",".join("" if v is None else str(v) for v in row.values()))
+            else:
+                print(json.dumps(row, allow_nan=False))
+
+    if a.format == "csv":
+        print(",".join(cols))
+    try:
+        if a.history:
+            h = r.history(a.history)
+            out(h if isinstance(h, list) else [dict(zip(h.dtype.names, row.tolist())) for row in h])
+            return 0
+        last = None; warned = False
+        while True:
+            d = r.record()
+            if d is not None and d["seq"] != last:
+                last = d["seq"]; out([d])
+            if r.stale() and not warned:
+                warned = True
+                print(f"[shm] writer (pid {r.pid}) has not updated for {STALE:.0f}s", file=sys.stderr)
+            if not a.watch:
+                return 0 if d is not None else 1
+            time.sleep(a.watch)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        r.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
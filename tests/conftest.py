@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+# リポジトリ直下のモジュール（metrics.py など）と tests/ の偽モジュールを import できるように
+import os, sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+sys.path.insert(0, here)   # fake_win32pdh
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+win32pdh の偽物（GPUMonitor に pdh= で渡す）。ワイルドカードのカウンタを GetFormattedCounterArray で返すだけ。
+  pdh = make(arrays={GPUMonitor.ENGINE_PATH: {インスタンス名: 値}, ...}, english=True, missing=())
+    english=False … AddEnglishCounter が無い（古い pywin32）
+    missing       … 登録できない（error を投げる）カウンタのパス
+"""
+
+import types
+
+PDH_FMT_DOUBLE = 0x200
+
+
+class error(Exception):
+    pass
+
+
+def make(arrays, english=True, missing=()):
+    m = types.ModuleType("win32pdh")
+    m.error = error; m.PDH_FMT_DOUBLE = PDH_FMT_DOUBLE
+    m.arrays = arrays; m.added = []; m.collected = 0; m.closed = []
+
+    def OpenQuery():
+        return object()
+
+    def CloseQuery(q):
+        m.closed.append(q)
+
+    def add(kind):
+        def AddCounter(query, path):
+            if path in missing:
+                raise error(f"counter not found: {path}")
+            m.added.append((kind, path))
+            return path
+        return AddCounter
+
+    def CollectQueryData(query):
+        m.collected += 1
+
+    def GetFormattedCounterArray(counter, fmt):
+        assert fmt == PDH_FMT_DOUBLE
+        if counter not in m.arrays:
+            raise error(f"no data: {counter}")
+        return dict(m.arrays[counter])
+
+    m.OpenQuery = OpenQuery; m.CloseQuery = CloseQuery; m.AddCounter = add("local")
+    m.CollectQueryData = CollectQueryData; m.GetFormattedCounterArray = GetFormattedCounterArray
+    if english:
+        m.AddEnglishCounter = add("english")
+    return m
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""GPUMonitor / aggregate_engines を偽の win32pdh（tests/fake_win32pdh.py）で確かめる（Windows 不要）"""
+
+import pytest
+
+import metrics
+from metrics import GPUMonitor, NullGpu
+import fake_win32pdh
+
+A = "0x00000000_0x0000A001"   # アダプタ A（luid）
+B = "0x00000000_0x0000B002"   # アダプタ B
+
+
+def eng(pid, luid, eng_no, etype, phys=0):
+    return f"pid_{pid}_luid_{luid}_phys_{phys}_eng_{eng_no}_engtype_{etype}"
+
+
+ENGINES = {
+    eng(10, A, 0, "3D"): 30.0, eng(11, A, 0, "3D"): 25.0,    # 同じエンジン → 合算 55
+    eng(12, A, 1, "3D"): 40.0,                               # 別エンジンの 3D → 種類は最大の 55
+    eng(10, A, 2, "VideoDecode"): 70.0,
+    eng(13, A, 3, "Copy"): 45.0, eng(14, A, 3, "Copy"): 20.0,  # 65
+    eng(20, B, 0, "3D"): 10.0,
+    eng(21, B, 1, "Compute"): 0.0,                           # 0 は数えない
+    "_Total": 99.0,                                          # 形式の違うインスタンスは無視
+}
+USAGE = {f"luid_{A}_phys_0": 1.5e9, f"luid_{A}_phys_1": 1.0e9, f"luid_{B}_phys_0": 0.5e9}
+LIMIT = {f"luid_{A}_phys_0": 8e9, f"luid_{B}_phys_0": 4e9}
+
+
+def pdh(**kw):
+    return fake_win32pdh.make({GPUMonitor.ENGINE_PATH: ENGINES, GPUMonitor.USAGE_PATH: USAGE,
+                               GPUMonitor.LIMIT_PATH: LIMIT}, **kw)
+
+
+def test_aggregate_engines():
+    g = metrics.aggregate_engines(ENGINES)
+    assert g["engines"] == {"3D": 55.0, "VideoDecode": 70.0, "Copy": 65.0}
+    assert g["adapters"] == {A: 70.0, B: 10.0}
+    assert g["util"] == 70.0
+    assert g["pids"] == {10: 70.0, 11: 25.0, 12: 40.0, 13: 45.0, 14: 20.0, 20: 10.0}
+
+
+def test_aggregate_engines_clamps_shared_engine():
+    g = metrics.aggregate_engines({eng(1, A, 0, "3D"): 80.0, eng(2, A, 0, "3D"): 50.0, eng(3, A, 1, ""): 5.0})
+    assert g["engines"] == {"3D": 100.0, "Other": 5.0}
+    assert g["util"] == 100.0
+
+
+def test_aggregate_adapters_by_luid():
+    assert metrics.aggregate_adapters(USAGE) == {A: 2.5e9, B: 0.5e9}
+
+
+def test_gpu_monitor_sample():
+    m = pdh()
+    g = GPUMonitor(m)
+    assert {k for k, _ in m.added} == {"english"}
+    assert m.collected == 1   # 初回の空打ち
+    assert g.sample() == {"gpu_util": 70.0, "vram_used": 3.0e9, "vram_total": 12e9}
+    assert g.last["adapters"] == {A: 70.0, B: 10.0}
+    assert g.last["vram_by_adapter"] == {A: 2.5e9, B: 0.5e9}
+    assert g.last["pids"][10] == 70.0
+
+
+def test_add_counter_fallback():
+    m = pdh(english=False)
+    assert GPUMonitor(m).sample()["gpu_util"] == 70.0
+    assert [k for k, _ in m.added] == ["local"]*3
+
+
+def test_add_english_counter_error_falls_back():
+    m = pdh()
+    def fail(query, path):
+        raise fake_win32pdh.error("english name not registered")
+    m.AddEnglishCounter = fail
+    GPUMonitor(m)
+    assert [k for k, _ in m.added] == ["local"]*3
+
+
+def test_missing_limit_counter():
+    g = GPUMonitor(pdh(missing=(GPUMonitor.LIMIT_PATH,)))
+    assert g.limit_counter is None
+    assert g.sample() == {"gpu_util": 70.0, "vram_used": 3.0e9, "vram_total": 0}
+
+
+def test_missing_counters_fall_back_to_null_gpu(monkeypatch):
+    m = pdh(missing=(GPUMonitor.ENGINE_PATH, GPUMonitor.USAGE_PATH, GPUMonitor.LIMIT_PATH))
+    with pytest.raises(RuntimeError):
+        GPUMonitor(m)
+    assert len(m.closed) == 1
+    monkeypatch.setattr(metrics, "_win32pdh", lambda: m)
+    p = metrics.make_provider("gpu")
+    assert isinstance(p, NullGpu) and p.sample() == {"gpu_util": None}
+
+
+def test_make_provider_uses_pdh(monkeypatch):
+    monkeypatch.setattr(metrics, "_win32pdh", lambda: pdh())
+    p = metrics.make_provider("gpu")
+    assert isinstance(p, GPUMonitor) and p.sample()["gpu_util"] == 70.0
+    monkeypatch.setattr(metrics, "_win32pdh", lambda: None)
+    assert isinstance(metrics.make_provider("gpu"), NullGpu)
+
+
+def test_collect_error_reads_as_unsupported():
+    m = pdh()
+    g = GPUMonitor(m)
+    def fail(query):
+        raise fake_win32pdh.error("query closed")
+    m.CollectQueryData = fail
+    assert g.sample() == {"gpu_util": None}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""HistoryStore：時計が戻っても ts が単調で、範囲検索（bisect）がずれない"""
+
+from metrics import Snapshot, DEFAULTS
+from history_store import HistoryStore
+
+BASE = {k: v for k, v in DEFAULTS.items() if k in Snapshot.__dataclass_fields__}
+
+
+def snap(ts, cpu):
+    return Snapshot(**{**BASE, "seq": 0, "ts": ts, "mono": 0.0, "latency_ms": 0.0, "cpu": cpu})
+
+
+def test_clock_step_back_keeps_order(tmp_path):
+    st = HistoryStore(str(tmp_path))
+    try:
+        for i in range(10):
+            st.append(snap(1000.0 + i, i))
+        for i in range(5):                  # 時計が 30 秒戻った
+            st.append(snap(979.0 + i, 100 + i))
+        for i in range(5):
+            st.append(snap(1010.0 + i, 200 + i))
+        ts, cpu = st.series("cpu", 0, 2000, tier="1s")
+        assert ts == sorted(ts) and len(ts) == 20
+        assert ts[10:15] == [1009.0]*5      # 戻った分は直前の ts に揃う
+        ts, cpu = st.series("cpu", 1010, 1014, tier="1s")
+        assert cpu == [200, 201, 202, 203, 204]
+        assert st.series("cpu", 1005, 1006, tier="1s")[1] == [5, 6]
+    finally:
+        st.close()
+
+
+def test_reopen_after_clock_change(tmp_path):
+    st = HistoryStore(str(tmp_path))
+    for i in range(3):
+        st.append(snap(5000.0 + i, i))
+    st.close()
+    st = HistoryStore(str(tmp_path))        # 再起動したら時計が戻っていた
+    try:
+        st.append(snap(4000.0, 9))
+        ts, cpu = st.series("cpu", 0, 6000, tier="1s")
+        assert ts == [5000.0, 5001.0, 5002.0, 5002.0] and cpu[-1] == 9
+    finally:
+        st.close()
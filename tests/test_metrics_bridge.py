@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""MetricsHub.publish の ETag（表示する値が同じなら変わらない）"""
+
+import pytest
+
+pytest.importorskip("psutil")
+import metrics_bridge
+
+
+def hub():
+    h = metrics_bridge.MetricsHub.__new__(metrics_bridge.MetricsHub)   # 計測スレッド・Collector は要らない
+    h.seq = 0; h.subscribers = set()
+    return h
+
+
+def test_etag_ignores_volatile_fields():
+    h = hub(); d = {"cpu": {"usage": 12.5}, "net": {"downBps": 100}, "ts": 1.0, "latencyMs": 0.2}
+    h.publish(d); tag = h.etag
+    h.publish({**d, "ts": 2.0, "latencyMs": 0.4})
+    assert h.etag == tag and tag.startswith(b'W/"')
+    assert h.seq == 2   # SSE の id: は tick ごと
+    h.publish({**d, "cpu": {"usage": 13.0}})
+    assert h.etag != tag
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""ProcCpu / ProcRam / ProcNet の解析を固定の /proc テキストで確かめる（値は psutil と同じ式で手計算）"""
+
+import pytest
+
+import metrics
+
+pytestmark = pytest.mark.skipif(not hasattr(metrics.os, "preadv"), reason="os.preadv がない（Linux 専用）")
+
+STAT = """cpu  {} 0 {} {} {} 0 0 0 {} 0
+cpu0 1 2 3 4 5 6 7 8 9 10
+intr 12345 0 0
+ctxt 999
+"""
+
+MEMINFO = """MemTotal:       16318480 kB
+MemFree:         1025436 kB
+MemAvailable:    8159240 kB
+Buffers:          523320 kB
+"""
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {lo} 10 0 0 0 0 0 0 {lo} 10 0 0 0 0 0 0
+  eth0: {rx} 200 0 0 0 0 0 0 {tx} 100 0 0 0 0 0 0
+docker0: 5000 20 0 0 0 0 0 0 7000 30 0 0 0 0 0 0
+"""
+
+
+def rewrite(path, text):
+    # 同じ inode のまま中身を差し替える（_ProcFile は開いたままの fd を pread する）
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_proc_cpu(tmp_path):
+    p = tmp_path / "stat"
+    rewrite(p, STAT.format(100, 50, 800, 50, 0))
+    cpu = metrics.ProcCpu(str(p))
+    # user 300（guest 100 を含む）, system 100, idle 1500, iowait 100
+    # total = 2100 - guest 100 = 2000 → Δ1000、busy = 2000 - 1600 = 400 → Δ250
+    rewrite(p, STAT.format(300, 100, 1500, 100, 100))
+    assert cpu.sample() == {"cpu": 25.0}
+    assert cpu.sample() == {"cpu": 0.0}   # 変化なし（Δtotal = 0）
+
+
+def test_proc_ram(tmp_path):
+    p = tmp_path / "meminfo"
+    rewrite(p, MEMINFO)
+    assert metrics.ProcRam(str(p)).sample() == {
+        "ram_percent": 50.0, "ram_total": 16318480*1024, "ram_available": 8159240*1024}
+
+
+def test_proc_ram_beyond_head(tmp_path):
+    # MemAvailable が先頭 HEAD バイトより後ろ（古いカーネル・行の並びが違う）なら全体を読み直す
+    p = tmp_path / "meminfo"
+    pad = "".join(f"Pad{i}:          {i} kB\n" for i in range(20))
+    rewrite(p, "MemTotal:       1000 kB\n" + pad + "MemAvailable:    250 kB\n")
+    assert metrics.ProcRam(str(p)).sample() == {"ram_percent": 75.0, "ram_total": 1024000, "ram_available": 256000}
+
+
+def test_proc_net(tmp_path, monkeypatch):
+    p = tmp_path / "dev"
+    rewrite(p, NET_DEV.format(lo=100, rx=1000, tx=2000))
+    sys_net = tmp_path / "net"
+    for nic, state in (("lo", "unknown"), ("eth0", "up"), ("docker0", "up")):
+        (sys_net / nic).mkdir(parents=True)
+        (sys_net / nic / "operstate").write_text(state + "\n")
+    t = [10.0]
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: t[0])
+    net = metrics.ProcNet(path=str(p), sys_net=str(sys_net))
+    assert net.last == {"lo": (100, 100), "eth0": (1000, 2000), "docker0": (5000, 7000)}
+    assert net._usable() == {"eth0"}   # lo・docker0 は仮想扱い
+
+    rewrite(p, NET_DEV.format(lo=100, rx=1000 + 4096, tx=2000 + 1024))
+    t[0] += 2.0
+    assert net.sample() == {"net_down": 2048.0, "net_up": 512.0, "net_iface": "eth0"}
+
+
+def test_proc_net_wrap(tmp_path, monkeypatch):
+    # 32 bit カウンタの折り返しは補正、それ以外の減少（リセット）は 0
+    p = tmp_path / "dev"
+    rewrite(p, NET_DEV.format(lo=0, rx=(1 << 32) - 1000, tx=5000))
+    t = [0.0]
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: t[0])
+    net = metrics.ProcNet("eth0", path=str(p), sys_net=str(tmp_path))
+    rewrite(p, NET_DEV.format(lo=0, rx=1000, tx=10))
+    t[0] += 1.0
+    assert net.sample() == {"net_down": 2000.0, "net_up": 0.0, "net_iface": "eth0"}
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""rolling_stats（窓内の分位・StatsTracker）と selfstats.bucket_quantile"""
+
+from rolling_stats import WindowHistogram
+from selfstats import Histogram, bucket_quantile
+
+
+def test_bucket_quantile_interpolates():
+    bounds = (10, 20, 30)
+    assert bucket_quantile(bounds, [0, 0, 0, 0], 0, 0.5) == 0.0
+    assert bucket_quantile(bounds, [2, 2, 0, 0], 4, 0.5) == 10.0     # 1 つ目のバケットの上端
+    assert bucket_quantile(bounds, [2, 2, 0, 0], 4, 0.75) == 15.0    # 2 つ目の中ほど
+    assert bucket_quantile(bounds, [0, 0, 0, 3], 3, 0.99) == 30.0    # 上限超えは最後の境界
+
+
+def test_histograms_share_the_estimate():
+    w = WindowHistogram(window=60, bounds=(1, 2, 5, 10)); h = Histogram(bounds=(1, 2, 5, 10))
+    for t, v in enumerate((0.5, 1.5, 3, 4, 7, 12)):
+        w.push(t, v); h.observe(v)
+    for q in (0.5, 0.9, 0.99):
+        assert w.quantile(q) == h.quantile(q)
+
+
+def test_window_drops_old_samples():
+    w = WindowHistogram(window=10, bounds=(10, 20, 30))
+    w.push(0, 25); w.push(5, 5)
+    w.push(11, 5)   # t=0 の 25 が窓から出る
+    assert sum(w.counts) == 2 and w.quantile(0.99) <= 10
+
+
+def test_configure_while_sampling():
+    # 設定の再読み込み（GUI スレッド）とサンプル（サンプラスレッド）が並んでも、作り直した系列に古い Stat が残らない
+    import threading
+    from metrics import Snapshot, DEFAULTS
+    from rolling_stats import StatsTracker
+
+    tr = StatsTracker(); stop = threading.Event()
+    base = {k: v for k, v in DEFAULTS.items() if k in Snapshot.__dataclass_fields__}
+
+    def feed():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            tr(Snapshot(**{**base, "seq": i, "ts": float(i), "mono": float(i), "latency_ms": 0.0, "cpu": 95.0}))
+    th = threading.Thread(target=feed); th.start()
+    try:
+        for k in range(200):
+            tr.configure({"cpu": {"stats": 30 + k % 2}})
+            tr.configure({"cpu": {"stats": 30 + k % 2}})   # 同じ spec なら作り直さない
+    finally:
+        stop.set(); th.join()
+    tr.configure({"cpu": {"stats": 99}})
+    assert "cpu" not in tr.latest
@@ -1,16 +1,54 @@
 # -*- coding: utf-8 -*-
 
-import sys, math, datetime, collections
-import psutil, jpholiday
-
-from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF, QDate
-from PyQt6.QtGui  import QColor, QPainter, QPen, QFont, QTextCharFormat
+import os, sys, math, time, datetime, argparse, functools, threading, contextlib, collections
+_T0 = time.perf_counter()   # --profile-startup 用
+from dataclasses import dataclass
+from array import array
+# 任意：numpy があればグラフ座標をベクトル化（無ければ Python ループ）。
+# import が重いので起動時には読まず、初回描画後にバックグラウンドで読み込んで use_numpy() で有効化
+np = None
+
+from PyQt6.QtCore import Qt, QObject, QTimer, QRect, QRectF, QPoint, QPointF, QSize, QDate, pyqtSignal
+from PyQt6.QtGui  import (QColor, QPainter, QPen, QBrush, QFont, QFontMetrics, QTextCharFormat, QPixmap, QPolygonF,
+                          QRegion, QStaticText, QImage)
 from PyQt6.QtWidgets import QApplication, QWidget, QGridLayout, QLabel, QCalendarWidget
 
-# 壁紙レイヤー固定
-import win32gui, win32con
-# GPU用：Windows パフォーマンスカウンタ
-import win32pdh
+# 壁紙レイヤー固定（Windows 以外では通常ウィンドウとして表示）
+try:
+    import win32gui, win32con
+except ImportError:
+    win32gui = win32con = None
+# 計測（Qt 非依存。Lively 用ブリッジと共用）
+from metrics import Collector, Sampler, Recorder, ReplayProvider, cpu_name
+from holiday_index import HolidayIndex, default_index
+from history_store import HistoryStore
+from selfstats import SelfStats, serve as serve_stats
+from frame_file import FrameFile, changed_bands
+from rolling_stats import StatsTracker
+import shm_metrics
+import layout_config
+from layout_config import LAYOUT, PANELS, LayoutConfig, parse_layout, sources_for
+_T_IMPORTED = time.perf_counter()
+
+
+def use_numpy() -> bool:
+    """numpy を有効化（GUI スレッドから呼ぶ。描画の途中で切り替わらないように）"""
+    global np
+    try:
+        import numpy
+    except ImportError:
+        return False
+    np = numpy
+    return True
+
+
+def _import_numpy() -> bool:
+    """ワーカースレッドで重い import だけ済ませておく（有効化は use_numpy()）"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 # ───────────── WorkerW 検出（壁紙の子にする） ─────────────
@@ -36,6 +74,22 @@ def get_workerw():
     return result[0] if result else None
 
 
+def _monitor_rect(device_name: str):
+    """QScreen.name()（\\\\.\\DISPLAY1 など）のモニタ矩形 (x, y, w, h)。物理ピクセル・仮想デスクトップ左上基準（WorkerW の子の座標）"""
+    try:
+        import win32api
+        vx = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN)
+        vy = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN)
+        for hmon, _hdc, _rc in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(hmon)
+            if info.get("Device") == device_name:
+                l, t, r, b = info["Monitor"]
+                return (l - vx, t - vy, r - l, b - t)
+    except Exception:
+        pass
+    return None
+
+
 # ───────────── クリック透過 切替ヘルパ ─────────────
 def _set_click_through(hwnd: int, enable: bool):
     GWL_EXSTYLE = -20
@@ -68,201 +122,1250 @@ def _set_click_through(hwnd: int, enable: bool):
 
 
 
+# ───────────── 壁紙が見えているか（全画面アプリ／ロック） ─────────────
+_user32 = None
+def _u32():
+    global _user32
+    if _user32 is None:
+        import ctypes
+        from ctypes import wintypes
+        u = ctypes.WinDLL("user32", use_last_error=True)
+        u.MonitorFromWindow.restype = wintypes.HMONITOR
+        u.MonitorFromWindow.argtypes = [wintypes.HWND, wintypes.DWORD]
+        u.OpenInputDesktop.restype = wintypes.HANDLE
+        u.OpenInputDesktop.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        u.SwitchDesktop.argtypes = [wintypes.HANDLE]
+        u.CloseDesktop.argtypes = [wintypes.HANDLE]
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+        u.MONITORINFO = MONITORINFO
+        u.GetMonitorInfoW.argtypes = [wintypes.HMONITOR, ctypes.POINTER(MONITORINFO)]
+        _user32 = u
+    return _user32
+
+def _wallpaper_covered(hwnd_self: int) -> bool:
+    """前面ウィンドウが自分と同じモニタを最大化／全画面で覆っているか（Windows 以外は常に False）"""
+    if win32gui is None:
+        return False
+    fg = win32gui.GetForegroundWindow()
+    if not fg or fg == hwnd_self or win32gui.IsIconic(fg):
+        return False
+    if win32gui.GetClassName(fg) in ("Progman", "WorkerW", "Shell_TrayWnd"):
+        return False
+    import ctypes
+    u = _u32()
+    mon = u.MonitorFromWindow(fg, 2)   # MONITOR_DEFAULTTONEAREST
+    if mon != u.MonitorFromWindow(hwnd_self, 2):
+        return False
+    if win32gui.IsZoomed(fg):
+        return True
+    mi = u.MONITORINFO(); mi.cbSize = ctypes.sizeof(mi)
+    if not u.GetMonitorInfoW(mon, ctypes.byref(mi)):
+        return False
+    l, t, r, b = win32gui.GetWindowRect(fg); m = mi.rcMonitor
+    return l <= m.left and t <= m.top and r >= m.right and b >= m.bottom
+
+def _session_locked() -> bool:
+    """ロック画面中（入力デスクトップに切り替えられない）か"""
+    if win32gui is None:
+        return False
+    u = _u32()
+    h = u.OpenInputDesktop(0, False, 0x0100)   # DESKTOP_SWITCHDESKTOP
+    if not h:
+        return True
+    try:
+        return not u.SwitchDesktop(h)
+    finally:
+        u.CloseDesktop(h)
+
+
+# ───────────── 共有キャッシュ（ウィジェット・画面をまたいで使い回す） ─────────────
+@functools.cache
+def _font(family: str, size: int, weight=QFont.Weight.Normal) -> QFont:
+    """同じ指定の QFont は 1 つだけ（呼び出し側で変更しないこと）"""
+    return QFont(family, size, weight)
+
+
+_PIXMAPS: collections.OrderedDict = collections.OrderedDict()
+
+
+def _shared_pixmap(key, build, cap=64):
+    """key（種類・サイズ・DPR・内容）が同じ QPixmap は 1 枚だけ作る。古いものから捨てる"""
+    pm = _PIXMAPS.get(key)
+    if pm is None:
+        pm = _PIXMAPS[key] = build()
+        if len(_PIXMAPS) > cap:
+            _PIXMAPS.popitem(last=False)
+    else:
+        _PIXMAPS.move_to_end(key)
+    return pm
+
+
+_STATIC: dict[str, QStaticText] = {}
+
+
+def _static_text(text: str) -> QStaticText:
+    """変わらない文字（パネル見出しなど）の QStaticText。レイアウトは初回描画で作られ、以後は使い回す"""
+    st = _STATIC.get(text)
+    if st is None:
+        st = _STATIC[text] = QStaticText(text)
+        st.setTextFormat(Qt.TextFormat.PlainText)
+        st.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+    return st
+
+
+# ───────────── テーマ（色・ペン・フォントは 1 か所で作る） ─────────────
+# 配色：役割 → RGBA。グラフの線だけはアクセント（ACCENTS）で差し替え
+PALETTES = {
+    "dark": {
+        "window": (9,15,26,235), "vignette": (0,0,0,80),
+        "panel": (20,28,44,180), "border": (66,93,120,130), "alert": (248,113,113,230),
+        "title": (203,213,225,255), "muted": (148,163,184,255), "text": (226,232,240,255), "value": (241,245,249,255),
+        "graph_bg": (14,24,38,100), "grid": (120,140,170,40), "graph_label": (170,190,210,160),
+        "face": (255,180,140,180), "face_fill": (255,255,255,10), "hands": (255,220,200,220),
+        "overlay": (0,0,0,190), "overlay_text": (190,242,100,255),
+        "calendar_bg": (0,0,0,70), "calendar_text": (255,255,255,255), "clock_text": (229,231,235,255),
+        "sat": (0,183,255,255), "sun": (255,64,255,255), "holiday": (77,227,107,255),
+    },
+    "light": {
+        "window": (241,245,249,225), "vignette": (255,255,255,60),
+        "panel": (255,255,255,190), "border": (148,163,184,150), "alert": (220,38,38,220),
+        "title": (30,41,59,255), "muted": (100,116,139,255), "text": (30,41,59,255), "value": (15,23,42,255),
+        "graph_bg": (226,232,240,120), "grid": (100,116,139,50), "graph_label": (71,85,105,200),
+        "face": (234,88,12,180), "face_fill": (0,0,0,10), "hands": (124,45,18,220),
+        "overlay": (255,255,255,215), "overlay_text": (22,101,52,255),
+        "calendar_bg": (255,255,255,120), "calendar_text": (15,23,42,255), "clock_text": (30,41,59,255),
+        "sat": (2,132,199,255), "sun": (192,38,211,255), "holiday": (22,163,74,255),
+    },
+}
+# アクセント：(折れ線, ベースライン)
+ACCENTS = {
+    "blue":   ((96,165,250,255), (59,130,246,120)),
+    "green":  ((74,222,128,255), (34,197,94,120)),
+    "orange": ((251,146,60,255), (249,115,22,120)),
+    "pink":   ((244,114,182,255), (236,72,153,120)),
+}
+
+
+class Theme:
+    """
+    配色（PALETTES[mode]＋ACCENTS[accent]）から QColor / QPen / QBrush / QFont / QTextCharFormat を 1 回だけ作って持つ。
+    paintEvent は theme() の属性を参照するだけ（描画ごとの生成なし）。
+    key はキャッシュ（背景・文字盤のピクスマップ）のキーに含める。切替は set_theme() の 1 か所だけ。
+    """
+    HAND_WIDTHS = (5, 3, 1)   # 時・分・秒
+
+    def __init__(self, mode="dark", accent="blue"):
+        if mode not in PALETTES or accent not in ACCENTS:
+            raise ValueError(f"bad theme {mode!r}/{accent!r} (modes: {', '.join(PALETTES)}; accents: {', '.join(ACCENTS)})")
+        self.mode, self.accent = mode, accent
+        self.key = (mode, accent)
+        c = {k: QColor(*v) for k, v in PALETTES[mode].items()}
+        line, base = (QColor(*v) for v in ACCENTS[accent])
+        self.colors = c
+        # 塗り
+        self.window, self.vignette = QBrush(c["window"]), QBrush(c["vignette"])
+        self.panel, self.face_fill, self.overlay = QBrush(c["panel"]), QBrush(c["face_fill"]), QBrush(c["overlay"])
+        self.graph_bg = c["graph_bg"]
+        # 線
+        self.border_pen = QPen(c["border"], 2)
+        self.alert_pen = QPen(c["alert"], 3)   # しきい値アラート中のパネル枠
+        self.grid_pen = QPen(c["grid"], 1)
+        self.face_pen = QPen(c["face"], 3)
+        self.hand_pens = tuple(QPen(c["hands"], w) for w in self.HAND_WIDTHS)
+        # 折れ線：点が 1 px に 1 つを超えると 2 px のアンチエイリアスは塗りつぶしと見分けがつかず、描画は数十倍遅い → 1 px
+        self.line_pen, self.line_pen_dense, self.base_pen = QPen(line, 2), QPen(line, 1), QPen(base, 1)
+        # 文字（setPen(QColor) は毎回 QPen を作るので、ペンで持つ）
+        for role in ("title", "muted", "text", "value", "graph_label", "overlay_text"):
+            setattr(self, role, QPen(c[role]))
+        # フォント（_font で共有）
+        self.f_title = _font("Inter,Segoe UI,Meiryo UI,Arial", 12, QFont.Weight.DemiBold)
+        self.f_value = _font("Inter,Segoe UI,Meiryo UI", 26, QFont.Weight.Bold)
+        self.f_sub = self.f_mono = _font("Consolas", 10)
+        self.f_extra = _font("Consolas", 11)
+        self.f_clock = _font("Consolas", 22, QFont.Weight.DemiBold)
+        # カレンダー（土・日・祝）とスタイルシート
+        self.sat, self.sun, self.holiday = QTextCharFormat(), QTextCharFormat(), QTextCharFormat()
+        for fmt, role in ((self.sat, "sat"), (self.sun, "sun"), (self.holiday, "holiday")):
+            fmt.setForeground(c[role])
+        bg, fg = c["calendar_bg"], c["calendar_text"]
+        self.calendar_css = (f"background-color: rgba({bg.red()},{bg.green()},{bg.blue()},{bg.alpha()}); "
+                             f"color: {fg.name()}; border-radius: 10px;")
+        self.clock_css = f"color:{c['clock_text'].name()};"
+
+
+_THEME: Theme|None = None
+
+
+def theme() -> Theme:
+    """現在のテーマ（初回に既定の dark/blue を作る。QFont を作るので QApplication の後で）"""
+    global _THEME
+    if _THEME is None:
+        _THEME = Theme()
+    return _THEME
+
+
+def set_theme(mode: str|None=None, accent: str|None=None) -> Theme:
+    """
+    テーマ切替。キャッシュの無効化はここだけ：共有ピクスマップ・静的テキストを捨て、
+    スタイルシート等を持つウィジェット（apply_theme があるもの）に反映してから全ウィジェットを再描画。
+    """
+    global _THEME
+    cur = theme()
+    t = Theme(mode or cur.mode, accent or cur.accent)
+    if t.key == cur.key:
+        return cur
+    _THEME = t
+    _PIXMAPS.clear(); _STATIC.clear()
+    app = QApplication.instance()
+    if app is not None:
+        for w in app.allWidgets():
+            apply = getattr(w, "apply_theme", None)
+            if apply is not None:
+                apply(t)
+            w.update()
+    return t
+
+
+# ───────────── 描画時間の計測（F12 の自己計測用） ─────────────
+def _timed_paint(name):
+    """
+    paintEvent 用。そのインスタンスの selfstats（SelfMonitor.attach が入れる。既定 None）がある間だけ時間と回数を取る。
+    クラスは差し替えないので、計測対象の Dashboard 以外のウィジェットには影響しない
+    """
+    def deco(paint):
+        clk = time.perf_counter
+        @functools.wraps(paint)
+        def paintEvent(self, e):
+            st = self.selfstats
+            if st is None:
+                return paint(self, e)
+            t = clk(); paint(self, e)
+            st.observe("paint", name, (clk()-t)*1e3); st.count("paints", name)
+        return paintEvent
+    return deco
+
+
 # ───────────── 軽量スパークライン ─────────────
+def nice_ceil(v: float) -> float:
+    """1-2-5 系列で v 以上の最小値（自動スケールの上端）"""
+    if v <= 0:
+        return 1.0
+    e = 10.0**math.floor(math.log10(v))
+    for m in (1, 2, 5, 10):
+        if v <= m*e*(1+1e-9):
+            return m*e
+    return 10*e
+
+
+class _MinMaxColumns:
+    """
+    直近のサンプルを k 個ずつの列にまとめた [min, max]（1 列 ≒ 1 px）。
+    push は末尾の列を更新するだけ（O(1)）。表示範囲・幅が変わったら作り直す。
+    """
+    __slots__ = ("k", "cols", "fill")
+
+    def __init__(self, k, ncols, values=()):
+        self.k = k; self.cols = collections.deque(maxlen=ncols); self.fill = 0
+        for v in values:
+            self.push(v)
+
+    def push(self, v):
+        if self.fill == 0:
+            self.cols.append([v, v])
+        else:
+            c = self.cols[-1]
+            if v < c[0]: c[0] = v
+            elif v > c[1]: c[1] = v
+        self.fill = (self.fill + 1) % self.k
+
+
 class SparkGraph(QWidget):
-    def __init__(self, max_points=300, y_max=100.0, y_label="%", grid=True, parent=None):
+    """
+    履歴は array('d') のリングバッファ（古い値を上書き、確保は 1 回だけ）。max_points = 保持数（1 秒 1 点で 1 時間）、
+    window = 表示する直近の点数。window が幅（px）の 2 倍を超えたら 1 列ごとの min/max に間引いて描く（細いスパイクも残る）。
+    背景＋グリッドはサイズ/DPR/ラベルごとに QPixmap へキャッシュし、折れ線は QPolygonF 1 本で描く。
+    y_max=None … 表示範囲の最大値から 1-2-5 刻みで上端を自動決定（y_floor 未満には縮めない）
+    show_history() … HistoryStore から読んだ系列を時刻位置で表示（None でライブ表示に戻す）
+    """
+    selfstats: SelfStats|None = None   # 自己計測中だけ（SelfMonitor.attach）
+
+    def __init__(self, max_points=3600, y_max=100.0, y_label="%", grid=True,
+                 window=600, y_floor=1.0, parent=None):
         super().__init__(parent)
         self.max_points = max_points
+        self.window = min(window, max_points)
         self.y_max = y_max
+        self.y_floor = y_floor
         self.y_label = y_label
         self.grid = grid
-        self.data = collections.deque([0.0]*max_points, maxlen=max_points)
+        self._buf = array("d", bytes(8*max_points)); self._head = 0   # _head = 最古の位置
+        self._bg = None; self._bg_key = None                            # 背景キャッシュ
+        self._poly = QPolygonF(); self._xy = None; self._poly_key = None  # 折れ線バッファ
+        self._cols = None; self._cols_key = None                        # min/max 間引き
+        self._history = None                                            # (ts, vals, t0, t1, step)
         self.setMinimumHeight(180)
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
 
+    @property
+    def data(self):
+        """古い順の値リスト"""
+        return self._buf[self._head:].tolist() + self._buf[:self._head].tolist()
+
     def push(self, v: float):
-        self.data.append(float(max(0.0, v)))
+        v = float(max(0.0, v))
+        self._buf[self._head] = v
+        self._head = (self._head + 1) % self.max_points
+        if self._cols is not None:
+            self._cols.push(v)
+        self.update()
 
-    def paintEvent(self, _):
-        p = QPainter(self); p.setRenderHint(QPainter.RenderHint.Antialiasing)
+    def set_window(self, n: int):
+        """表示する直近の点数（1 秒 1 点なら 60 / 600 / 3600 で 1 分 / 10 分 / 1 時間）"""
+        n = max(2, min(int(n), self.max_points))
+        if n != self.window:
+            self.window = n
+            self._cols_key = None
+            self.update()
+
+    def take_over(self, other: "SparkGraph", drop=0):
+        """other のリングバッファを引き継ぐ（新しい方から drop 個は捨てる。Dashboard の作り直し用）"""
+        if other.max_points != self.max_points:
+            return
+        self._buf[:] = other._buf
+        self._head = (other._head - drop) % self.max_points
+        for i in range(drop):   # 捨てた分は最古の値で埋める（左端に 0 が出ないように）
+            self._buf[(self._head + i) % self.max_points] = other._buf[other._head]
+        self._cols_key = None
+        self.update()
+
+    def show_history(self, hist, label=None):
+        """hist = (ts のリスト, 値のリスト, 表示開始, 表示終了, 記録間隔) / None"""
+        self._history = hist
+        if label is not None:
+            self.y_label = label
+        self.update()
+
+    def _latest(self, k):
+        """新しい方から k 個を古い順で（array('d')）"""
+        n, h = self.max_points, self._head
+        k = min(k, n)
+        if k <= h:
+            return self._buf[h-k:h]
+        return self._buf[n-(k-h):] + self._buf[:h]
+
+    def _columns(self):
+        """window が幅の 2 倍を超えるときの min/max 列（1 列 2 点なので、それ以下は間引かない方が安い）"""
+        w, n = self.width(), self.window
+        if n <= 2*w:
+            self._cols = None; self._cols_key = None
+            return None
+        k = math.ceil(n / max(1, w))
+        key = (k, math.ceil(n / k))
+        if self._cols_key != key:
+            self._cols = _MinMaxColumns(k, key[1], self._latest(n))
+            self._cols_key = key
+        return self._cols
+
+    def _top(self):
+        """y 軸の上端（固定 or 表示範囲の最大値から自動）"""
+        if self.y_max is not None:
+            return self.y_max
+        if self._history is not None:
+            m = max((v for v in self._history[1] if v == v), default=0.0)
+        else:
+            cols = self._columns()
+            m = max(c[1] for c in cols.cols) if cols is not None else max(self._latest(self.window))
+        return nice_ceil(max(m, self.y_floor))
+
+    def _label(self, top):
+        if self.y_max is not None:
+            return self.y_label
+        return f"≤{top:g} {self.y_label}"
+
+    # 背景・グリッド・単位（静的）
+    def _background(self, label):
+        w, h, dpr, T = self.width(), self.height(), self.devicePixelRatioF(), theme()
+        key = ("spark_bg", T.key, w, h, dpr, self.grid, label)
+        if self._bg_key != key:
+            def build():
+                pm = QPixmap(max(1, round(w*dpr)), max(1, round(h*dpr))); pm.setDevicePixelRatio(dpr)
+                pm.fill(Qt.GlobalColor.transparent)
+                p = QPainter(pm); p.setRenderHint(QPainter.RenderHint.Antialiasing)
+                p.fillRect(0, 0, w, h, T.graph_bg)
+                if self.grid:
+                    p.setPen(T.grid_pen)
+                    for i in range(6):  p.drawLine(0, int(h*i/5), w, int(h*i/5))
+                    for i in range(12): p.drawLine(int(w*i/11), 0, int(w*i/11), h)
+                p.setPen(T.graph_label); p.setFont(T.f_mono)
+                p.drawText(QRect(0, 4, w-8, 18), Qt.AlignmentFlag.AlignRight, label); p.end()
+                return pm
+            # 同じサイズ・ラベルのグラフ（CPU/RAM/GPU、他の画面）とは 1 枚を共有
+            self._bg, self._bg_key = _shared_pixmap(key, build), key
+        return self._bg
+
+    # 直近 window 点 → QPolygonF（numpy があればポリゴンのメモリへ直接書き込む）
+    def _polygon(self, top):
+        w, h, n, cap = self.width(), self.height(), self.window, self.max_points
+        if self._poly_key != (w, h, n, np is not None):
+            xs = [0]*n if n <= 1 else [int(i*(w-1)/(n-1)) for i in range(n)]
+            self._poly = QPolygonF(); self._poly.resize(n)
+            if np is not None:
+                ptr = self._poly.data(); ptr.setsize(n*16)
+                self._xy = np.frombuffer(ptr, np.float64).reshape(n, 2)
+                self._xy[:, 0] = xs
+            else:
+                self._xy = xs
+            self._poly_key = (w, h, n, np is not None)
+        if np is not None:
+            vals = np.frombuffer(self._buf, np.float64)
+            ys = self._xy[:, 1]
+            start = (self._head - n) % cap
+            first = min(cap - start, n)
+            for dst, src in ((ys[:first], vals[start:start+first]), (ys[first:], vals[:n-first])):
+                np.minimum(src, top, out=dst); dst /= top; dst *= h-4
+                np.floor(dst, out=dst); np.subtract(h-2, dst, out=dst)
+        else:
+            self._poly = QPolygonF([QPointF(x, h - int(min(v, top)/top*(h-4)) - 2)
+                                    for x, v in zip(self._xy, self._latest(n))])
+        return self._poly
+
+    # 間引き：列ごとに (x, min) → (x, max) の縦線をつないだ折れ線（右詰め）
+    def _decimated(self, cols, top):
+        w, h = self.width(), self.height()
+        m, ncols = len(cols.cols), cols.cols.maxlen
+        dx = (w-1)/max(1, ncols-1); x0 = (w-1) - (m-1)*dx
+        if np is not None:
+            mm = np.minimum(np.asarray(cols.cols, np.float64), top)
+            ys = np.floor(mm/top*(h-4)); np.subtract(h-2, ys, out=ys)
+            xs = x0 + np.arange(m)*dx
+            xy = np.empty((m, 2, 2)); xy[:, :, 0] = xs[:, None]; xy[:, :, 1] = ys
+            poly = QPolygonF(); poly.resize(2*m)
+            ptr = poly.data(); ptr.setsize(2*m*16)
+            np.frombuffer(ptr, np.float64)[:] = xy.ravel()
+            return poly
+        pts = []
+        for i, (lo, hi) in enumerate(cols.cols):
+            x = x0 + i*dx
+            pts.append(QPointF(x, h - int(min(lo, top)/top*(h-4)) - 2))
+            pts.append(QPointF(x, h - int(min(hi, top)/top*(h-4)) - 2))
+        return QPolygonF(pts)
+
+    def _history_lines(self, top):
+        """時刻 → x。同じ列に落ちる点は min/max にまとめ、記録の途切れ（間隔の 2 倍超）と値なし（NaN）で線を切る"""
+        ts, vals, t0, t1, step = self._history
         w, h = self.width(), self.height()
-        p.fillRect(self.rect(), QColor(14, 24, 38, 100))
-        if self.grid:
-            p.setPen(QPen(QColor(120,140,170,40), 1))
-            for i in range(6):  p.drawLine(0, int(h*i/5), w, int(h*i/5))
-            for i in range(12): p.drawLine(int(w*i/11), 0, int(w*i/11), h)
-        p.setPen(QPen(QColor(96,165,250), 2))
-        pts=[]; n=len(self.data)
-        for i,val in enumerate(self.data):
-            x = 0 if n<=1 else int(i*(w-1)/(n-1))
-            y = h - int(min(val,self.y_max)/self.y_max*(h-4)) - 2
-            pts.append(QPointF(x,y))
-        if len(pts)>=2: p.drawPolyline(*pts)
-        p.setPen(QPen(QColor(59,130,246,120),1)); p.drawLine(0,h-1,w,h-1)
-        p.setPen(QColor(170,190,210,160)); p.setFont(QFont("Consolas",10))
-        p.drawText(w-60, 18, f"{self.y_label}"); p.end()
+        sx = (w-1)/max(1e-9, t1-t0)
+        y = lambda v: h - int(min(max(0.0, v), top)/top*(h-4)) - 2
+        lines, cur, prev = [], [], None
+
+        def flush():
+            pts = []
+            for x, lo, hi in cur:
+                pts.append(QPointF(x, y(lo)))
+                if hi != lo: pts.append(QPointF(x, y(hi)))
+            if len(pts) > 1: lines.append(QPolygonF(pts))
+
+        for t, v in zip(ts, vals):
+            if v != v or (prev is not None and t - prev > 2*step):
+                flush(); cur = []
+            if v == v:
+                x = int((t-t0)*sx)
+                if cur and cur[-1][0] == x:
+                    c = cur[-1]
+                    if v < c[1]: c[1] = v
+                    elif v > c[2]: c[2] = v
+                else:
+                    cur.append([x, v, v])
+            prev = t
+        flush()
+        return lines
+
+    @_timed_paint("SparkGraph")
+    def paintEvent(self, _):
+        p = QPainter(self)
+        T = theme()
+        top = self._top()
+        p.drawPixmap(0, 0, self._background(self._label(top)))
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # 1 px に 1 点を超える密な線は 1 px のペンで（Theme.line_pen_dense）
+        n = len(self._history[0]) if self._history is not None else self.window
+        p.setPen(T.line_pen_dense if n > self.width() else T.line_pen)
+        if self._history is not None:
+            for line in self._history_lines(top):
+                p.drawPolyline(line)
+        else:
+            cols = self._columns()
+            p.drawPolyline(self._polygon(top) if cols is None else self._decimated(cols, top))
+        # ベースラインは折れ線の上に重ねる
+        p.setPen(T.base_pen); p.drawLine(0, self.height()-1, self.width(), self.height()-1)
+        p.end()
 
 
 # ───────────── パネル ─────────────
 class Panel(QWidget):
+    """
+    set_value / set_extra / set_stats / set_subtitle は文字列が変わったときだけ、その文字の矩形（旧∪新）を再描画。
+    set_alert は枠の帯だけ。with panel.batch(): の中では再描画要求を 1 回にまとめる。
+    """
+    ALIGN_TL = Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignTop
+    ALIGN_TR = Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTop
+    ALIGN_BL = Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignBottom
+    selfstats: SelfStats|None = None   # 自己計測中だけ（SelfMonitor.attach）
+
     def __init__(self, title, subtitle="", show_border=True, parent=None):
         super().__init__(parent)
         self.title=title; self.subtitle=subtitle; self.show_border=show_border
-        self.value_text=""; self.extra_text=""; self.graph:SparkGraph|None=None
+        self.value_text=""; self.extra_text=""; self.stats_text=""; self.graph:SparkGraph|None=None
+        self.alert=False
+        self._batch = 0; self._dirty = QRegion()
         self.setMinimumSize(460,260)
 
-    def set_graph(self, g:SparkGraph): self.graph=g; g.setParent(self)
-    def set_value(self, t): self.value_text=t; self.update()
-    def set_extra(self, t): self.extra_text=t; self.update()
-    def set_subtitle(self, t): self.subtitle=t; self.update()
+    def set_graph(self, g:SparkGraph):
+        self.graph=g; g.setParent(self); self._place_graph()
+
+    # 各テキストの描画領域（paintEvent と同じ矩形・揃え）
+    def _area(self, which):
+        r=self.rect().adjusted(1,1,-1,-1); T=theme()
+        if which=="subtitle": return r.adjusted(120,12,-16,-16), T.f_sub,   self.ALIGN_TL
+        if which=="value":    return r.adjusted(0,8,-16,0),      T.f_value, self.ALIGN_TR
+        if which=="stats":    return r.adjusted(16,0,-16,-30),   T.f_sub,   self.ALIGN_BL   # 補足の 1 行上
+        return                       r.adjusted(16,0,-16,-10),   T.f_extra, self.ALIGN_BL
+
+    def _set_text(self, which, attr, t):
+        old = getattr(self, attr)
+        if t == old:
+            return
+        area, font, align = self._area(which)
+        fm = QFontMetrics(font)
+        for txt in (old, t):
+            if txt:
+                self._dirty += fm.boundingRect(area, int(align.value), txt).adjusted(-2,-2,2,2)
+        setattr(self, attr, t)
+        if not self._batch:
+            self._flush()
+
+    def set_value(self, t):    self._set_text("value", "value_text", t)
+    def set_extra(self, t):    self._set_text("extra", "extra_text", t)
+    def set_stats(self, t):    self._set_text("stats", "stats_text", t)
+    def set_subtitle(self, t): self._set_text("subtitle", "subtitle", t)
+
+    def set_alert(self, on: bool):
+        if on == self.alert:
+            return
+        self.alert = on
+        r = self.rect()
+        self._dirty += QRegion(r).subtracted(QRegion(r.adjusted(4,4,-4,-4)))
+        if not self._batch:
+            self._flush()
+
+    @contextlib.contextmanager
+    def batch(self):
+        self._batch += 1
+        try:
+            yield self
+        finally:
+            self._batch -= 1
+            if not self._batch:
+                self._flush()
 
-    def paintEvent(self, _):
+    def _flush(self):
+        if not self._dirty.isEmpty():
+            self.update(self._dirty); self._dirty = QRegion()
+
+    def _place_graph(self):
+        if self.graph:
+            self.graph.setGeometry(self.rect().adjusted(1,1,-1,-1).adjusted(16,56,-16,-56))
+
+    def resizeEvent(self, e):
+        self._place_graph()
+        super().resizeEvent(e)
+
+    @_timed_paint("Panel")
+    def paintEvent(self, e):
         p=QPainter(self); p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        r=self.rect().adjusted(1,1,-1,-1)
-        p.setBrush(QColor(20,28,44,180)); p.setPen(Qt.PenStyle.NoPen); p.drawRoundedRect(r,14,14)
-        if self.show_border:
-            p.setPen(QPen(QColor(66,93,120,130),2)); p.setBrush(Qt.BrushStyle.NoBrush)
+        r=self.rect().adjusted(1,1,-1,-1); T=theme()
+        # 再描画範囲にかかる段だけ文字を描く（上段=タイトル/サブ/値、下段=補足）
+        clip=e.region()
+        top=clip.intersects(QRect(r.left(), r.top(), r.width(), 56))
+        bottom=clip.intersects(QRect(r.left(), r.bottom()-56, r.width(), 57))
+        p.setBrush(T.panel); p.setPen(Qt.PenStyle.NoPen); p.drawRoundedRect(r,14,14)
+        if self.show_border or self.alert:
+            p.setPen(T.alert_pen if self.alert else T.border_pen); p.setBrush(Qt.BrushStyle.NoBrush)
             p.drawRoundedRect(r,14,14)
-        p.setPen(QColor(203,213,225)); p.setFont(QFont("Inter,Segoe UI,Meiryo UI,Arial",12,QFont.Weight.DemiBold))
-        p.drawText(r.adjusted(16,12,-16,-16), Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignTop, self.title)
-        if self.subtitle:
-            p.setPen(QColor(148,163,184)); p.setFont(QFont("Consolas",10))
-            p.drawText(r.adjusted(120,12,-16,-16), Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignTop, self.subtitle)
-        if self.value_text:
-            p.setPen(QColor(241,245,249)); p.setFont(QFont("Inter,Segoe UI,Meiryo UI",26,QFont.Weight.Bold))
-            p.drawText(r.adjusted(0,8,-16,0), Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTop, self.value_text)
-        if self.graph:
-            g_rect = r.adjusted(16,56,-16,-56); self.graph.setGeometry(g_rect)
-        if self.extra_text:
-            p.setPen(QColor(148,163,184)); p.setFont(QFont("Consolas",11))
-            p.drawText(r.adjusted(16,0,-16,-10), Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignBottom, self.extra_text)
+        if self.title and top:
+            # 見出しは変わらないので QStaticText（レイアウトを使い回す）
+            p.setPen(T.title); p.setFont(T.f_title)
+            p.drawStaticText(r.left()+16, r.top()+12, _static_text(self.title))
+        for which, attr, color in (("subtitle", "subtitle", T.muted),
+                                   ("value", "value_text", T.value),
+                                   ("extra", "extra_text", T.muted),
+                                   ("stats", "stats_text", T.muted)):
+            txt = getattr(self, attr)
+            if not txt:
+                continue
+            if not (bottom if which in ("extra", "stats") else top):
+                continue
+            area, font, align = self._area(which)
+            p.setPen(color); p.setFont(font)
+            p.drawText(area, align, txt)
+        p.end()
+
+
+class TopPanel(Panel):
+    """
+    上位プロセス（CPU / RAM / GPU の 3 列 × n 行）。Snapshot.top_* から作った行の文字が変わったときだけ再描画。
+    """
+    COLS = (("CPU", "top_cpu", lambda p: f"{p.cpu:.1f}%"),
+            ("RAM", "top_rss", lambda p: f"{p.rss/(1 << 20):.0f} MB"),
+            ("GPU", "top_gpu", lambda p: f"{p.gpu:.1f}%"))
+
+    def __init__(self, n=5, parent=None):
+        super().__init__("Processes", subtitle=f"top {n}", parent=parent)
+        self.n = n
+        self.rows: list[tuple] = [() for _ in self.COLS]
+        h = 56 + QFontMetrics(theme().f_mono).height()*(n + 1) + 16
+        self.setMinimumSize(460, h); self.setMaximumHeight(h)
+
+    def set_snapshot(self, s):
+        rows = [tuple((p.name, fmt(p)) for p in getattr(s, attr)) for _title, attr, fmt in self.COLS]
+        if rows != self.rows:
+            self.rows = rows
+            self.update(self._table_rect())
+
+    def _table_rect(self):
+        return self.rect().adjusted(1,1,-1,-1).adjusted(16,48,-16,-8)
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        r = self._table_rect()
+        if not e.region().intersects(r):
+            return
+        T = theme()
+        p = QPainter(self); p.setFont(T.f_mono)
+        fm = QFontMetrics(T.f_mono); lh = fm.height()
+        cw = (r.width() - 2*24)//len(self.COLS)
+        for c, ((title, _attr, _fmt), rows) in enumerate(zip(self.COLS, self.rows)):
+            x = r.left() + c*(cw + 24)
+            p.setPen(T.muted)
+            p.drawStaticText(x, r.top(), _static_text(title))
+            for i, (name, val) in enumerate(rows):
+                y = r.top() + (i + 1)*lh
+                vw = fm.horizontalAdvance(val) + 8
+                p.setPen(T.text)
+                p.drawText(QRect(x, y, cw - vw, lh), self.ALIGN_TL,
+                           fm.elidedText(name, Qt.TextElideMode.ElideRight, cw - vw))
+                p.setPen(T.value)
+                p.drawText(QRect(x, y, cw, lh), self.ALIGN_TR, val)
         p.end()
 
 
 # ───────────── カレンダー（濃い色） ─────────────
 class CustomCalendar(QCalendarWidget):
-    def __init__(self):
+    """
+    祝日はプロセス共通の HolidayIndex（DashboardHub が前後 5 年を 1 回だけバックグラウンド構築）から引く。
+    再着色は表示ページ変更（currentPageChanged）と日付変更（ローカル 0 時）のときだけ。
+    構築が終わるまでは土日だけ着色し、on_holidays_ready()（DashboardHub.holidays_ready から）で祝日を重ねる。
+    """
+    selfstats: SelfStats|None = None   # 自己計測中だけ、再着色の時間を取る（セルは C++ 側で描かれるので）
+
+    def __init__(self, holidays: HolidayIndex|None=None):
         super().__init__()
+        self.holidays = holidays or default_index()
+        self._colored: set[QDate] = set()   # 祝日書式を付けている日付
         self.setFirstDayOfWeek(Qt.DayOfWeek.Sunday)
         self.setVerticalHeaderFormat(QCalendarWidget.VerticalHeaderFormat.NoVerticalHeader)
         self.setNavigationBarVisible(True)
         self.setGridVisible(False)
-        self.setStyleSheet("background-color: rgba(0,0,0,70); color: white; border-radius: 10px;")
-        self.update_calendar_colors()
 
-    def update_calendar_colors(self):
+        # 平日の書式は固定。土日祝の色とスタイルシートはテーマから（切替時も apply_theme で）
         default_fmt = QTextCharFormat()
         for d in (Qt.DayOfWeek.Monday, Qt.DayOfWeek.Tuesday, Qt.DayOfWeek.Wednesday,
                   Qt.DayOfWeek.Thursday, Qt.DayOfWeek.Friday):
             self.setWeekdayTextFormat(d, default_fmt)
+        self.apply_theme(theme())
+
+        self.currentPageChanged.connect(lambda *_: self.update_calendar_colors())
+        self._midnight = QTimer(self); self._midnight.setSingleShot(True)
+        self._midnight.setTimerType(Qt.TimerType.PreciseTimer)  # 長時間でも粗タイマーの誤差を乗せない
+        self._midnight.timeout.connect(self._on_midnight)
+        self._schedule_midnight()
+        self._holidays_pending = not self.holidays.ready
+        self.update_calendar_colors()
 
-        sat = QTextCharFormat(); sat.setForeground(QColor("#00B7FF"))  # 土（濃く）
-        sun = QTextCharFormat(); sun.setForeground(QColor("#FF40FF"))  # 日（濃く）
-        self.setWeekdayTextFormat(Qt.DayOfWeek.Saturday, sat)
-        self.setWeekdayTextFormat(Qt.DayOfWeek.Sunday,   sun)
+    def apply_theme(self, t: Theme):
+        self.setStyleSheet(t.calendar_css)
+        self.setWeekdayTextFormat(Qt.DayOfWeek.Saturday, t.sat)
+        self.setWeekdayTextFormat(Qt.DayOfWeek.Sunday,   t.sun)
+        self.hol_fmt = t.holiday
+        for qd in self._colored:
+            self.setDateTextFormat(qd, self.hol_fmt)
+
+    def on_holidays_ready(self):
+        self._holidays_pending = False
+        self.update_calendar_colors()
 
-        hol = QTextCharFormat(); hol.setForeground(QColor("#4DE36B"))  # 祝（濃く）
-        today = datetime.date.today()
-        y, m = today.year, today.month
+    def update_calendar_colors(self):
+        st = self.selfstats
+        if st is None:
+            return self._recolor()
+        t = time.perf_counter(); self._recolor()
+        st.observe("paint", "CustomCalendar.recolor", (time.perf_counter()-t)*1e3)
+
+    def _recolor(self):
+        """表示中ページ（前後月のはみ出し分を含む 6 週）の祝日だけ書式を差し替える"""
+        y, m = self.yearShown(), self.monthShown()
         first = datetime.date(y, m, 1)
-        last  = (first.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
-        for d in range(1, last.day+1):
-            self.setDateTextFormat(QDate(y, m, d), QTextCharFormat())
-        for d in range(1, last.day+1):
-            day = datetime.date(y, m, d)
-            if jpholiday.is_holiday(day):
-                self.setDateTextFormat(QDate(y, m, d), hol)
+        start = first - datetime.timedelta(days=(first.weekday()+1) % 7)   # 日曜始まり
+        end = start + datetime.timedelta(days=41)
+        if self._holidays_pending and not all(self.holidays.has_year(y) for y in range(start.year, end.year+1)):
+            return   # 起動直後：GUI スレッドで jpholiday を引かず、構築完了を待つ
+        want = set()
+        for i in range(42):
+            day = start + datetime.timedelta(days=i)
+            if self.holidays.is_holiday(day):
+                want.add(QDate(day.year, day.month, day.day))
+        for qd in self._colored - want:
+            self.setDateTextFormat(qd, QTextCharFormat())
+        for qd in want - self._colored:
+            self.setDateTextFormat(qd, self.hol_fmt)
+        self._colored = want
+
+    def _schedule_midnight(self):
+        now = datetime.datetime.now()
+        nxt = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(0, 0, 1))
+        self._midnight.start(max(1000, int((nxt - now).total_seconds()*1000)))
+
+    def _on_midnight(self):
+        # 今日のページを見ていたら新しい今日へ追従
+        today = QDate.currentDate()
+        if (self.yearShown(), self.monthShown()) == (today.addDays(-1).year(), today.addDays(-1).month()):
+            self.setSelectedDate(today)
+        self.update_calendar_colors()
+        self._schedule_midnight()
 
 
 # ───────────── アナログ時計 ─────────────
 class AnalogClock(QWidget):
+    """
+    文字盤（円）はサイズ・DPR ごとに QPixmap へキャッシュし（他の画面とも共有）、paintEvent では針だけ描く。
+    smooth=False … 秒針は整数秒（秒境界の tick で 1 回だけ再描画）
+    smooth=True  … 秒針を連続的に動かす（再描画の頻度は呼び出し側で上限を決める）
+    """
+    HANDS = (0.55, 0.75, 0.85)   # 時・分・秒の半径比（太さは Theme.HAND_WIDTHS）
+    selfstats: SelfStats|None = None   # 自己計測中だけ（SelfMonitor.attach）
+
     def __init__(self):
         super().__init__()
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
         self.setMinimumSize(220,220)
-
+        self.smooth = False
+        self._face = None; self._face_key = None
+
+    def _radius(self):
+        return min(self.width(), self.height())//2 - 6
+
+    def _face_pixmap(self):
+        dpr, T = self.devicePixelRatioF(), theme()
+        key = ("clock_face", T.key, self.width(), self.height(), dpr)
+        if self._face_key != key:
+            def build():
+                pm = QPixmap(int(self.width()*dpr), int(self.height()*dpr))
+                pm.setDevicePixelRatio(dpr); pm.fill(Qt.GlobalColor.transparent)
+                p = QPainter(pm); p.setRenderHint(QPainter.RenderHint.Antialiasing)
+                p.setPen(T.face_pen); p.setBrush(T.face_fill)
+                c = QRectF(self.rect()).center(); radius = self._radius()
+                p.drawEllipse(c, radius, radius)
+                p.end()
+                return pm
+            self._face, self._face_key = _shared_pixmap(key, build), key
+        return self._face
+
+    @_timed_paint("AnalogClock")
     def paintEvent(self, _):
-        p=QPainter(self); p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        r=self.rect(); cx=r.center().x(); cy=r.center().y()
-        radius=min(r.width(), r.height())//2 - 6
-        p.setPen(QPen(QColor(255,180,140,180), 3))
-        p.setBrush(QColor(255,255,255,10))
-        p.drawEllipse(QPointF(cx,cy), radius, radius)
+        p=QPainter(self)
+        p.drawPixmap(0, 0, self._face_pixmap())
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        c=QRectF(self.rect()).center(); radius=self._radius()
         now=datetime.datetime.now()
-        def draw(angle_deg, length, thick):
-            rad=math.radians(angle_deg-90)
-            x=cx+length*math.cos(rad); y=cy+length*math.sin(rad)
-            p.setPen(QPen(QColor(255,220,200,220), thick)); p.drawLine(cx,cy,int(x),int(y))
-        sec=now.second + now.microsecond/1e6
+        sec=now.second + (now.microsecond/1e6 if self.smooth else 0.0)
         minv=now.minute + sec/60.0
         hour=(now.hour%12) + minv/60.0
-        draw(hour*30,   radius*0.55, 5)
-        draw(minv*6,    radius*0.75, 3)
-        draw(sec*6,     radius*0.85, 1)
+        for angle_deg, ratio, pen in zip((hour*30, minv*6, sec*6), self.HANDS, theme().hand_pens):
+            rad=math.radians(angle_deg-90)
+            p.setPen(pen)
+            p.drawLine(c, QPointF(c.x()+radius*ratio*math.cos(rad), c.y()+radius*ratio*math.sin(rad)))
         p.end()
 
 
-# ───────────── GPU モニタ（Windows PDH） ─────────────
-class GPUMonitor:
-    r"""
-    GPU Engine\Utilization Percentage  … 使用率(%)を合算
-    GPU Adapter Memory\Dedicated Usage … VRAM使用量(バイト)を合算
+# ───────────── 更新スケジューラ ─────────────
+@dataclass(slots=True)
+class _Job:
+    name: str
+    interval: float
+    fn: object
+    align: bool      # 壁時計の境界直後に揃える
+    scaled: bool     # Scheduler.scale（バッテリー時など）を掛ける
+    always: bool     # suspend 中も動かす（可視判定など）
+    next: float = 0.0
+    runs: int = 0
+
+
+class Scheduler(QObject):
     """
-    def __init__(self):
-        self.query = win32pdh.OpenQuery()
-        self.engine_counters = []
-        self.mem_counters_usage = []
-        self.mem_counters_limit = []
-        try:
-            # EnumObjectItems は (counters, instances) の順
-            _counters, instances = win32pdh.EnumObjectItems(None, None, "GPU Engine", win32pdh.PERF_DETAIL_WIZARD)
-            for inst in instances or []:
-                # MakeCounterPath: (machine, object, instance, parentInstance, index, counter)
-                path = win32pdh.MakeCounterPath((None, "GPU Engine", inst, None, 0, "Utilization Percentage"))
-                self.engine_counters.append(win32pdh.AddCounter(self.query, path))
-
-            _counters_m, mem_instances = win32pdh.EnumObjectItems(None, None, "GPU Adapter Memory", win32pdh.PERF_DETAIL_WIZARD)
-            for inst in mem_instances or []:
-                path_u = win32pdh.MakeCounterPath((None, "GPU Adapter Memory", inst, None, 0, "Dedicated Usage"))
-                self.mem_counters_usage.append(win32pdh.AddCounter(self.query, path_u))
-                # Limit が無い環境もある
-                try:
-                    path_l = win32pdh.MakeCounterPath((None, "GPU Adapter Memory", inst, None, 0, "Dedicated Limit"))
-                    self.mem_counters_limit.append(win32pdh.AddCounter(self.query, path_l))
-                except win32pdh.error:
-                    pass
+    ジョブごとの周期を 1 本の単発 QTimer で回す（次に期限が来るジョブの時刻で起床）。
+    suspend() 中は always=True のジョブだけ。wake() で即再開。
+    stats() で起床回数（直近 1 分）とジョブ別実行回数を返す。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs: list[_Job] = []
+        self.scale = 1.0
+        self.suspended = False
+        self.started = False
+        self.wakeups = 0
+        self._recent = collections.deque()   # 直近 60 秒の起床時刻
+        self.timer = QTimer(self); self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._fire)
+
+    def add(self, name, interval, fn, align=False, scaled=True, always=False):
+        j = _Job(name, interval, fn, align, scaled, always)
+        self.jobs.append(j)
+        if self.started:
+            j.next = self._next_due(j, time.monotonic()); self._arm()
+        return j
+
+    def remove(self, j):
+        if j in self.jobs:
+            self.jobs.remove(j)
+            if self.started:
+                self._arm()
+
+    def start(self):
+        now = time.monotonic()
+        for j in self.jobs:
+            j.next = self._next_due(j, now)
+        self.started = True
+        self._arm()
+
+    def _next_due(self, j, now):
+        iv = j.interval*(self.scale if j.scaled else 1.0)
+        if j.align:
+            wall = time.time()
+            return now + (math.floor(wall/iv) + 1)*iv - wall + 0.003   # 境界の直後
+        return now + iv
+
+    def _active(self):
+        return [j for j in self.jobs if j.always or not self.suspended]
+
+    def _arm(self):
+        act = self._active()
+        if not act:
+            self.timer.stop(); return
+        delay = min(j.next for j in act) - time.monotonic()
+        self.timer.start(max(0, math.ceil(delay*1000)))
+
+    def _fire(self):
+        now = time.monotonic()
+        self.wakeups += 1; self._recent.append(now)
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+        for j in self._active():
+            if j.next <= now + 0.002:
+                j.runs += 1
+                j.fn()
+                j.next = self._next_due(j, time.monotonic())
+        self._arm()
+
+    def set_scale(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        now = time.monotonic()
+        for j in self.jobs:
+            if j.scaled:
+                j.next = self._next_due(j, now)
+        self._arm()
+
+    def suspend(self):
+        if not self.suspended:
+            self.suspended = True; self._arm()
+
+    def wake(self):
+        """suspend 解除。止めていたジョブは即実行"""
+        if self.suspended:
+            self.suspended = False
+            now = time.monotonic()
+            for j in self.jobs:
+                if not j.always:
+                    j.next = now
+            self._arm()
+
+    def stats(self):
+        now = time.monotonic()
+        return {"wakeups": self.wakeups,
+                "wakeups_per_min": sum(1 for t in self._recent if t >= now - 60),
+                "timers": 1 if self.timer.isActive() else 0,
+                "suspended": self.suspended, "scale": self.scale,
+                "jobs": {j.name: j.runs for j in self.jobs}}
+
+
+# ───────────── 自己計測（F12） ─────────────
+class StatsOverlay(QWidget):
+    """自己計測の要約（左上）。文字は refresh() で作り、paintEvent では描くだけ"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
+        self.lines: list[str] = []
 
-            # 初回サンプル収集
-            win32pdh.CollectQueryData(self.query)
+    def set_lines(self, lines):
+        if lines != self.lines:
+            self.lines = lines
+            fm = QFontMetrics(theme().f_mono)
+            self.resize(max(fm.horizontalAdvance(l) for l in lines) + 24, fm.height()*len(lines) + 16)
+            self.update()
 
-        except win32pdh.error:
-            # 使えない環境では空のまま
-            pass
+    def paintEvent(self, _):
+        p = QPainter(self); T = theme()
+        p.setBrush(T.overlay); p.setPen(Qt.PenStyle.NoPen); p.drawRoundedRect(self.rect(), 8, 8)
+        p.setPen(T.overlay_text); p.setFont(T.f_mono)
+        fm = QFontMetrics(T.f_mono)
+        for i, line in enumerate(self.lines):
+            p.drawText(12, 8 + fm.ascent() + i*fm.height(), line)
+        p.end()
 
-    def read(self):
+
+class SelfMonitor(QObject):
+    """
+    ダッシュボード自身の計測（DashboardHub に 1 つ。全画面の Dashboard で共有）。無効の間は何も差し込まない。
+    enable() で hub の各 Dashboard のウィジェット（PAINTED・カレンダー）に selfstats を入れ、
+    paintEvent の時間・update_all の内訳・Provider の収集時間を取り始める（インスタンス単位。クラスは差し替えない）。
+    disable() で外す（集計値は残る）。
+    カレンダーのセルは C++ 側で描かれ計時できないので、表示部の Paint 回数と再着色の時間を取る。
+    """
+    PAINTED = (Panel, SparkGraph, AnalogClock)
+
+    def __init__(self, hub):
+        super().__init__(hub)
+        self.hub = hub
+        self.stats = SelfStats()
+        self.active = False
+        self._jobs = []
+        self._keep = False                    # 書き出し先（--stats-file / --stats-port）がある間は常に計測
+        self._prev = (time.monotonic(), {})   # paints/s 用（前回の回数）
+
+    def enable(self):
+        if self.active:
+            return
+        self.active = True
         try:
-            win32pdh.CollectQueryData(self.query)
-        except win32pdh.error:
-            return None
+            for d in self.hub.dashboards:
+                self.attach(d)
+            self.hub.sampler.listeners.append(self._on_snapshot)
+            self._jobs.append(self.hub.scheduler.add("selfstats", 1.0, self.refresh, align=True, scaled=False))
+        except Exception:
+            self.disable()   # 途中まで入れた分を外す
+            raise
+
+    def disable(self):
+        if not self.active:
+            return
+        self.active = False
+        for d in self.hub.dashboards:
+            self.detach(d)
+        with contextlib.suppress(ValueError):
+            self.hub.sampler.listeners.remove(self._on_snapshot)
+        for j in self._jobs:
+            self.hub.scheduler.remove(j)
+        self._jobs.clear()
+
+    # Dashboard ごと（有効中に画面が増えたときも hub から呼ばれる）
+    def attach(self, d):
+        self._instrument(d, self.stats)
+        view = d.calendar.findChild(QWidget, "qt_calendar_calendarview")
+        if view is not None:
+            view.viewport().installEventFilter(self)
+
+    def detach(self, d):
+        self._instrument(d, None)
+        view = d.calendar.findChild(QWidget, "qt_calendar_calendarview")
+        if view is not None:
+            view.viewport().removeEventFilter(self)
+        d.stats_overlay.hide()
+
+    def _instrument(self, d, st):
+        d.selfstats = st; d.calendar.selfstats = st
+        for cls in self.PAINTED:
+            for w in d.findChildren(cls):
+                w.selfstats = st
+
+    def toggle_overlay(self, d):
+        ov = d.stats_overlay
+        if ov.isVisible():
+            ov.hide()
+            if not self._keep and not any(x.stats_overlay.isVisible() for x in self.hub.dashboards):
+                self.disable()
+        else:
+            self.enable()
+            ov.move(8, 8); ov.raise_(); ov.show()
+            self.refresh()
+
+    def export(self, path=None, port=None):
+        self._keep = True
+        self.enable()
+        if port:
+            serve_stats(self.stats, port=port)
+        if path:
+            self._jobs.append(self.hub.scheduler.add("selfstats_dump", 10.0, lambda: self.stats.dump(path),
+                                                     align=True, scaled=False, always=True))
+
+    def eventFilter(self, obj, e):
+        if e.type() == e.Type.Paint:
+            self.stats.count("paints", "CustomCalendar")
+        return False
+
+    # サンプラスレッドから：Provider 別の収集時間（gpu = GPUMonitor.read）
+    def _on_snapshot(self, s):
+        for name, ms in s.timings:
+            self.stats.observe("collect", name, ms)
+
+    def refresh(self):
+        overlays = [d.stats_overlay for d in self.hub.dashboards if d.stats_overlay.isVisible()]
+        if not overlays:
+            return
+        st = self.stats
+        now = time.monotonic(); t0, prev = self._prev
+        counts = {label: n for (fam, label), n in st.counter_items() if fam == "paints"}
+        dt = max(now - t0, 1e-6)
+        self._prev = (now, counts)
+        pr = st.process()
+        def q(fam, label):
+            h = st.hist(fam, label)
+            return f"{h.quantile(0.5):5.2f}/{h.quantile(0.99):6.2f}" if h else "    -/     -"
+        lines = [f"self   CPU {pr['cpu_percent']:5.1f}%   RSS {pr['rss_bytes']/(1 << 20):6.1f} MB"
+                 f"   screens {len(self.hub.dashboards)}",
+                 f"{'paint':16} {'/s':>5}  p50/p99 ms"]
+        for name in [c.__name__ for c in self.PAINTED] + ["CustomCalendar"]:
+            rate = (counts.get(name, 0) - prev.get(name, 0))/dt
+            key = "CustomCalendar.recolor" if name == "CustomCalendar" else name
+            lines.append(f"  {name:14} {rate:5.1f}  {q('paint', key)}")
+        lines.append("update_all       p50/p99 ms")
+        for name in ("cpu", "ram", "gpu", "net", "top", "clock"):
+            if st.hist("update", name) is not None:
+                lines.append(f"  {name:14}        {q('update', name)}")
+        lines.append("collect          p50/p99 ms")
+        for (fam, label), _h in st.hist_items():
+            if fam != "collect":
+                continue
+            lines.append(f"  {label:14}        {q(fam, label)}")
+        for ov in overlays:
+            ov.set_lines(lines)
+
+
+# ───────────── 共有ハブ（画面ごとの Dashboard で 1 つ） ─────────────
+class DashboardHub(QObject):
+    """
+    計測（Collector → Sampler → 履歴ストア）・電源チェック・自己計測を 1 つだけ持ち、画面ごとの Dashboard で共有する。
+    画面を増やしても増えるのは描画だけ（フォントと背景・文字盤のピクスマップも _font / _shared_pixmap で共有）。
+      open_screens(which, layouts) … 対象の QScreen ごとに Dashboard を作り、画面の追加・削除・主画面の変更に追従
+      サンプラは最初の Dashboard の初回描画後に開始し、全 Dashboard が見えないときだけ止める
+    読む Provider は全 Dashboard に載ったパネルの分だけ（Collector.set_sources）。
+    config（layout_config.LayoutConfig）… パネルの並び・周期・表示範囲。watch() でファイルの変更を反映（再起動なし）
+    """
+    # 作り直した Dashboard（古い方, 新しい方）。画面に出さない Dashboard の持ち主（WallpaperRenderer）が追従する
+    replaced = pyqtSignal(object, object)
+    # 祝日表の構築完了（構築スレッドから emit。受けるのは GUI スレッドの各 Dashboard）
+    holidays_ready = pyqtSignal()
 
-        def val_of(c):
-            try:
-                _t, v = win32pdh.GetFormattedCounterValue(c, win32pdh.PDH_FMT_DOUBLE)
-                return max(0.0, float(v))
-            except win32pdh.error:
-                return 0.0
+    def __init__(self, collector: Collector|None=None, sample_interval=1.0, store: HistoryStore|None=None,
+                 top=0, iface: str|None=None, config: LayoutConfig|None=None, layouts: dict[str, str]|None=None):
+        super().__init__()
+        self.config = config or LayoutConfig()
+        self._cli_top = top
+        self.top = top or self.config.top()
+        # 既定は CPU/GPU/NET 1 秒、RAM 5 秒、上位プロセス 2 秒（config の interval で変更）。
+        # 秒境界の少し前に計測して GUI の秒更新に間に合わせる。作るのは最初の Dashboard の登録後（sources が決まってから）
+        self.collector = collector or Collector(intervals=self.config.intervals(), procs=self.top, iface=iface,
+                                                sources=())
+        self.sampler = Sampler(self.collector, interval=sample_interval, align=sample_interval > 0)
+        # 履歴（1 tick 1 件追記。グラフの 24h / 7d 表示はここから読む）
+        self.store = store
+        if store is not None:
+            self.sampler.listeners.append(store)
+        # 移動統計とアラート（EWMA / 窓内最大 / p95。サンプラスレッドで 1 サンプルごとに更新）
+        self.rolling = StatsTracker(self.config.panels)
+        self.sampler.listeners.append(self.rolling)
+        self.dashboards: list[Dashboard] = []
+        self._hidden: dict[int, bool] = {}
+        # 共有メモリに公開中（--shm）は、全画面が隠れても計測を止めない（読み手がいるので）
+        self.keep_sampling = False
+        self._which = None; self._layouts = dict(layouts or {}); self._options: dict = {}
+        # 電源 30 秒（バッテリー駆動中は計測周期を 2 倍）
+        self.scheduler = Scheduler(self)
+        self.scheduler.add("power", 30.0, self._check_power, align=True, scaled=False, always=True)
+        self.scheduler.start()
+        self.monitor = SelfMonitor(self)
+        # 祝日表（前後 5 年）は画面の数に関係なく 1 回だけ構築し、全カレンダーで共有
+        self.holidays = default_index()
+        self.holidays.build_async(on_done=self._emit_holidays_ready)
+
+    def _emit_holidays_ready(self):
+        try:
+            self.holidays_ready.emit()
+        except RuntimeError:   # 構築中にハブが破棄された
+            pass
 
-        util = sum(val_of(c) for c in self.engine_counters)
-        used_bytes = sum(val_of(c) for c in self.mem_counters_usage)
-        total_bytes = sum(val_of(c) for c in self.mem_counters_limit) if self.mem_counters_limit else 0.0
+    # Dashboard の登録・解除
+    def register(self, d):
+        self.dashboards.append(d); self._hidden[id(d)] = False
+        if self.monitor.active:
+            self.monitor.attach(d)
+        self._update_plan()
+
+    def release(self, d):
+        if d in self.dashboards:
+            self.dashboards.remove(d); self._hidden.pop(id(d), None)
+            self._update_plan()
+        if not self.dashboards and self._which is None:
+            self.sampler.stop()
+
+    def _update_plan(self):
+        """載っているパネルの分だけ読む（GPU パネルが無ければ GPUMonitor も PDH クエリも作らない）"""
+        placed = set().union(*(d.placed for d in self.dashboards)) if self.dashboards else set()
+        self.collector.set_sources(sources_for(placed), self.config.intervals(), self.top)
+
+    # 設定ファイルの変更を反映（2 秒ごとに更新時刻を見る）
+    def watch(self):
+        if self.config.path is not None:
+            self.scheduler.add("config", 2.0, self._check_config, align=True, scaled=False, always=True)
+
+    def _check_config(self):
+        if self.config.changed():
+            self.reload()
+
+    def reload(self):
+        try:
+            cfg = layout_config.load(self.config.path)
+        except (OSError, ValueError) as e:
+            # 書きかけ・誤りは今の設定のまま（次に保存されたら読み直す）
+            print(f"[config] {e}", file=sys.stderr)
+            with contextlib.suppress(OSError):
+                self.config.mtime = os.stat(self.config.path).st_mtime
+            return
+        self.config = cfg
+        self.rolling.configure(cfg.panels)
+        top = self._cli_top or cfg.top()
+        rebuild = top != self.top
+        self.top = top
+        for d in list(self.dashboards):
+            if rebuild or d.layout_spec != self._layout_for(d.target_screen):
+                self.replace(d)
+            else:
+                d.apply_config(cfg)
+        self._update_plan()
+        print(f"[config] reloaded {cfg.path}", file=sys.stderr)
+
+    def replace(self, d):
+        """同じ画面に今の設定で作り直す（グラフの履歴は引き継ぐ）"""
+        new = Dashboard(hub=self, screen=d.target_screen, layout=self._layout_for(d.target_screen),
+                        headless=d.headless, **({} if d.headless else self._options))
+        new.adopt(d)
+        d.close(); d.deleteLater()
+        if not new.headless:
+            new.show()
+        self.replaced.emit(d, new)
+        return new
+
+    def start(self):
+        """サンプラ開始（最初の Dashboard の初回描画後。2 つ目以降は何もしない）"""
+        if self.sampler.ident is None:
+            self.sampler.start()
+
+    def set_hidden(self, d, hidden):
+        self._hidden[id(d)] = hidden
+        if all(self._hidden.values()) and not self.keep_sampling:
+            self.sampler.pause()
+        else:
+            self.sampler.resume()
 
-        return {"util": util, "vram_used": used_bytes, "vram_total": total_bytes}
+    def _check_power(self):
+        try:
+            import psutil
+            b = psutil.sensors_battery()
+        except Exception:
+            b = None
+        scale = 2.0 if (b is not None and not b.power_plugged) else 1.0
+        self.sampler.set_scale(scale)
+        for d in self.dashboards:
+            d.scheduler.set_scale(scale)
+
+    # 画面ごと
+    def open_screens(self, which="all", layouts: dict[str, str]|None=None, **options):
+        """
+        which   … "all" / "primary" / 画面番号・画面名のリスト
+        layouts … {画面番号 or 画面名 or "*": レイアウト文字列}（None = コンストラクタで渡したもの）
+        options … Dashboard へそのまま渡す（sweep_fps など）
+        """
+        self._which = which; self._options = options
+        if layouts is not None:
+            self._layouts = dict(layouts)
+        app = QApplication.instance()
+        app.screenAdded.connect(lambda _s: self._sync())
+        app.screenRemoved.connect(self._sync)
+        app.primaryScreenChanged.connect(lambda _s: self._sync())
+        self._sync()
+
+    def _wanted(self, gone=None):
+        app = QApplication.instance()
+        screens = [sc for sc in app.screens() if sc is not gone]
+        if self._which == "all":
+            return screens
+        if self._which == "primary":
+            return [app.primaryScreen()]
+        return [sc for i, sc in enumerate(screens) if str(i) in self._which or sc.name() in self._which]
+
+    def _layout_for(self, sc):
+        """画面名 → 画面番号 → 全画面（"*"）の順。コマンドライン（--layout / --screen-layout）が設定ファイルより優先"""
+        layouts = {**self.config.layouts, **self._layouts}
+        if sc is None:
+            return layouts.get("*")
+        i = QApplication.instance().screens().index(sc)
+        return layouts.get(sc.name()) or layouts.get(str(i)) or layouts.get("*")
+
+    def _sync(self, gone=None):
+        wanted = self._wanted(gone)
+        for d in list(self.dashboards):
+            if d.target_screen not in wanted:
+                d.close(); d.deleteLater()
+        have = {d.target_screen for d in self.dashboards}
+        for sc in wanted:
+            if sc not in have:
+                Dashboard(hub=self, screen=sc, layout=self._layout_for(sc), **self._options).show()
 
 
 # ───────────── ダッシュボード ─────────────
 class Dashboard(QWidget):
-    def __init__(self):
+    # 起動時の重い初期化（CPU 名・numpy・WorkerW 探索など）の結果。ワーカースレッドから emit
+    loaded = pyqtSignal(str, object)
+
+    # F9 で切替えるグラフの表示範囲（秒）。1 時間まではライブのリングバッファ、それより長いと履歴ストアから
+    VIEWS = (60, 600, 3600, 86400, 7*86400)
+    LIVE_MAX = 3600
+    # グラフのあるパネル → 履歴の系列名
+    SERIES = {"cpu": "cpu", "ram": "ram_percent", "gpu": "gpu_util", "net": "net_down"}
+
+    def __init__(self, collector: Collector|None=None, sample_interval=1.0, sweep_fps=0,
+                 store: HistoryStore|None=None, top=0, iface: str|None=None,
+                 hub: DashboardHub|None=None, screen=None, layout: str|None=None, headless=False):
         super().__init__()
+        # 計測は画面をまたいで共有（hub を渡さなければこの Dashboard 専用に作る）
+        self.hub = hub or DashboardHub(collector, sample_interval, store, top, iface)
+        self.collector, self.sampler, self.store = self.hub.collector, self.hub.sampler, self.hub.store
+        self.target_screen = screen
+        # headless … 画面に出さずに render() で画像へ描くだけ（WallpaperRenderer）。可視判定・壁紙アタッチなし
+        self.headless = headless
         # 透明・枠なし
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
 
@@ -282,68 +1385,160 @@ class Dashboard(QWidget):
         self.cpu_graph = SparkGraph(y_max=100.0, y_label="%")
         self.ram_graph = SparkGraph(y_max=100.0, y_label="%")
         self.gpu_graph = SparkGraph(y_max=100.0, y_label="%")
-        self.net_graph = SparkGraph(y_max=1024.0, y_label="KB/s")
+        self.net_graph = SparkGraph(y_max=None, y_label="KB/s", y_floor=64.0)   # 上端は表示範囲から自動
 
-        self.cpu_panel = Panel("CPU", subtitle=self._cpu_name()); self.cpu_panel.set_graph(self.cpu_graph)
-        self.ram_panel = Panel("RAM", subtitle=self._ram_total()); self.ram_panel.set_graph(self.ram_graph)
+        # CPU 名は初回描画後にバックグラウンドで、RAM 合計は最初のスナップショットで埋める
+        self.cpu_panel = Panel("CPU", subtitle="…"); self.cpu_panel.set_graph(self.cpu_graph)
+        self.ram_panel = Panel("RAM", subtitle="…"); self.ram_panel.set_graph(self.ram_graph)
         self.gpu_panel = Panel("GPU", subtitle=self._gpu_name()); self.gpu_panel.set_graph(self.gpu_graph)
-        self.net_panel = Panel("Wi-Fi", subtitle=self._net_iface()); self.net_panel.set_graph(self.net_graph)
+        self.net_panel = Panel("Network", subtitle="…"); self.net_panel.set_graph(self.net_graph)
 
         # 中央：上=カレンダー、下=時計（アナログ＋テキスト）
         cal_wrap = Panel("Calendar", show_border=False)
-        self.calendar = CustomCalendar(); self.calendar.setParent(cal_wrap)
+        self.calendar = CustomCalendar(self.hub.holidays); self.calendar.setParent(cal_wrap)
         cal_wrap.resizeEvent = lambda e, w=cal_wrap: self._place_calendar(w)
 
         self.clock_panel = Panel("", show_border=False)
         self.analog = AnalogClock(); self.analog.setParent(self.clock_panel)
         self.clock_label = QLabel("", self.clock_panel)
         self.clock_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.clock_label.setStyleSheet("color:#e5e7eb;")
-        self.clock_label.setFont(QFont("Consolas", 22, QFont.Weight.DemiBold))
+        self.clock_label.setStyleSheet(theme().clock_css)
+        self.clock_label.setFont(theme().f_clock)
+        self._clock_text = ""
         self.clock_panel.resizeEvent = lambda e, w=self.clock_panel: self._place_clock(w)
 
-        # 配置
-        grid.addWidget(self.cpu_panel,   0, 0)
-        grid.addWidget(cal_wrap,         0, 1)
-        grid.addWidget(self.ram_panel,   0, 2)
-        grid.addWidget(self.gpu_panel,   1, 0)
-        grid.addWidget(self.clock_panel, 1, 1)
-        grid.addWidget(self.net_panel,   1, 2)
+        # 上位プロセス（任意。--top N）
+        self.top_panel = TopPanel(self.hub.top) if self.hub.top > 0 else None
+
+        # 配置：layout（既定 LAYOUT、上位プロセスありなら最下段に追加）に載ったパネルだけ。載らないものは隠して更新もしない
+        panels = {"cpu": self.cpu_panel, "ram": self.ram_panel, "gpu": self.gpu_panel, "net": self.net_panel,
+                  "calendar": cal_wrap, "clock": self.clock_panel, "top": self.top_panel}
+        self.layout_spec = layout   # hub が設定の変更を比べる（None = 既定）
+        rows = parse_layout(layout or (LAYOUT + "/top" if self.top_panel is not None else LAYOUT))
+        ncols = max(len(r) for r in rows)
+        self.placed: set[str] = set()
+        for r, row in enumerate(rows):
+            for c, name in enumerate(row):
+                if panels[name] is None:
+                    print(f"[layout] {name}: not available (use --top N)", file=sys.stderr); continue
+                grid.addWidget(panels[name], r, c, 1, ncols - c if c == len(row) - 1 else 1)
+                self.placed.add(name)
+        for name, w in panels.items():
+            if w is not None and name not in self.placed:
+                w.setParent(self); w.hide()
+        appliers = {"cpu": self._apply_cpu, "ram": self._apply_ram, "gpu": self._apply_gpu, "net": self._apply_net}
+        if self.top_panel is not None:
+            appliers["top"] = self.top_panel.set_snapshot
+        self._appliers = tuple((name, fn) for name, fn in appliers.items() if name in self.placed)
+
+        # 計測（別スレッド。GUI 側は最新スナップショットを読むだけ）
+        self._last_seq = 0
+        # サンプラ（PDH の列挙を含む）の開始と重い初期化は初回描画の後
+        self.marks: dict[str, float] = {}   # 起動の節目（perf_counter）。--profile-startup で表示
+        self.on_mark = None
+        self._painted = False
+        self._workerw = None
+        self.loaded.connect(self._on_loaded)
+        # 自己計測（F12 でオーバーレイ。無効の間は selfstats=None で計測なし。集計は hub.monitor）
+        self.selfstats: SelfStats|None = None
+        self.stats_overlay = StatsOverlay(self); self.stats_overlay.hide()
+        # グラフの表示範囲（既定 10 分。設定の window でパネルごとに）
+        self._view = 600
+        self._views: dict[str, int] = {}
+        self.apply_config(self.hub.config)
+
+        # 更新スケジュール：秒境界に揃えた 1 秒 tick（時計＋最新値反映）、可視判定 2 秒、履歴 60 秒（電源は hub）
+        # すべて秒境界に揃えて、同じ起床でまとめて実行する
+        self.scheduler = Scheduler(self)
+        self.scheduler.add("tick", 1.0, self.update_all, align=True, scaled=False)
+        if not headless:
+            self.scheduler.add("visibility", 2.0, self._check_visibility, align=True, scaled=False, always=True)
+        self.scheduler.add("history", 60.0, self._refresh_history, align=True, scaled=False)
+        # 秒針スイープ（任意）。針だけの再描画を上限 30fps で
+        if sweep_fps > 0 and "clock" in self.placed:
+            self.analog.smooth = True
+            self.scheduler.add("sweep", 1.0/min(sweep_fps, 30), self.analog.update, scaled=False)
+        self.scheduler.start()
+        self.hub.register(self)
+
+        if headless:
+            # 表示扱い（レイアウトは効く）だがウィンドウは作らない。初回描画を待たずに起動処理へ
+            # update() による再描画も止める（描くのは render() のときだけ。WallpaperRenderer.frame で一時的に有効化）
+            self.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen, True)
+            self.setUpdatesEnabled(False)
+            self._painted = True; self._mark("first_paint")
+            QTimer.singleShot(0, self._after_first_paint)
+        else:
+            # 全画面（画面の解像度・位置が変わったら合わせ直す）
+            self.to_fullscreen()
+            if screen is not None:
+                screen.geometryChanged.connect(self._on_screen_geometry)
 
-        # 計測
-        self.last_net = psutil.net_io_counters()
-        self.gpu = GPUMonitor()
+        # 接続してから構築済みか確かめる（接続より前に終わっていた分を取りこぼさない。2 回届いても同じ結果）
+        self.hub.holidays_ready.connect(self._on_holidays_ready)
+        if self.hub.holidays.ready:
+            self._on_holidays_ready()
 
-        # 1秒更新
-        self.timer = QTimer(self); self.timer.timeout.connect(self.update_all); self.timer.start(1000)
+    def _on_holidays_ready(self):
+        self.calendar.on_holidays_ready(); self._mark("holidays")
 
-        # 全画面
-        self.to_fullscreen()
-
-        # 壁紙レイヤーへ
-        QTimer.singleShot(0, self.attach_to_wallpaper)
+    @property
+    def monitor(self):
+        return self.hub.monitor
 
     # 画面操作
     def to_fullscreen(self):
-        screen = QApplication.primaryScreen().geometry()
-        self.setGeometry(0,0,screen.width(),screen.height())
+        sc = self.target_screen or QApplication.primaryScreen()
+        self.setScreen(sc)   # DPR はこの画面のものになる
+        self.setGeometry(sc.geometry())
         self.showFullScreen()
         self._is_fullscreen = True
 
+    def _on_screen_geometry(self, _rect):
+        if self._is_fullscreen:
+            self.to_fullscreen()
+        if self._workerw is not None:
+            self._attach(self._workerw)
+
     def toggle_fullscreen(self):
         if self._is_fullscreen:
             self.showNormal()
             self.resize(1460, 820)
-            self.move(120, 120)
+            g = (self.target_screen or QApplication.primaryScreen()).geometry()
+            self.move(g.left() + 120, g.top() + 120)
             self._is_fullscreen = False
         else:
             self.to_fullscreen()
 
+    # 見えていない間（全画面アプリ・ロック・最小化）は描画を止める。計測は全画面が見えないときだけ hub が止める
+    def _check_visibility(self):
+        try:
+            hwnd = int(self.winId())
+            hidden = (not self.isVisible() or self.isMinimized()
+                      or _session_locked() or _wallpaper_covered(hwnd))
+        except Exception:
+            hidden = False
+        if hidden and not self.scheduler.suspended:
+            self.scheduler.suspend(); self.hub.set_hidden(self, True)
+        elif not hidden and self.scheduler.suspended:
+            self.resume_updates()
+
+    def resume_updates(self):
+        self.hub.set_hidden(self, False); self.scheduler.wake()
+
     def keyPressEvent(self, e):
+        self.resume_updates()
         if e.key()==Qt.Key.Key_Escape:
             QApplication.quit()
         elif e.key()==Qt.Key.Key_F11:
             self.toggle_fullscreen()
+        elif e.key()==Qt.Key.Key_F9:
+            self.cycle_view()
+        elif e.key()==Qt.Key.Key_F12:
+            self.monitor.toggle_overlay(self)
+        elif e.key()==Qt.Key.Key_F8:
+            modes = list(PALETTES)
+            set_theme(modes[(modes.index(theme().mode) + 1) % len(modes)])
         elif e.key()==Qt.Key.Key_F10:
             self.click_through = not self.click_through
             self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, self.click_through)
@@ -352,34 +1547,156 @@ class Dashboard(QWidget):
             except Exception:
                 pass
 
+    # テーマ切替（set_theme から。描画で参照するものは Theme から直接読むので、ここはスタイルシートだけ）
+    def apply_theme(self, t: Theme):
+        self.clock_label.setStyleSheet(t.clock_css)
+
+    # 設定の反映（レイアウト以外。レイアウトが変わったときは hub が作り直す）
+    def apply_config(self, cfg: LayoutConfig):
+        self._views = {series: cfg.window(panel, self._view) for panel, series in self.SERIES.items()}
+        self._refresh_history()
+
+    def adopt(self, old: "Dashboard"):
+        """作り直す前の Dashboard からグラフの履歴と F9 の表示範囲を引き継ぐ"""
+        latest = self.sampler.latest
+        # 前の Dashboard が反映済みの最新値は、こちらの初回 update_all() でもう一度 push されるので捨てる
+        drop = 1 if latest is not None and old._last_seq == latest.seq else 0
+        for name in ("cpu_graph", "ram_graph", "gpu_graph", "net_graph"):
+            getattr(self, name).take_over(getattr(old, name), drop)
+        if old._view != self._view:
+            self._view = old._view
+            self.apply_config(self.hub.config)
+
+    # グラフの表示範囲：1m → 10m → 1h →（履歴があれば）24h → 7d。全グラフをそろえる
+    def cycle_view(self):
+        views = [v for v in self.VIEWS if v <= self.LIVE_MAX or self.store is not None]
+        self.set_view(views[(views.index(self._view) + 1) % len(views)] if self._view in views else views[0])
+
+    def set_view(self, seconds):
+        self._view = seconds
+        self._views = dict.fromkeys(self.SERIES.values(), seconds)
+        self._refresh_history()
+
+    @staticmethod
+    def _view_tag(seconds):
+        if seconds < 60:
+            return f"{seconds}s"
+        return f"{seconds//86400}d" if seconds >= 2*86400 else f"{seconds//3600}h" if seconds >= 3600 else f"{seconds//60}m"
+
+    def _graph_series(self):
+        """(グラフ, 履歴の系列名, 表示単位への換算, 単位)。配置されたパネルの分だけ"""
+        return tuple(g for panel, g in (("cpu", (self.cpu_graph, "cpu", 1.0, "%")),
+                                        ("ram", (self.ram_graph, "ram_percent", 1.0, "%")),
+                                        ("gpu", (self.gpu_graph, "gpu_util", 1.0, "%")),
+                                        ("net", (self.net_graph, "net_down", 1/1024, "KB/s"))) if panel in self.placed)
+
+    def _refresh_history(self):
+        now = time.time()
+        for g, name, k, unit in self._graph_series():
+            win = self._views.get(name, self._view)
+            if self.store is None:
+                win = min(win, self.LIVE_MAX)
+            tag = self._view_tag(win)
+            if win <= self.LIVE_MAX:
+                g.set_window(win)
+                if g._history is not None or g.y_label != f"{unit} {tag}":
+                    g.show_history(None, f"{unit} {tag}")
+                continue
+            t0 = now - win
+            tier = self.store.pick_tier(t0, now)
+            step = dict((n, iv) for n, iv, _r in self.store.tiers)[tier]
+            ts, vals = self.store.series(name, t0, now, tier=tier)
+            if k != 1.0:
+                vals = [v*k for v in vals]
+            g.show_history((ts, vals, t0, now, step), f"{unit} {tag}")
+
     def _place_calendar(self, panel: Panel):
         r = panel.rect().adjusted(8,8,-8,-8)
         self.calendar.setGeometry(r.left(), r.top(), r.width(), int(r.height()*0.60))
 
+    # 配置はリサイズ時だけ
     def _place_clock(self, panel: Panel):
         r = panel.rect().adjusted(8,8,-8,-8)
         size = min(r.width(), r.height())//2 + 20
         cx = r.center().x() - size//2
         self.analog.setGeometry(cx, r.top()+30, size, size)
-        now = datetime.datetime.now()
-        self.clock_label.setText(f"{now:%H:%M:%S}\n{now:%Y-%m-%d %A}")
         self.clock_label.setGeometry(r.left(), r.bottom()-120, r.width(), 110)
+        self._update_clock()
+
+    # 秒ごと：文字と針だけ
+    def _update_clock(self):
+        now = datetime.datetime.now()
+        t = f"{now:%H:%M:%S}\n{now:%Y-%m-%d %A}"
+        if t != self._clock_text:
+            self._clock_text = t
+            self.clock_label.setText(t)
+        if not self.analog.smooth:
+            self.analog.update()
+
+    # 起動：初回描画の後で計測と重い初期化を始める（結果は loaded で GUI スレッドへ）
+    def _mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+            if self.on_mark is not None:
+                self.on_mark(name)
+
+    def _after_first_paint(self):
+        # 最初のスナップショットだけは次の秒 tick を待たずに反映（他の画面で計測済みならすぐ）
+        if self.sampler.latest is not None:
+            self.update_all()
+        else:
+            def first(snap):
+                self.sampler.listeners.remove(first)
+                try:
+                    self.loaded.emit("snapshot", snap)
+                except RuntimeError:   # 閉じた後
+                    pass
+            self.sampler.listeners.append(first)
+        self.hub.start()
+        self._in_background("cpu_name", self._cpu_name)
+        self._in_background("numpy", _import_numpy)
+        # 壁紙レイヤーへ
+        if not self.headless:
+            self.attach_to_wallpaper()
+
+    def _in_background(self, name, fn):
+        def work():
+            try:
+                v = fn()
+            except Exception as e:
+                print(f"[startup] {name} failed: {e!r}", file=sys.stderr); return
+            try:
+                self.loaded.emit(name, v)
+            except RuntimeError:   # 閉じた後
+                pass
+        threading.Thread(target=work, name=f"init-{name}", daemon=True).start()
+
+    def _on_loaded(self, name, value):
+        if name == "cpu_name":
+            self.cpu_panel.set_subtitle(value)
+        elif name == "numpy":
+            if value and use_numpy():
+                for g, *_ in self._graph_series():
+                    g.update()
+        elif name == "workerw":
+            self._attach(value)
+        elif name == "snapshot":
+            self.update_all(); return
+        self._mark(name)
 
     # 情報
-    def _cpu_name(self):
-        try:
-            return next((l for l in psutil.cpu_info().__dict__.values() if isinstance(l,str)), "CPU")
-        except Exception:
-            return "AMD Ryzen / Intel Core"
-    def _ram_total(self):
-        vm=psutil.virtual_memory(); return f"Total {vm.total/(1024**3):.1f} GB"
+    def _cpu_name(self):  return cpu_name()
     def _gpu_name(self):  return "GPU"
-    def _net_iface(self): return "Realtek / Wi-Fi"
 
     # 壁紙の子に
     def attach_to_wallpaper(self):
+        if win32gui is None:
+            self.update(); return
+        # トップレベルウィンドウの列挙はワーカースレッドで。見つかったら _attach()
+        self._in_background("workerw", get_workerw)
+
+    def _attach(self, workerw):
         hwnd = int(self.winId())
-        workerw = get_workerw()
 
         # 重要：子ウィンドウにする前に layered 系を使う透過描画を無効化
         if self.testAttribute(Qt.WidgetAttribute.WA_TranslucentBackground):
@@ -390,12 +1707,14 @@ class Dashboard(QWidget):
                 win32gui.SetParent(hwnd, workerw)
             except win32gui.error:
                 pass
+        self._workerw = workerw
 
-        win32gui.SetWindowPos(
-            hwnd, win32con.HWND_BOTTOM, 0, 0, 0, 0,
-            win32con.SWP_NOMOVE | win32con.SWP_NOSIZE |
-            win32con.SWP_NOACTIVATE | win32con.SWP_SHOWWINDOW
-        )
+        # WorkerW は仮想デスクトップ全体を覆うので、子になったら自分の画面の位置（物理ピクセル）へ置き直す
+        rect = _monitor_rect(self.target_screen.name()) if workerw and self.target_screen is not None else None
+        flags = win32con.SWP_NOACTIVATE | win32con.SWP_SHOWWINDOW
+        if rect is None:
+            rect = (0, 0, 0, 0); flags |= win32con.SWP_NOMOVE | win32con.SWP_NOSIZE
+        win32gui.SetWindowPos(hwnd, win32con.HWND_BOTTOM, *rect, flags)
 
         # クリック透過（WS_EX_TRANSPARENT のみ）を適用
         _set_click_through(hwnd, self.click_through)
@@ -404,58 +1723,343 @@ class Dashboard(QWidget):
         self.update()
 
 
-    # 1秒更新
+    # 1秒更新（計測はサンプラスレッド側。ここでは整形と描画のみ）
     def update_all(self):
-        # CPU
-        cpu=psutil.cpu_percent(); self.cpu_panel.set_value(f"{cpu:.0f}%"); self.cpu_graph.push(cpu)
-        # RAM
-        vm=psutil.virtual_memory()
-        self.ram_panel.set_value(f"{vm.percent:.0f}%")
-        used=(vm.total-vm.available)/(1024**3); free=vm.available/(1024**3)
-        self.ram_panel.set_subtitle(f"Total {vm.total/(1024**3):.1f} GB")
-        self.ram_panel.set_extra(f"Used: {used:.1f} GB  /  Free: {free:.1f} GB")
-        self.ram_graph.push(vm.percent)
-        # GPU
-        gpu = self.gpu.read() if self.gpu else None
-        if gpu:
-            util = gpu["util"]
-            used_b = gpu["vram_used"]; total_b = gpu["vram_total"]
-            self.gpu_panel.set_value(f"{util:.0f}%")
-            if used_b>0:
-                used_gb = used_b/(1024**3)
-                if total_b>0:
-                    total_gb = total_b/(1024**3)
-                    self.gpu_panel.set_extra(f"VRAM Used: {used_gb:.2f} / {total_gb:.2f} GB")
+        snap = self.sampler.latest
+        if snap is not None and snap.seq != self._last_seq:
+            self._last_seq = snap.seq
+            self.apply_snapshot(snap)
+            self._mark("first_data")
+        # 時計（カレンダーはページ変更・日付変更時に自前で再着色）
+        if "clock" not in self.placed:
+            return
+        if self.selfstats is None:
+            self._update_clock(); return
+        t = time.perf_counter(); self._update_clock()
+        self.selfstats.observe("update", "clock", (time.perf_counter()-t)*1e3)
+
+    def apply_snapshot(self, s):
+        # 各パネルの再描画は batch() で 1 回に。文字が変わらなければ再描画なし
+        appliers = self._appliers
+        st = self.selfstats
+        if st is None:
+            for _name, fn in appliers:
+                fn(s)
+            return
+        clk = time.perf_counter
+        for name, fn in appliers:
+            t = clk(); fn(s); st.observe("update", name, (clk()-t)*1e3)
+
+    # 移動統計（hub.rolling）：補足の上の行に「窓 ewma / p95 / max」、アラート中は枠をアラート色に
+    def _show_stats(self, name, panel, fmt=lambda v: f"{v:.0f}"):
+        st = self.hub.rolling.latest.get(name)
+        if st is None:
+            panel.set_stats(""); panel.set_alert(False); return
+        panel.set_stats(f"{self._view_tag(st.window)} ewma {fmt(st.ewma)}  p95 {fmt(st.p95)}  max {fmt(st.peak)}")
+        panel.set_alert(st.alert)
+
+    @staticmethod
+    def _short_rate(v):
+        kb = v/1024.0
+        return f"{kb/1024.0:.1f}M" if kb >= 1024 else f"{kb:.0f}K"
+
+    def _apply_cpu(self, s):
+        with self.cpu_panel.batch():
+            self.cpu_panel.set_value(f"{s.cpu:.0f}%"); self.cpu_graph.push(s.cpu)
+            self._show_stats("cpu", self.cpu_panel)
+
+    def _apply_ram(self, s):
+        with self.ram_panel.batch():
+            self.ram_panel.set_value(f"{s.ram_percent:.0f}%")
+            used=(s.ram_total-s.ram_available)/(1024**3); free=s.ram_available/(1024**3)
+            self.ram_panel.set_subtitle(f"Total {s.ram_total/(1024**3):.1f} GB")
+            self.ram_panel.set_extra(f"Used: {used:.1f} GB  /  Free: {free:.1f} GB")
+            self.ram_graph.push(s.ram_percent)
+            self._show_stats("ram", self.ram_panel)
+
+    def _apply_gpu(self, s):
+        with self.gpu_panel.batch():
+            if s.gpu_util is not None:
+                util = s.gpu_util
+                used_b = s.vram_used; total_b = s.vram_total
+                self.gpu_panel.set_value(f"{util:.0f}%")
+                if used_b>0:
+                    used_gb = used_b/(1024**3)
+                    if total_b>0:
+                        total_gb = total_b/(1024**3)
+                        self.gpu_panel.set_extra(f"VRAM Used: {used_gb:.2f} / {total_gb:.2f} GB")
+                    else:
+                        self.gpu_panel.set_extra(f"VRAM Used: {used_gb:.2f} GB")
                 else:
-                    self.gpu_panel.set_extra(f"VRAM Used: {used_gb:.2f} GB")
+                    self.gpu_panel.set_extra("VRAM Used: --")
+                self.gpu_graph.push(min(util,100.0))
             else:
-                self.gpu_panel.set_extra("VRAM Used: --")
-            self.gpu_graph.push(min(util,100.0))
-        else:
-            self.gpu_panel.set_value("--%"); self.gpu_panel.set_extra("VRAM Used: --"); self.gpu_graph.push(0.0)
-        # ネット（下り）
-        now = psutil.net_io_counters()
-        up_kb=(now.bytes_sent - self.last_net.bytes_sent)/1024.0
-        dn_kb=(now.bytes_recv - self.last_net.bytes_recv)/1024.0
-        self.last_net = now
-        self.net_panel.set_value(f"{dn_kb/1024.0:.2f} Mb/s" if dn_kb>1024 else f"{dn_kb:.0f} KB/s")
-        self.net_panel.set_extra(f"↑ {up_kb:.1f} KB/s")
-        self.net_graph.push(dn_kb)
-        # 時計/カレンダー
-        self._place_clock(self.clock_panel)
-        self.calendar.update_calendar_colors()
+                self.gpu_panel.set_value("--%"); self.gpu_panel.set_extra("VRAM Used: --"); self.gpu_graph.push(0.0)
+            self._show_stats("gpu", self.gpu_panel)
+
+    # ネット（下り）… 実経過時間で割った bytes/s。サブタイトルは測っている IF 名
+    def _apply_net(self, s):
+        with self.net_panel.batch():
+            self.net_panel.set_subtitle(s.net_iface or "--")
+            up_kb=s.net_up/1024.0
+            dn_kb=s.net_down/1024.0
+            self.net_panel.set_value(f"{dn_kb/1024.0:.2f} Mb/s" if dn_kb>1024 else f"{dn_kb:.0f} KB/s")
+            self.net_panel.set_extra(f"↑ {up_kb:.1f} KB/s")
+            self.net_graph.push(dn_kb)
+            self._show_stats("net", self.net_panel, self._short_rate)
+
+    def closeEvent(self, e):
+        self.hub.release(self)
+        super().closeEvent(e)
 
     def paintEvent(self, _):
-        p=QPainter(self)
-        p.fillRect(self.rect(), QColor(9,15,26,235))
-        p.setBrush(QColor(0,0,0,80)); p.setPen(Qt.PenStyle.NoPen)
+        if not self._painted:
+            self._painted = True; self._mark("first_paint")
+            QTimer.singleShot(0, self._after_first_paint)
+        p=QPainter(self); T=theme()
+        p.fillRect(self.rect(), T.window)
+        p.setBrush(T.vignette); p.setPen(Qt.PenStyle.NoPen)
         p.drawEllipse(QRectF(-self.width()*0.25, -self.height()*0.25,
                              self.width()*1.5, self.height()*1.5))
         p.end()
 
 
+# ───────────── 壁紙画像モード（--render） ─────────────
+def _set_desktop_wallpaper(path):
+    """Windows の壁紙に設定（書き換えたファイルはキャッシュされるので、変わるたびに呼ぶ）"""
+    win32gui.SystemParametersInfo(win32con.SPI_SETDESKWALLPAPER, os.path.abspath(path), win32con.SPIF_SENDCHANGE)
+
+
+class WallpaperRenderer(QObject):
+    """
+    Dashboard を画面に出さずに（headless）QImage へ描き、every 秒ごと（境界に揃える）に画像ファイルへ書き出す。
+    常駐ウィンドウがないので、間の再描画・合成はゼロ。計測と 1 秒 tick（グラフへの追加）は通常どおり。
+      .bmp / .raw … FrameFile で前回と違う帯だけ上書き
+      .png / .jpg など … 変わった帯があるときだけ全体をエンコード（一時ファイル → 置き換え）
+    base … 下に敷く画像（元の壁紙。拡大して全面に）。無ければ黒
+    preview … 書き出したフレームを縮小表示する通常ウィンドウ
+    """
+    first_data = pyqtSignal()
+
+    def __init__(self, hub: DashboardHub, path, every=60.0, size: QSize|None=None, base=None,
+                 set_wallpaper=False, preview=False):
+        super().__init__(hub)
+        sc = QApplication.primaryScreen()
+        self.hub, self.path, self.every = hub, path, every
+        self.size = size or sc.geometry().size()
+        self.dpr = sc.devicePixelRatio()
+        self.set_wallpaper = set_wallpaper and win32gui is not None
+        self.base = QImage(base) if base else None
+        if self.base is not None and self.base.isNull():
+            raise ValueError(f"cannot load base image {base!r}")
+        self.frames = 0; self.rows = 0; self._prev = None   # 書き出したフレーム数・行数（変化分）
+        wd, hd = round(self.size.width()*self.dpr), round(self.size.height()*self.dpr)
+        self._file = FrameFile(path, wd, hd) if path.lower().endswith((".bmp", ".raw")) else None
+        self._under = self._base_layer(wd, hd)
+        # レイアウトは hub の全画面用（--layout / 設定ファイル）。設定の変更で作り直されたら新しい方へ
+        self.d = Dashboard(hub=hub, layout=hub._layout_for(None), headless=True)
+        self._bind(self.d)
+        hub.replaced.connect(self._on_replaced)
+        self.preview = None
+        if preview:
+            self.preview = QLabel(); self.preview.setWindowTitle(f"TaskMini render — {path}")
+            self.preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.preview.resize(self.size/3); self.preview.show()
+        # 最初のフレームは最初のスナップショットの直後に（サンプラスレッドから GUI スレッドへ）
+        self.first_data.connect(self.render_once)
+        def first(_snap):
+            hub.sampler.listeners.remove(first)
+            self.first_data.emit()
+        hub.sampler.listeners.append(first)
+
+    def _bind(self, d):
+        d.resize(self.size); d.show()
+        d.scheduler.add("render", self.every, self.render_once, align=True, scaled=False)
+
+    def _on_replaced(self, old, new):
+        if old is self.d:
+            self.d = new; self._bind(new)
+            self.render_once()
+
+    def _base_layer(self, wd, hd):
+        img = QImage(wd, hd, QImage.Format.Format_RGB32)
+        if self.base is None:
+            img.fill(Qt.GlobalColor.black)
+        else:
+            p = QPainter(img)
+            p.drawImage(QRect(0, 0, wd, hd), self.base.scaled(wd, hd, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                                                             Qt.TransformationMode.SmoothTransformation))
+            p.end()
+        return img
+
+    def frame(self) -> QImage:
+        """今の Dashboard を 1 枚（下地の上に。半透明部分は下地と合成される）"""
+        self.d.update_all()
+        img = self._under.copy(); img.setDevicePixelRatio(self.dpr)
+        p = QPainter(img)
+        self.d.setUpdatesEnabled(True)
+        self.d.render(p, QPoint(), QRegion(), QWidget.RenderFlag.DrawChildren)
+        self.d.setUpdatesEnabled(False)
+        p.end()
+        return img
+
+    def render_once(self):
+        img = self.frame()
+        ptr = img.constBits(); ptr.setsize(img.sizeInBytes())
+        if self._file is not None:
+            bands = self._file.write(ptr)
+        else:
+            cur = bytes(ptr)
+            bands = changed_bands(self._prev, cur, img.bytesPerLine(), img.height())
+            if bands:
+                root, ext = os.path.splitext(self.path)
+                tmp = root + ".tmp" + ext   # 拡張子で形式が決まるので末尾は残す
+                if not img.save(tmp):
+                    print(f"[render] cannot write {self.path}", file=sys.stderr); return
+                os.replace(tmp, self.path)
+            self._prev = cur
+        if not bands:
+            return
+        self.frames += 1; self.rows += sum(n for _y, n in bands)
+        if self.set_wallpaper:
+            _set_desktop_wallpaper(self.path)
+        if self.preview is not None:
+            pm = QPixmap.fromImage(img); pm.setDevicePixelRatio(1.0)
+            self.preview.setPixmap(pm.scaled(self.preview.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                                             Qt.TransformationMode.SmoothTransformation))
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    w = Dashboard()
-    w.show()
+    ap = argparse.ArgumentParser(description="TaskMini transparent dashboard")
+    ap.add_argument("--record", metavar="FILE", help="計測したスナップショットを記録")
+    ap.add_argument("--replay", metavar="FILE", help="記録ファイルを再生（実機の計測は行わない）")
+    ap.add_argument("--replay-speed", type=float, default=1.0, help="再生速度（1=等速, 0=最速）")
+    ap.add_argument("--sched-stats", action="store_true", help="起床回数などを 1 分ごとに stderr へ")
+    ap.add_argument("--sweep-fps", type=int, default=0, help="秒針を滑らかに動かす（fps、上限 30。0=秒ごと）")
+    ap.add_argument("--history-dir", metavar="DIR", default=None, help="履歴の保存先（既定: history_store.default_dir()）")
+    ap.add_argument("--no-history", action="store_true", help="履歴を保存しない")
+    ap.add_argument("--profile-startup", action="store_true", help="import / 初期化 / 初回描画までの時間を stderr へ")
+    ap.add_argument("--net-iface", metavar="NAME", help="ネットワークパネルの IF（既定: 一番流れている実 IF を自動選択）")
+    ap.add_argument("--top", type=int, default=0, metavar="N", help="上位 N プロセス（CPU / RAM / GPU）のパネルを表示")
+    ap.add_argument("--stats-file", metavar="PATH", help="自己計測を 10 秒ごとに書き出す（.json なら JSON、他は Prometheus テキスト）")
+    ap.add_argument("--stats-port", type=int, metavar="PORT", help="自己計測を http://127.0.0.1:PORT/metrics で公開")
+    ap.add_argument("--screens", default="all", metavar="all|primary|N,NAME",
+                    help="ダッシュボードを出す画面（既定: 全画面。画面番号・QScreen 名をカンマ区切りでも可）")
+    ap.add_argument("--layout", metavar="SPEC", help=f"全画面共通のレイアウト（既定: {LAYOUT!r}。行は '/'、列は ','）")
+    ap.add_argument("--screen-layout", action="append", default=[], metavar="SCREEN=SPEC",
+                    help="画面ごとのレイアウト（SCREEN は画面番号か QScreen 名）")
+    ap.add_argument("--config", metavar="PATH",
+                    help="レイアウト設定（JSON / INI。パネルの並び・周期・表示範囲）。保存すると再起動なしで反映")
+    ap.add_argument("--theme", choices=tuple(PALETTES), default="dark", help="配色（F8 で切替）")
+    ap.add_argument("--accent", choices=tuple(ACCENTS), default="blue", help="グラフの線の色")
+    ap.add_argument("--render", metavar="PATH", help="画面に出さずに画像へ書き出す（.bmp / .raw は変化した帯だけ、他は QImage の形式）")
+    ap.add_argument("--render-every", type=float, default=60.0, metavar="SEC", help="--render の書き出し間隔（既定 60 秒）")
+    ap.add_argument("--render-size", metavar="WxH", help="--render の論理サイズ（既定: 主画面）")
+    ap.add_argument("--render-base", metavar="IMAGE", help="--render で下に敷く画像（元の壁紙）")
+    ap.add_argument("--render-preview", action="store_true", help="--render の結果を縮小表示するウィンドウ")
+    ap.add_argument("--set-wallpaper", action="store_true", help="--render の画像を書き出すたびに Windows の壁紙に設定")
+    ap.add_argument("--shm", nargs="?", const=shm_metrics.NAME, metavar="NAME",
+                    help=f"計測値を共有メモリに公開（他のダッシュボード・metrics_bridge.py・shm_metrics.py が読む。既定名 {shm_metrics.NAME}）")
+    ap.add_argument("--shm-attach", nargs="?", const=shm_metrics.NAME, metavar="NAME",
+                    help="自分では計測せず、--shm で公開された値を表示する")
+    args, qt_args = ap.parse_known_args()
+
+    layouts = {"*": args.layout} if args.layout else {}
+    for item in args.screen_layout:
+        key, sep, spec = item.partition("=")
+        if not sep:
+            ap.error(f"--screen-layout: SCREEN=SPEC expected: {item!r}")
+        layouts[key] = spec
+    for spec in layouts.values():
+        try:
+            parse_layout(spec)
+        except ValueError as e:
+            ap.error(str(e))
+    config = None
+    if args.config:
+        try:
+            config = layout_config.load(args.config)
+        except (OSError, ValueError) as e:
+            ap.error(f"--config: {e}")
+    screens = args.screens if args.screens in ("all", "primary") else args.screens.split(",")
+    render_size = None
+    if args.render_size:
+        try:
+            render_size = QSize(*map(int, args.render_size.lower().split("x")))
+        except (TypeError, ValueError):
+            ap.error(f"--render-size: WxH expected: {args.render_size!r}")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    set_theme(args.theme, args.accent)
+    if args.replay:
+        # 再生側でペースを取るのでサンプラは待たない
+        # 再生中の値は履歴に混ぜない
+        hub = DashboardHub(Collector([ReplayProvider(args.replay, speed=args.replay_speed)]), sample_interval=0,
+                           config=config, layouts=layouts)
+    elif args.shm_attach:
+        # 読み手：共有メモリの最新値を読むだけ（psutil / PDH は読まない）。履歴は書き手が保存する
+        try:
+            provider = shm_metrics.ShmProvider(args.shm_attach)
+        except (OSError, ValueError) as e:
+            sys.exit(f"--shm-attach: {e}")
+        hub = DashboardHub(Collector([provider]), config=config, layouts=layouts)
+        hub.sampler.lead = 0.05   # 書き手（lead 0.1）が書き終えた後に読む
+    else:
+        store = None if args.no_history else HistoryStore(args.history_dir)
+        hub = DashboardHub(store=store, top=args.top, iface=args.net_iface, config=config, layouts=layouts)
+        if store is not None:
+            app.aboutToQuit.connect(store.close)
+    app.aboutToQuit.connect(hub.sampler.stop)
+    if args.render:
+        # 画像モード：Dashboard は 1 つ、画面には出さない（--screens / --screen-layout は使わない）
+        try:
+            renderer = WallpaperRenderer(hub, args.render, every=args.render_every, size=render_size,
+                                         base=args.render_base,
+                                         set_wallpaper=args.set_wallpaper, preview=args.render_preview)
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        # 画面ごとに 1 つ（計測は hub の 1 本を共有）。起動時間の表示などは最初の画面のもので
+        hub.open_screens(screens, sweep_fps=args.sweep_fps)
+    if not hub.dashboards:
+        sys.exit(f"no screen matches --screens {args.screens!r}")
+    hub.watch()
+    w = hub.dashboards[0]
+    t_init = time.perf_counter()
+    if args.profile_startup:
+        # 計測の節目がそろったら 1 回だけ表示（プロセス開始からの時間は psutil で）
+        want = {"first_paint", "first_data", "cpu_name", "numpy", "holidays"} | ({"workerw"} if win32gui and not w.headless else set())
+        def report(_name):
+            if not want <= w.marks.keys():
+                return
+            w.on_mark = None
+            import psutil
+            pre = time.time() - (time.perf_counter() - _T0) - psutil.Process().create_time()
+            ms = lambda t: f"{(t - _T0)*1e3:.0f} ms"
+            print(f"[startup] interpreter {pre*1e3:.0f} ms | import {ms(_T_IMPORTED)} | init {ms(t_init)}"
+                  f" | first paint {ms(w.marks['first_paint'])} | first data {ms(w.marks['first_data'])}", file=sys.stderr)
+            print("[startup] background: " + ", ".join(
+                f"{k} {ms(w.marks[k])}" for k in sorted(want - {"first_paint", "first_data"}, key=w.marks.get)),
+                file=sys.stderr)
+        w.on_mark = report
+    if args.shm:
+        try:
+            pub = shm_metrics.ShmPublisher(args.shm)
+        except (OSError, RuntimeError) as e:
+            sys.exit(f"--shm: {e}")
+        hub.sampler.listeners.append(pub)
+        hub.keep_sampling = True
+        app.aboutToQuit.connect(pub.close)
+    if args.record:
+        rec = Recorder(args.record)
+        hub.sampler.listeners.append(rec)
+        app.aboutToQuit.connect(rec.close)
+    if args.stats_file or args.stats_port:
+        hub.monitor.export(args.stats_file, args.stats_port)
+    if args.sched_stats:
+        hub.scheduler.add("stats", 60.0, lambda: print(
+            f"[sched] hub={hub.scheduler.stats()} " + " ".join(
+                f"{d.target_screen.name() if d.target_screen else 'render'}={d.scheduler.stats()}" for d in hub.dashboards)
+            + f" sampler_ticks={hub.sampler.ticks}", file=sys.stderr),
+            scaled=False, always=True)
     sys.exit(app.exec())